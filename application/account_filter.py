@@ -0,0 +1,229 @@
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+from database.queries import count_users, select_user_identities
+
+
+class BloomFilter:
+    """
+    A fixed-size Bloom filter over strings.
+
+    Membership tests can return false positives (at roughly error_rate once capacity items have
+    been added) but never false negatives, so "not in the filter" is a definite answer.
+    """
+
+    def __init__(self, capacity, error_rate=0.01):
+        """
+        Initializes an empty filter.
+
+        :param capacity: Number of items the filter is sized for.
+        :param error_rate: Target false-positive rate at that capacity.
+        """
+        capacity = max(1, int(capacity))
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        # Double hashing: k positions derived from two 64-bit halves of one digest.
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item):
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class AccountFilter:
+    """
+    Answers "does this username or email exist?" in memory for accounts that do not.
+
+    A Bloom filter over every username and email is built from user_management at startup and
+    extended whenever a user registers; a key it does not contain cannot exist. Keys the filter
+    lets through (false positives, or accounts deleted since the load) that then miss in the
+    database are kept in a short-TTL negative cache so repeated probes for them are also answered
+    without a query. Keys are compared case-insensitively, which only makes the filter more
+    permissive than the database.
+
+    Users registered by other processes (API workers, the CLI) are picked up by sync(): before
+    a key is reported missing, accounts with a user_id above the highest one seen are read
+    with a primary-key range query, at most once every sync_interval seconds, so a new account
+    is recognised everywhere within about that long.
+    """
+
+    # Re-read this many user IDs below the highest seen: AUTO_INCREMENT IDs can commit out of order.
+    SYNC_OVERLAP = 100
+
+    def __init__(self, capacity=100000, error_rate=0.01, negative_ttl=30.0, negative_max_size=10000,
+                 sync_interval=1.0):
+        """
+        Initializes an empty filter.
+
+        :param capacity: Minimum number of keys the Bloom filter is sized for.
+        :param error_rate: Target false-positive rate of the Bloom filter.
+        :param negative_ttl: Seconds a database miss is remembered.
+        :param negative_max_size: Misses kept in memory; the oldest are evicted first.
+        :param sync_interval: Minimum seconds between checks for accounts registered elsewhere.
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.negative_ttl = negative_ttl
+        self.negative_max_size = negative_max_size
+        self.sync_interval = sync_interval
+        self._bloom = None  # None until load(): every key might exist
+        self._missing = OrderedDict()  # key -> expiry time
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._db_connection = None
+        self._last_user_id = 0
+        self._synced_at = 0.0
+        self.filtered = 0
+
+    @staticmethod
+    def _key(value):
+        return (value or "").strip().lower()
+
+    def load(self, db_connection, chunk_size=10000):
+        """
+        Rebuilds the Bloom filter from every username and email in user_management.
+
+        :param db_connection: The database connection object.
+        :param chunk_size: Number of rows fetched at a time.
+        :return: The number of users loaded.
+        """
+        users = 0
+        last_user_id = 0
+        with db_connection.connect(read_only=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute(count_users)
+            total = cursor.fetchone()[0]
+            # Two keys per user, with room for the table to double before the error rate degrades.
+            bloom = BloomFilter(max(self.capacity, 4 * total), self.error_rate)
+            cursor.execute(select_user_identities, (0,))
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                for user_id, username, email in rows:
+                    bloom.add(self._key(username))
+                    bloom.add(self._key(email))
+                last_user_id = max(last_user_id, rows[-1][0])
+                users += len(rows)
+            cursor.close()
+        with self._lock:
+            self._bloom = bloom
+            self._missing.clear()
+            self._db_connection = db_connection
+            self._last_user_id = last_user_id
+            self._synced_at = time.monotonic()
+        return users
+
+    def sync(self):
+        """
+        Adds accounts registered since the last load or sync, e.g. by another process.
+
+        Runs at most once every sync_interval seconds and in one thread at a time; other callers
+        return immediately.
+
+        :return: True if new accounts were looked for.
+        """
+        if self._db_connection is None or time.monotonic() - self._synced_at < self.sync_interval:
+            return False
+        if not self._sync_lock.acquire(blocking=False):
+            return False
+        try:
+            self._synced_at = time.monotonic()
+            with self._db_connection.connect(read_only=True) as conn:
+                cursor = conn.cursor()
+                cursor.execute(select_user_identities, (max(0, self._last_user_id - self.SYNC_OVERLAP),))
+                rows = cursor.fetchall()
+                cursor.close()
+        except Exception as e:
+            print(f"Error while syncing account filter: {e}")
+            return False
+        finally:
+            self._sync_lock.release()
+        with self._lock:
+            for user_id, username, email in rows:
+                for key in (self._key(username), self._key(email)):
+                    self._missing.pop(key, None)
+                    if self._bloom is not None and key not in self._bloom:
+                        self._bloom.add(key)
+                self._last_user_id = max(self._last_user_id, user_id)
+        return True
+
+    def add(self, username, email):
+        """
+        Records a newly registered account.
+
+        :param username: The new user's username.
+        :param email: The new user's email.
+        """
+        with self._lock:
+            for key in (self._key(username), self._key(email)):
+                self._missing.pop(key, None)
+                if self._bloom is not None:
+                    self._bloom.add(key)
+
+    def might_exist(self, value):
+        """
+        Checks whether a username or email could exist.
+
+        :param value: A username or email.
+        :return: False if the account certainly does not exist; True if the database must be asked.
+        """
+        key = self._key(value)
+        if not self._known_missing(key):
+            return True
+        if self.sync() and not self._known_missing(key):
+            return True  # Registered by another process since the last sync
+        with self._lock:
+            self.filtered += 1
+        return False
+
+    def _known_missing(self, key):
+        """True when the filter or the negative cache says key does not exist."""
+        with self._lock:
+            if self._bloom is not None and key not in self._bloom:
+                return True
+            expires_at = self._missing.get(key)
+            if expires_at is not None:
+                if expires_at > time.monotonic():
+                    return True
+                del self._missing[key]
+        return False
+
+    def remember_missing(self, value):
+        """
+        Records that the database has no account for a username or email.
+
+        :param value: The username or email that was not found.
+        """
+        key = self._key(value)
+        with self._lock:
+            self._missing[key] = time.monotonic() + self.negative_ttl
+            self._missing.move_to_end(key)
+            while len(self._missing) > self.negative_max_size:
+                self._missing.popitem(last=False)
+
+    def stats(self):
+        """
+        Returns filter metrics.
+
+        :return: A dictionary with the Bloom filter's key count, cached misses and lookups answered in memory.
+        """
+        with self._lock:
+            return {
+                "keys": self._bloom.count if self._bloom is not None else 0,
+                "negative_entries": len(self._missing),
+                "filtered": self.filtered,
+            }
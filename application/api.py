@@ -0,0 +1,491 @@
+import os
+import sys
+
+if __name__ == "__main__":
+    # Allow "python application/api.py" as well as "python -m application.api"
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import base64
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from decimal import Decimal
+from urllib.parse import parse_qs
+from application.async_services import AsyncCarManagement, AsyncRentalBooking, AsyncRentalManagement, \
+    AsyncPayment, AsyncUserManagement
+from application.account_filter import AccountFilter
+from application.availability import AvailabilityEngine
+from application.car_cache import CarCache
+from application.password_hasher import PasswordHasher
+from application.rate_limiter import LoginRateLimiter, LoginThrottled
+from application.session_manager import SessionManager
+from application.summaries import SummaryTables
+from application.pricing import PricingEngine
+from application.config import DatabaseConfig, DatabasePoolConfig, ReplicaConfigs, ReplicaRouterConfig, \
+    CarCacheConfig, AvailabilityConfig, PasswordHasherConfig, PasswordHashTargetSeconds, SessionConfig, \
+    PersistSessions, LoginRateLimitConfig, AccountFilterConfig, ApiConfig, MaintainSummaries, PricingConfig, \
+    DynamicPricing
+from database.db_connection import DatabaseConnection
+from database.replica_router import ReplicaRouter
+
+
+class HTTPError(Exception):
+    """An error that is returned to the client as a JSON response with the given status."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class Request:
+    """The parts of an ASGI HTTP request the handlers need."""
+
+    def __init__(self, scope, body):
+        self.method = scope["method"]
+        self.path = scope["path"]
+        self.query = {key: values[-1] for key, values in parse_qs(scope.get("query_string", b"").decode()).items()}
+        self.headers = {name.decode("latin-1").lower(): value.decode("latin-1") for name, value in scope["headers"]}
+        self.client = scope.get("client")[0] if scope.get("client") else None
+        self.body = body
+        self.path_params = {}
+        self.user = None
+
+    def json(self):
+        if not self.body:
+            return {}
+        try:
+            data = json.loads(self.body)
+        except ValueError:
+            raise HTTPError(400, "Request body is not valid JSON.")
+        if not isinstance(data, dict):
+            raise HTTPError(400, "Request body must be a JSON object.")
+        return data
+
+    @property
+    def token(self):
+        scheme, _, token = self.headers.get("authorization", "").partition(" ")
+        return token.strip() if scheme.lower() == "bearer" else None
+
+
+def _required(data, *fields):
+    missing = [field for field in fields if data.get(field) in (None, "")]
+    if missing:
+        raise HTTPError(400, f"Missing field(s): {', '.join(missing)}.")
+    return [data[field] for field in fields]
+
+
+def _int(value, name):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise HTTPError(400, f"{name} must be an integer.")
+
+
+def _date(value, name):
+    try:
+        datetime.strptime(value, "%Y-%m-%d")
+    except (TypeError, ValueError):
+        raise HTTPError(400, f"{name} must be a date in YYYY-MM-DD format.")
+    return value
+
+
+def _encode_cursor(cursor):
+    """Turns a search_cars keyset cursor into an opaque string for the 'next' link."""
+    if cursor is None:
+        return None
+    return base64.urlsafe_b64encode(json.dumps(cursor, default=_json_default).encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(value):
+    if not value:
+        return None
+    try:
+        *sort_values, car_id = json.loads(base64.urlsafe_b64decode(value.encode("ascii")))
+        return (*sort_values, int(car_id))
+    except (ValueError, TypeError):
+        raise HTTPError(400, "Invalid 'after' cursor.")
+
+
+def build_services(executor_threads=None):
+    """
+    Creates the services an API worker needs, sharing one connection pool, cache and executor.
+
+    :param executor_threads: Threads that run blocking service calls (defaults to the pool size).
+    :return: A dictionary of awaitable services plus the session manager.
+    """
+    db_connection = DatabaseConnection.get('primary', DatabaseConfig, pool_options=DatabasePoolConfig)
+    if ReplicaConfigs:
+        replicas = [
+            DatabaseConnection.get(f'replica_{index}', replica_config, pool_options=DatabasePoolConfig)
+            for index, replica_config in enumerate(ReplicaConfigs)
+        ]
+        db_connection = ReplicaRouter(db_connection, replicas, **ReplicaRouterConfig)
+    db_connection.ping()
+
+    executor = ThreadPoolExecutor(max_workers=executor_threads or DatabasePoolConfig['max_size'],
+                                  thread_name_prefix="api")
+    car_cache = CarCache(**CarCacheConfig)
+    availability = AvailabilityEngine(**AvailabilityConfig)
+    availability.load(db_connection)
+    account_filter = AccountFilter(**AccountFilterConfig)
+    account_filter.load(db_connection)
+    # Each API worker is already its own process, and bcrypt releases the GIL, so the hasher uses threads.
+    password_hasher = PasswordHasher(rounds=PasswordHasherConfig['rounds'], workers=PasswordHasherConfig['workers'],
+                                     use_processes=False)
+    if PasswordHashTargetSeconds > 0:
+        password_hasher.calibrate(PasswordHashTargetSeconds)
+    summaries = SummaryTables(db_connection) if MaintainSummaries else None
+    pricing = PricingEngine.from_config(**PricingConfig) if DynamicPricing else None
+    if pricing:
+        pricing.load_demand(db_connection, availability)
+    return {
+        "executor": executor,
+        "password_hasher": password_hasher,
+        "cars": AsyncCarManagement(db_connection, car_cache, executor),
+        "bookings": AsyncRentalBooking(db_connection, car_cache, availability, executor, summaries, pricing),
+        "rentals": AsyncRentalManagement(db_connection, car_cache, availability, executor, summaries),
+        "payments": AsyncPayment(db_connection, executor, summaries),
+        "users": AsyncUserManagement(db_connection, password_hasher, LoginRateLimiter(**LoginRateLimitConfig),
+                                     account_filter, executor),
+        # Sessions must be persisted (with a shared SESSION_SECRET) for tokens to work across workers.
+        "sessions": SessionManager(db_connection=db_connection if PersistSessions else None, **SessionConfig),
+    }
+
+
+class CarRentalAPI:
+    """
+    ASGI application exposing car search, booking, payment, approval and returns as JSON over HTTP.
+
+    Requests are authenticated with the session tokens issued by POST /login, sent as
+    'Authorization: Bearer <token>'. Service calls run on the async adapters, so one worker
+    process serves many clients concurrently; with shared sessions, several workers (see serve())
+    use every core.
+    """
+
+    def __init__(self, services=None):
+        """
+        Initializes the application.
+
+        :param services: Optional dictionary from build_services(); built at ASGI startup when omitted.
+        """
+        self.services = services
+        self._session_sweeper = None
+        self.routes = []
+        for method, pattern, handler, role in (
+            ("POST", r"/login", self.login, None),
+            ("POST", r"/logout", self.logout, None),
+            ("GET", r"/cars", self.search_cars, None),
+            ("GET", r"/cars/available", self.available_cars, None),
+            ("GET", r"/cars/(?P<car_id>\d+)", self.get_car, None),
+            ("GET", r"/bookings", self.rental_history, "customer"),
+            ("POST", r"/bookings", self.book_car, "customer"),
+            ("POST", r"/bookings/(?P<booking_id>\d+)/payment", self.pay, "customer"),
+            ("GET", r"/rentals/pending", self.pending_rentals, "admin"),
+            ("POST", r"/rentals/approve", self.approve_many, "admin"),
+            ("POST", r"/rentals/reject", self.reject_many, "admin"),
+            ("POST", r"/rentals/(?P<booking_id>\d+)/approve", self.approve, "admin"),
+            ("POST", r"/rentals/(?P<booking_id>\d+)/reject", self.reject, "admin"),
+            ("POST", r"/rentals/(?P<booking_id>\d+)/return", self.process_return, "admin"),
+        ):
+            self.routes.append((method, re.compile(pattern + "$"), handler, role))
+
+    # -------------------- ASGI --------------------
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._http(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    if self.services is None:
+                        self.services = build_services(ApiConfig['executor_threads'])
+                except Exception as e:
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+                self._session_sweeper = asyncio.ensure_future(self._sweep_sessions())
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if self._session_sweeper:
+                    self._session_sweeper.cancel()
+                if self.services:
+                    self.services["password_hasher"].shutdown(wait=False)
+                    self.services["executor"].shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _sweep_sessions(self):
+        """Drops expired sessions every sweep_interval seconds, on the executor."""
+        sessions = self.services["sessions"]
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(sessions.sweep_interval)
+            await loop.run_in_executor(self.services["executor"], sessions.sweep)
+
+    async def _http(self, scope, receive, send):
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        request = Request(scope, body)
+        try:
+            status, payload = await self.dispatch(request)
+        except HTTPError as e:
+            status, payload = e.status, {"error": e.message}
+        except Exception as e:
+            print(f"Error while handling {request.method} {request.path}: {e}")
+            status, payload = 500, {"error": "Internal server error."}
+        content = json.dumps(payload, default=_json_default).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(content)).encode())],
+        })
+        await send({"type": "http.response.body", "body": content})
+
+    async def dispatch(self, request):
+        """
+        Routes a request to its handler after checking the caller's session and role.
+
+        :param request: The Request.
+        :return: A (status, JSON-serialisable payload) tuple.
+        """
+        path_matched = False
+        for method, pattern, handler, role in self.routes:
+            match = pattern.match(request.path)
+            if not match:
+                continue
+            path_matched = True
+            if method != request.method:
+                continue
+            request.path_params = match.groupdict()
+            if role:
+                request.user = self.services["sessions"].authenticate(request.token)
+                if request.user is None:
+                    raise HTTPError(401, "A valid session token is required.")
+                if request.user.role != role:
+                    raise HTTPError(403, f"This operation requires the '{role}' role.")
+            return await handler(request)
+        if path_matched:
+            raise HTTPError(405, "Method not allowed.")
+        raise HTTPError(404, "Not found.")
+
+    # -------------------- Handlers --------------------
+
+    async def login(self, request):
+        username, password = _required(request.json(), "username", "password")
+        try:
+            user = await self.services["users"].login_user(username, password, request.client)
+        except LoginThrottled as e:
+            raise HTTPError(429, str(e))
+        if not user:
+            raise HTTPError(401, "Incorrect username or password.")
+        token = self.services["sessions"].create_session(user)
+        return 200, {"token": token, "user_id": user.user_id, "username": user.username, "role": user.role}
+
+    async def logout(self, request):
+        self.services["sessions"].revoke(request.token)
+        return 200, {"logged_out": True}
+
+    async def search_cars(self, request):
+        query = request.query
+        filters = {}
+        for name in ("make", "model"):
+            if query.get(name):
+                filters[name] = query[name]
+        for name in ("year_min", "year_max", "rental_days"):
+            if query.get(name):
+                filters[name] = _int(query[name], name)
+        for name in ("rate_min", "rate_max"):
+            if query.get(name):
+                try:
+                    filters[name] = Decimal(query[name])
+                except ArithmeticError:
+                    raise HTTPError(400, f"{name} must be a number.")
+        if query.get("available"):
+            filters["available"] = query["available"].lower() in ("1", "true", "yes")
+        try:
+            cars, next_cursor = await self.services["cars"].search_cars(
+                sort_by=query.get("sort_by", "car_id"),
+                descending=query.get("descending", "").lower() in ("1", "true", "yes"),
+                page_size=min(_int(query.get("page_size", 20), "page_size"), 100),
+                after=_decode_cursor(query.get("after")),
+                **filters,
+            )
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+        return 200, {"cars": cars, "next": _encode_cursor(next_cursor)}
+
+    async def available_cars(self, request):
+        start_date, end_date = request.query.get("start_date"), request.query.get("end_date")
+        if start_date or end_date:
+            start_date, end_date = _date(start_date, "start_date"), _date(end_date, "end_date")
+        return 200, {"cars": await self.services["bookings"].get_available_cars(start_date, end_date)}
+
+    async def get_car(self, request):
+        car = await self.services["cars"].get_car_by_id(int(request.path_params["car_id"]))
+        if not car:
+            raise HTTPError(404, "Car not found.")
+        return 200, car
+
+    async def rental_history(self, request):
+        return 200, {"bookings": await self.services["bookings"].view_rental_history(request.user.user_id)}
+
+    async def book_car(self, request):
+        car_id, start_date, end_date = _required(request.json(), "car_id", "start_date", "end_date")
+        car_id = _int(car_id, "car_id")
+        start_date, end_date = _date(start_date, "start_date"), _date(end_date, "end_date")
+        if end_date < start_date:
+            raise HTTPError(400, "end_date must not be before start_date.")
+        bookings = self.services["bookings"]
+        try:
+            total_cost = await bookings.calculate_fee(car_id, start_date, end_date)
+        except ValueError as e:
+            raise HTTPError(404, str(e))
+        if not await bookings.book_car(request.user.user_id, car_id, start_date, end_date, total_cost):
+            raise HTTPError(409, "The car could not be booked for those dates.")
+        return 201, {"car_id": car_id, "start_date": start_date, "end_date": end_date, "total_cost": total_cost}
+
+    async def pay(self, request):
+        (amount,) = _required(request.json(), "amount")
+        booking_id = int(request.path_params["booking_id"])
+        history = await self.services["bookings"].view_rental_history(request.user.user_id)
+        if not any(booking["booking_id"] == booking_id for booking in history):
+            raise HTTPError(404, "Booking not found.")
+        if not await self.services["payments"].process_payment(booking_id, amount):
+            raise HTTPError(400, "Payment could not be processed.")
+        return 200, {"booking_id": booking_id, "paid": True}
+
+    async def pending_rentals(self, request):
+        return 200, {"rentals": await self.services["rentals"].get_pending_rentals()}
+
+    async def approve(self, request):
+        booking_id = int(request.path_params["booking_id"])
+        if not await self.services["rentals"].approve_rental(booking_id):
+            raise HTTPError(404, "Rental not found or could not be approved.")
+        return 200, {"booking_id": booking_id, "status": "confirmed"}
+
+    async def reject(self, request):
+        booking_id = int(request.path_params["booking_id"])
+        rentals = self.services["rentals"]
+        if not await rentals.check_rental_exists(booking_id):
+            raise HTTPError(404, "Rental not found.")
+        if not await rentals.reject_rental(booking_id):
+            raise HTTPError(500, "Rental could not be rejected.")
+        return 200, {"booking_id": booking_id, "status": "cancelled"}
+
+    @staticmethod
+    def _bulk_arguments(request):
+        data = request.json()
+        if "rental_ids" in data:
+            if not isinstance(data["rental_ids"], list):
+                raise HTTPError(400, "rental_ids must be a list.")
+            return {"rental_ids": [_int(rental_id, "rental_ids") for rental_id in data["rental_ids"]]}
+        filters = {name: data[name] for name in ("status", "payment_status", "start_date_to") if data.get(name)}
+        if data.get("car_id") is not None:
+            filters["car_id"] = _int(data["car_id"], "car_id")
+        return filters
+
+    async def approve_many(self, request):
+        results = await self.services["rentals"].approve_rentals(**self._bulk_arguments(request))
+        return 200, {"results": {str(rental_id): result for rental_id, result in results.items()}}
+
+    async def reject_many(self, request):
+        results = await self.services["rentals"].reject_rentals(**self._bulk_arguments(request))
+        return 200, {"results": {str(rental_id): result for rental_id, result in results.items()}}
+
+    async def process_return(self, request):
+        (return_date,) = _required(request.json(), "return_date")
+        try:
+            result = await self.services["rentals"].process_return(
+                int(request.path_params["booking_id"]), _date(return_date, "return_date"))
+        except ValueError as e:
+            raise HTTPError(404, str(e))
+        return 200, result
+
+
+app = CarRentalAPI()
+
+
+def sessions_shared():
+    """Whether session tokens issued by one worker process are accepted by the others."""
+    return PersistSessions and bool(SessionConfig['secret'])
+
+
+def worker_count(workers=None):
+    """
+    Decides how many worker processes to run.
+
+    Without persisted sessions and a shared SESSION_SECRET, each worker signs tokens with its own
+    key and keeps its own session store, so a token issued by one worker is rejected by the
+    others. In that case the API runs a single worker unless more were asked for, which is refused.
+    With shared sessions, workers stay consistent: every authentication checks and extends the
+    user_sessions row, so a logout in one worker ends the session in all of them, and password
+    hashes are only ever upgraded, so workers calibrated to different bcrypt costs do not re-hash
+    each other's hashes.
+
+    :param workers: Requested worker processes (defaults to API_WORKERS; 0 = CPU count when sessions are shared).
+    :return: The number of workers.
+    :raises ValueError: If more than one worker is requested without shared sessions.
+    """
+    workers = workers or ApiConfig['workers']
+    if sessions_shared():
+        return workers or os.cpu_count() or 1
+    if workers and workers > 1:
+        raise ValueError("Running more than one API worker needs SESSION_PERSIST=True and a SESSION_SECRET "
+                         "shared by every worker.")
+    return 1
+
+
+def serve(host=None, port=None, workers=None):
+    """
+    Runs the API under uvicorn.
+
+    Each worker has its own connection pool, caches and executor; the operating system spreads
+    incoming connections across the workers' shared listening socket. See worker_count() for
+    how many workers are started.
+
+    :param host: Interface to bind (defaults to API_HOST).
+    :param port: Port to bind (defaults to API_PORT).
+    :param workers: Worker processes (defaults to API_WORKERS).
+    """
+    try:
+        import uvicorn
+    except ImportError:
+        print("The API server needs uvicorn: pip install uvicorn")
+        sys.exit(1)
+    try:
+        workers = worker_count(workers)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    uvicorn.run(
+        "application.api:app",
+        host=host or ApiConfig['host'],
+        port=port or ApiConfig['port'],
+        workers=workers,
+        log_level="warning",
+    )
+
+
+if __name__ == "__main__":
+    serve()
@@ -0,0 +1,150 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from application.car_management import CarManagement
+from application.payment import Payment
+from application.rental_booking import RentalBooking
+from application.rental_management import RentalManagement
+from application.rate_limiter import LoginThrottled
+from application.user_management import UserManagement
+
+
+def _delegate(name):
+    """Builds a coroutine method that runs the wrapped service's method of the same name in the executor."""
+    async def method(self, *args, **kwargs):
+        return await self._run(getattr(self.service, name), *args, **kwargs)
+
+    method.__name__ = name
+    return method
+
+
+class AsyncService:
+    """
+    Runs a synchronous service's methods on a thread pool so they can be awaited.
+
+    The services block on MySQL for the duration of each query; running them in an executor
+    keeps the event loop free, so one process can have many bookings and searches in flight at
+    once. Concurrency is bounded by the executor size and, underneath it, by the connection
+    pool, so the executor should have about as many threads as the pool has connections.
+    Subclasses list the methods they expose in METHODS and keep the synchronous names.
+    """
+
+    METHODS = ()
+
+    def __init__(self, service, executor=None):
+        """
+        Initializes the adapter.
+
+        :param service: The synchronous service instance to wrap.
+        :param executor: Optional executor shared between services; a private one is created when omitted.
+        """
+        self.service = service
+        self.executor = executor or ThreadPoolExecutor(thread_name_prefix=type(service).__name__)
+
+    @classmethod
+    def wrap(cls, service, executor=None):
+        """
+        Wraps an existing synchronous service, e.g. one already shared with the rest of the application.
+
+        :param service: The synchronous service instance.
+        :param executor: Optional executor shared between services.
+        """
+        adapter = cls.__new__(cls)
+        AsyncService.__init__(adapter, service, executor)
+        return adapter
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name in cls.METHODS:
+            if name not in cls.__dict__:
+                setattr(cls, name, _delegate(name))
+
+    def _call(self, function, *args, **kwargs):
+        """Runs one service call on an executor thread, then returns the thread's session connection to the pool."""
+        try:
+            return function(*args, **kwargs)
+        finally:
+            self.service.db_connection.close()
+
+    async def _run(self, function, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(self._call, function, *args, **kwargs))
+
+
+class AsyncCarManagement(AsyncService):
+    """Awaitable counterpart of CarManagement."""
+
+    METHODS = ("add_car", "get_available_cars", "get_car_by_id", "update_car", "delete_car", "list_cars",
+               "list_all_cars", "search_cars")
+
+    def __init__(self, db_connection, car_cache=None, executor=None):
+        super().__init__(CarManagement(db_connection, car_cache), executor)
+
+
+class AsyncRentalBooking(AsyncService):
+    """Awaitable counterpart of RentalBooking."""
+
+    METHODS = ("book_car", "get_available_cars", "view_available_cars", "calculate_fee", "calculate_fees_batch",
+               "view_rental_history", "cancel_booking", "initiate_payment")
+
+    def __init__(self, db_connection, car_cache=None, availability=None, executor=None, summaries=None, pricing=None):
+        super().__init__(RentalBooking(db_connection, car_cache, availability, summaries, pricing), executor)
+
+    # Pure calculations: no I/O, so they are not sent to the executor.
+    calculate_rental_fees = staticmethod(RentalBooking.calculate_rental_fees)
+    calculate_rental_fees_batch = staticmethod(RentalBooking.calculate_rental_fees_batch)
+
+
+class AsyncRentalManagement(AsyncService):
+    """Awaitable counterpart of RentalManagement."""
+
+    METHODS = ("get_pending_rentals", "check_rental_exists", "approve_rental", "reject_rental", "generate_reports",
+               "update_rental_status", "calculate_late_fee", "process_return", "find_rental_ids", "approve_rentals",
+               "reject_rentals")
+
+    def __init__(self, db_connection, car_cache=None, availability=None, executor=None, summaries=None):
+        super().__init__(RentalManagement(db_connection, car_cache, availability, summaries), executor)
+
+
+class AsyncPayment(AsyncService):
+    """Awaitable counterpart of Payment."""
+
+    METHODS = ("process_payment",)
+
+    def __init__(self, db_connection, executor=None, summaries=None):
+        super().__init__(Payment(db_connection, summaries), executor)
+
+
+class AsyncUserManagement(AsyncService):
+    """
+    Awaitable counterpart of UserManagement.
+
+    login_user only borrows an executor thread for the user lookup; the bcrypt check runs on the
+    password hasher's workers and is awaited without holding a thread.
+    """
+
+    METHODS = ("set_reset_code", "validate_reset_code", "update_password", "register_user", "check_user_exists")
+
+    def __init__(self, db_connection, password_hasher=None, rate_limiter=None, account_filter=None, executor=None):
+        super().__init__(UserManagement(db_connection, password_hasher, rate_limiter, account_filter), executor)
+
+    generate_reset_code = staticmethod(UserManagement.generate_reset_code)
+
+    async def login_user(self, username, password, client=None):
+        """
+        Logs a user in.
+
+        :param username: Username or email.
+        :param password: The plain-text password.
+        :param client: Optional client identifier (e.g. IP address) for rate limiting.
+        :return: A User on success, or None.
+        :raises LoginThrottled: If the attempt was refused by the rate limiter.
+        """
+        future = await self._run(self.service.login_user_async, username, password, client)
+        try:
+            return await asyncio.wrap_future(future)
+        except LoginThrottled:
+            raise
+        except Exception as e:
+            print(f"Error during login: {e}")
+            return None
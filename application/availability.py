@@ -0,0 +1,295 @@
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from data_models.dates import to_ordinal as _to_ordinal
+
+
+class AvailabilityEngine:
+    """
+    Tracks booked date ranges per car and answers date-range availability questions.
+
+    Bookings are stored as inclusive [start, end] day-number intervals in two sorted
+    indexes: one per car (for "is car X free?") and one across the fleet ordered by start
+    day (for "which cars are busy between X and Y?"). Because no booking is longer than the
+    longest booking held, every booking overlapping [X, Y] starts inside [X - longest, Y],
+    so both questions are answered with a bisect plus a scan of the bookings starting in
+    that window. The cost grows with the longest booking held, not with the total number
+    of bookings or cars.
+
+    The engine is a per-process copy of rental_booking and is only a hint: bookings made or
+    cancelled by other processes reach it when load() runs again (see reload_if_stale()), and
+    RentalBooking.book_car always confirms with the locked database check.
+    """
+
+    def __init__(self, max_age=None):
+        """
+        Initializes an empty engine.
+
+        :param max_age: Seconds after which reload_if_stale() reloads from the database; None never reloads.
+        """
+        self._starts = []         # fleet-wide start days, sorted
+        self._entries = []        # (start, end, car_id, booking_id), parallel to _starts
+        self._car_starts = {}     # car_id -> sorted start days
+        self._car_entries = {}    # car_id -> (start, end, booking_id), parallel to _car_starts[car_id]
+        self._bookings = {}       # booking_id -> (car_id, start, end)
+        self._span_counts = {}    # end - start -> number of bookings with that span
+        self._max_span = 0
+        self._lock = threading.RLock()
+        self.max_age = max_age
+        self.loaded_at = None
+
+    def load(self, db_connection):
+        """
+        Rebuilds the engine from the rental_booking table, skipping cancelled bookings.
+
+        :param db_connection: The database connection object.
+        :return: The number of bookings loaded.
+        """
+        query = """
+            SELECT booking_id, car_id, rental_start_date, rental_end_date
+            FROM rental_booking
+            WHERE status <> 'cancelled'
+        """
+        with db_connection.connect(read_only=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute(query)
+            rows = cursor.fetchall()
+            cursor.close()
+        self.bulk_load(
+            (car_id, start_date, end_date, booking_id)
+            for booking_id, car_id, start_date, end_date in rows
+            if start_date is not None and end_date is not None
+        )
+        self.loaded_at = time.monotonic()
+        return len(self._bookings)
+
+    def reload_if_stale(self, db_connection):
+        """
+        Reloads the engine when it is older than max_age, picking up changes made by other processes.
+
+        :param db_connection: The database connection object.
+        :return: True if the engine was reloaded.
+        """
+        if self.max_age is None or (self.loaded_at is not None
+                                    and time.monotonic() - self.loaded_at < self.max_age):
+            return False
+        try:
+            self.load(db_connection)
+        except Exception as e:
+            print(f"Error while reloading bookings: {e}")
+            return False
+        return True
+
+    def bulk_load(self, bookings):
+        """
+        Replaces the engine's contents, sorting once instead of inserting one booking at a time.
+
+        :param bookings: Iterable of (car_id, start_date, end_date, booking_id) tuples.
+        :return: None
+        """
+        entries = sorted(
+            (_to_ordinal(start_date), _to_ordinal(end_date), car_id, booking_id)
+            for car_id, start_date, end_date, booking_id in bookings
+        )
+        car_entries = {}
+        for start, end, car_id, booking_id in entries:
+            car_entries.setdefault(car_id, []).append((start, end, booking_id))
+        with self._lock:
+            self._entries = entries
+            self._starts = [entry[0] for entry in entries]
+            self._car_entries = car_entries
+            self._car_starts = {car_id: [entry[0] for entry in items] for car_id, items in car_entries.items()}
+            self._bookings = {
+                booking_id: (car_id, start, end)
+                for start, end, car_id, booking_id in entries if booking_id is not None
+            }
+            self._span_counts = {}
+            for start, end, _, _ in entries:
+                self._span_counts[end - start] = self._span_counts.get(end - start, 0) + 1
+            self._max_span = max(self._span_counts, default=0)
+
+    def clear(self):
+        """Forgets every booking."""
+        with self._lock:
+            self._starts.clear()
+            self._entries.clear()
+            self._car_starts.clear()
+            self._car_entries.clear()
+            self._bookings.clear()
+            self._span_counts.clear()
+            self._max_span = 0
+
+    def _insert(self, car_id, start, end, booking_id):
+        """Adds an interval to both indexes. Caller holds the lock."""
+        index = bisect_right(self._starts, start)
+        self._starts.insert(index, start)
+        self._entries.insert(index, (start, end, car_id, booking_id))
+
+        car_starts = self._car_starts.setdefault(car_id, [])
+        car_entries = self._car_entries.setdefault(car_id, [])
+        index = bisect_right(car_starts, start)
+        car_starts.insert(index, start)
+        car_entries.insert(index, (start, end, booking_id))
+
+        if booking_id is not None:
+            self._bookings[booking_id] = (car_id, start, end)
+        self._span_counts[end - start] = self._span_counts.get(end - start, 0) + 1
+        self._max_span = max(self._max_span, end - start)
+
+    def _forget_span(self, span):
+        """Drops one booking's span, shrinking the scan window if it was the longest. Caller holds the lock."""
+        count = self._span_counts[span] - 1
+        if count:
+            self._span_counts[span] = count
+            return
+        del self._span_counts[span]
+        if span == self._max_span:
+            self._max_span = max(self._span_counts, default=0)
+
+    def _car_conflicts(self, car_id, start, end):
+        """Returns True when car_id has a booking overlapping [start, end]. Caller holds the lock."""
+        car_starts = self._car_starts.get(car_id)
+        if not car_starts:
+            return False
+        car_entries = self._car_entries[car_id]
+        lo = bisect_left(car_starts, start - self._max_span)
+        hi = bisect_right(car_starts, end)
+        return any(car_entries[i][1] >= start for i in range(lo, hi))
+
+    def is_available(self, car_id, start_date, end_date):
+        """
+        Checks whether a car is free for a whole date range.
+
+        :param car_id: The ID of the car.
+        :param start_date: First rental day (date or YYYY-MM-DD).
+        :param end_date: Last rental day (date or YYYY-MM-DD).
+        :return: True if no booking overlaps the range.
+        """
+        start, end = _to_ordinal(start_date), _to_ordinal(end_date)
+        with self._lock:
+            return not self._car_conflicts(car_id, start, end)
+
+    def busy_car_ids(self, start_date, end_date):
+        """
+        Returns the IDs of cars with at least one booking overlapping a date range.
+
+        :param start_date: First day of the range (date or YYYY-MM-DD).
+        :param end_date: Last day of the range (date or YYYY-MM-DD).
+        :return: A set of car IDs.
+        """
+        start, end = _to_ordinal(start_date), _to_ordinal(end_date)
+        with self._lock:
+            lo = bisect_left(self._starts, start - self._max_span)
+            hi = bisect_right(self._starts, end)
+            entries = self._entries
+            return {entries[i][2] for i in range(lo, hi) if entries[i][1] >= start}
+
+    def booked_cars_per_day(self, start_date, end_date):
+        """
+        Counts the cars booked on each day of a date range (used for demand-based pricing).
+
+        :param start_date: First day of the range (date or YYYY-MM-DD).
+        :param end_date: Last day of the range (date or YYYY-MM-DD).
+        :return: A list with one count per day from start_date to end_date.
+        """
+        start, end = _to_ordinal(start_date), _to_ordinal(end_date)
+        if end < start:
+            return []
+        changes = [0] * (end - start + 2)
+        with self._lock:
+            lo = bisect_left(self._starts, start - self._max_span)
+            hi = bisect_right(self._starts, end)
+            entries = self._entries
+            for i in range(lo, hi):
+                first, last = max(entries[i][0], start), min(entries[i][1], end)
+                if first <= last:
+                    changes[first - start] += 1
+                    changes[last - start + 1] -= 1
+        counts = []
+        running = 0
+        for change in changes[:-1]:
+            running += change
+            counts.append(running)
+        return counts
+
+    def free_car_ids(self, car_ids, start_date, end_date):
+        """
+        Filters car IDs down to those free for a whole date range, preserving order.
+
+        :param car_ids: Candidate car IDs (e.g. the cars currently on offer).
+        :param start_date: First day of the range (date or YYYY-MM-DD).
+        :param end_date: Last day of the range (date or YYYY-MM-DD).
+        :return: A list of car IDs.
+        """
+        busy = self.busy_car_ids(start_date, end_date)
+        return [car_id for car_id in car_ids if car_id not in busy]
+
+    def reserve(self, car_id, start_date, end_date, booking_id=None):
+        """
+        Records a booking if it does not overlap an existing one for the same car.
+
+        :param car_id: The ID of the car.
+        :param start_date: First rental day (date or YYYY-MM-DD).
+        :param end_date: Last rental day (date or YYYY-MM-DD).
+        :param booking_id: The booking's ID, needed to release it later.
+        :return: True if recorded, False on a conflict.
+        """
+        start, end = _to_ordinal(start_date), _to_ordinal(end_date)
+        if end < start:
+            raise ValueError("End date must not be before start date.")
+        with self._lock:
+            if self._car_conflicts(car_id, start, end):
+                return False
+            self._insert(car_id, start, end, booking_id)
+            return True
+
+    def release(self, booking_id):
+        """
+        Forgets a booking, e.g. after it was cancelled or rejected.
+
+        :param booking_id: The booking's ID.
+        :return: True if the booking was known.
+        """
+        with self._lock:
+            booking = self._bookings.pop(booking_id, None)
+            if booking is None:
+                return False
+            car_id, start, end = booking
+
+            index = bisect_left(self._starts, start)
+            while self._entries[index][3] != booking_id:
+                index += 1
+            del self._starts[index]
+            del self._entries[index]
+
+            car_starts = self._car_starts[car_id]
+            car_entries = self._car_entries[car_id]
+            index = bisect_left(car_starts, start)
+            while car_entries[index][2] != booking_id:
+                index += 1
+            del car_starts[index]
+            del car_entries[index]
+            self._forget_span(end - start)
+            return True
+
+    def replace_car(self, car_id, bookings):
+        """
+        Replaces everything known about one car, e.g. after the database showed the engine was out of date.
+
+        :param car_id: The ID of the car.
+        :param bookings: Iterable of (booking_id, start_date, end_date) tuples for the car's live bookings.
+        :return: None
+        """
+        bookings = [(booking_id, _to_ordinal(start_date), _to_ordinal(end_date))
+                    for booking_id, start_date, end_date in bookings
+                    if start_date is not None and end_date is not None]
+        with self._lock:
+            kept = [entry for entry in self._entries if entry[2] != car_id]
+            for start, end, booking_id in self._car_entries.pop(car_id, []):
+                self._bookings.pop(booking_id, None)
+                self._forget_span(end - start)
+            self._car_starts.pop(car_id, None)
+            self._entries = kept
+            self._starts = [entry[0] for entry in kept]
+            for booking_id, start, end in bookings:
+                self._insert(car_id, start, end, booking_id)
@@ -0,0 +1,195 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class CarCache:
+    """
+    In-process cache of Car objects for the catalogue screens.
+
+    Cars are kept in an LRU map keyed by car_id, each entry expiring after ``ttl`` seconds.
+    The list of currently available car IDs is cached separately so "View Available Cars"
+    becomes a memory lookup. Services that change cars (add/update/delete, rental approval)
+    call the invalidate methods so readers never see stale rows for longer than one write.
+
+    Every invalidation bumps a version. Readers take a fill_ticket() before querying and pass its
+    version to put()/set_available_cars(), which drop the rows if the cache was invalidated in the
+    meantime; until a refill has been stored, the ticket also asks for the read to go to the
+    primary, so a lagging replica cannot put the old rows back. Cars are copied in and out, so
+    callers may modify the objects they get.
+    """
+
+    def __init__(self, max_size=1024, ttl=60.0):
+        """
+        Initializes the cache.
+
+        :param max_size: Maximum number of Car objects kept; least recently used are evicted first.
+        :param ttl: Seconds a cached car or availability list stays valid.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._cars = OrderedDict()  # car_id -> (Car, expires_at)
+        self._available_ids = None
+        self._available_expires_at = 0.0
+        self._version = 0
+        self._fill_from_primary = False
+        self._lock = threading.Lock()
+
+    def _invalidated(self):
+        """Records an invalidation. Caller holds the lock."""
+        self._version += 1
+        self._fill_from_primary = True
+
+    def _store(self, car, now):
+        """Adds a copy of a car to the LRU map. Caller holds the lock."""
+        self._cars[car.car_id] = (car.copy(), now + self.ttl)
+        self._cars.move_to_end(car.car_id)
+        while len(self._cars) > self.max_size:
+            self._cars.popitem(last=False)
+
+    def _lookup(self, car_id, now):
+        """Returns a live cached car or None. Caller holds the lock."""
+        entry = self._cars.get(car_id)
+        if entry is None:
+            return None
+        car, expires_at = entry
+        if expires_at <= now:
+            del self._cars[car_id]
+            return None
+        self._cars.move_to_end(car_id)
+        return car
+
+    def get(self, car_id):
+        """
+        Retrieves a cached car.
+
+        :param car_id: The ID of the car.
+        :return: The Car object, or None on a miss.
+        """
+        with self._lock:
+            car = self._lookup(car_id, time.monotonic())
+            if car is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return car.copy()
+
+    def fill_ticket(self):
+        """
+        Returns what a database read that will refill the cache needs to know.
+
+        :return: A tuple (version, read_only): the version to pass to put()/set_available_cars(),
+                 and whether the read may go to a replica (False until a refill has been stored
+                 after the last invalidation).
+        """
+        with self._lock:
+            return self._version, not self._fill_from_primary
+
+    def _current(self, version):
+        """Whether rows read under version may be stored. Caller holds the lock."""
+        return version is None or version == self._version
+
+    def put(self, car, version=None):
+        """
+        Caches a car.
+
+        :param car: A Car object with a car_id.
+        :param version: The fill_ticket() version taken before the car was read; the car is not
+                        cached if the cache has been invalidated since.
+        :return: None
+        """
+        if car is None or car.car_id is None:
+            return
+        with self._lock:
+            if self._current(version):
+                self._store(car, time.monotonic())
+
+    def get_available_cars(self):
+        """
+        Retrieves the cached list of available cars.
+
+        :return: A list of Car objects, or None when the availability list is missing, expired
+                 or refers to a car that has since been evicted.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._available_ids is None or self._available_expires_at <= now:
+                self.misses += 1
+                return None
+            cars = []
+            for car_id in self._available_ids:
+                car = self._lookup(car_id, now)
+                if car is None:
+                    self._available_ids = None
+                    self.misses += 1
+                    return None
+                cars.append(car.copy())
+            self.hits += 1
+            return cars
+
+    def set_available_cars(self, cars, version=None):
+        """
+        Caches the list of available cars and the cars themselves.
+
+        :param cars: A list of Car objects that are currently available.
+        :param version: The fill_ticket() version taken before the cars were read; nothing is
+                        cached if the cache has been invalidated since.
+        :return: None
+        """
+        with self._lock:
+            if not self._current(version):
+                return
+            self._fill_from_primary = False
+            now = time.monotonic()
+            if len(cars) > self.max_size:
+                # The list would evict its own members; only keep the individual cars.
+                for car in cars[-self.max_size:]:
+                    self._store(car, now)
+                self._available_ids = None
+                return
+            for car in cars:
+                self._store(car, now)
+            self._available_ids = [car.car_id for car in cars]
+            self._available_expires_at = now + self.ttl
+
+    def invalidate(self, car_id):
+        """
+        Drops a car and the availability list after the car was changed.
+
+        :param car_id: The ID of the changed car.
+        :return: None
+        """
+        with self._lock:
+            self._cars.pop(car_id, None)
+            self._available_ids = None
+            self._invalidated()
+
+    def invalidate_availability(self):
+        """Drops the availability list, e.g. after a car was added."""
+        with self._lock:
+            self._available_ids = None
+            self._invalidated()
+
+    def clear(self):
+        """Empties the cache (counters are kept)."""
+        with self._lock:
+            self._cars.clear()
+            self._available_ids = None
+            self._invalidated()
+
+    def stats(self):
+        """
+        Returns cache counters.
+
+        :return: A dictionary with hits, misses, hit_rate and size.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._cars),
+            }
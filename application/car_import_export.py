@@ -0,0 +1,232 @@
+import csv
+import json
+import os
+from decimal import Decimal, InvalidOperation
+from database.queries import add_car, select_cars_page
+from data_models.car import Car
+
+CAR_FIELDS = ["car_id", "make", "model", "year", "mileage", "available_now", "min_rent_period", "max_rent_period",
+              "daily_rate"]
+TRUE_VALUES = {"1", "true", "yes", "y"}
+FALSE_VALUES = {"0", "false", "no", "n", ""}
+
+
+class CarImportExport:
+    """
+    Streams whole fleets in and out of the car_management table.
+
+    Imports read CSV or JSON Lines one row at a time, validate each row into a Car object and
+    insert valid rows with executemany, committing once per chunk. Exports page through the
+    table by car_id so memory stays bounded regardless of fleet size.
+    """
+
+    def __init__(self, db_connection, car_cache=None):
+        """
+        Initializes the importer/exporter with a database connection.
+
+        :param db_connection: The database connection object.
+        :param car_cache: Optional CarCache invalidated after an import.
+        """
+        self.db_connection = db_connection
+        self.car_cache = car_cache
+
+    # -------------------- Validation --------------------
+
+    @staticmethod
+    def _parse_bool(value):
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, (int, float)):
+            return bool(value)
+        text = str(value if value is not None else "").strip().lower()
+        if text in TRUE_VALUES:
+            return True
+        if text in FALSE_VALUES:
+            return False
+        raise ValueError(f"invalid available_now value '{value}'")
+
+    @staticmethod
+    def _parse_int(row, field, minimum=0):
+        value = row.get(field)
+        try:
+            number = int(str(value).replace(",", "").strip())
+        except (TypeError, ValueError):
+            raise ValueError(f"invalid {field} value '{value}'")
+        if number < minimum:
+            raise ValueError(f"{field} must be at least {minimum}")
+        return number
+
+    @classmethod
+    def row_to_car(cls, row):
+        """
+        Validates an import row and converts it into a Car object.
+
+        :param row: A dictionary keyed by Car field names.
+        :return: A Car object (car_id is None; the database assigns it).
+        :raises ValueError: If a field is missing or invalid.
+        """
+        make = str(row.get("make") or "").strip()
+        model = str(row.get("model") or "").strip()
+        if not make or not model:
+            raise ValueError("make and model are required")
+        min_rent_period = cls._parse_int(row, "min_rent_period", minimum=1)
+        max_rent_period = cls._parse_int(row, "max_rent_period", minimum=1)
+        if min_rent_period > max_rent_period:
+            raise ValueError("min_rent_period must not exceed max_rent_period")
+        try:
+            daily_rate = Decimal(str(row.get("daily_rate")).replace(",", "").strip())
+        except InvalidOperation:
+            raise ValueError(f"invalid daily_rate value '{row.get('daily_rate')}'")
+        if not daily_rate.is_finite() or daily_rate < 0:
+            raise ValueError("daily_rate must be a non-negative number")
+        return Car(
+            car_id=None,
+            make=make,
+            model=model,
+            year=cls._parse_int(row, "year", minimum=1886),
+            mileage=cls._parse_int(row, "mileage"),
+            available_now=cls._parse_bool(row.get("available_now", True)),
+            min_rent_period=min_rent_period,
+            max_rent_period=max_rent_period,
+            daily_rate=daily_rate,
+        )
+
+    # -------------------- Import --------------------
+
+    @staticmethod
+    def _detect_format(path, file_format):
+        if file_format:
+            return file_format.lower()
+        extension = os.path.splitext(path)[1].lower()
+        return "jsonl" if extension in (".jsonl", ".ndjson") else "csv"
+
+    @staticmethod
+    def _read_rows(handle, file_format):
+        """Yields (line_number, row_dict or parse error) pairs without loading the whole file."""
+        if file_format == "csv":
+            reader = csv.DictReader(handle)
+            for row in reader:
+                yield reader.line_num, row
+        elif file_format == "jsonl":
+            for line_number, line in enumerate(handle, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_number, ValueError(f"invalid JSON: {e.msg}")
+                    continue
+                yield line_number, row if isinstance(row, dict) else ValueError("expected a JSON object")
+        else:
+            raise ValueError(f"Unsupported import format '{file_format}'.")
+
+    @staticmethod
+    def _car_params(car):
+        return (car.make, car.model, car.year, car.mileage, car.available_now, car.min_rent_period,
+                car.max_rent_period, car.daily_rate)
+
+    def _insert_chunk(self, chunk, report):
+        """
+        Inserts one chunk of (line_number, Car) pairs in a single transaction.
+
+        If the batch insert fails, rows are retried one by one so the offending rows can be reported.
+        """
+        with self.db_connection.connect() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.executemany(add_car, [self._car_params(car) for _, car in chunk])
+                conn.commit()
+                report["imported"] += len(chunk)
+                return
+            except Exception:
+                conn.rollback()
+                for line_number, car in chunk:
+                    try:
+                        cursor.execute(add_car, self._car_params(car))
+                        conn.commit()
+                        report["imported"] += 1
+                    except Exception as e:
+                        conn.rollback()
+                        report["errors"].append((line_number, str(e)))
+            finally:
+                cursor.close()
+
+    def import_cars(self, path, file_format=None, chunk_size=500):
+        """
+        Imports cars from a CSV or JSON Lines file.
+
+        :param path: Path of the file to import.
+        :param file_format: 'csv' or 'jsonl'; detected from the extension when omitted.
+        :param chunk_size: Number of rows inserted and committed per transaction.
+        :return: A dictionary with 'imported' (count) and 'errors' (list of (line_number, message)).
+        """
+        file_format = self._detect_format(path, file_format)
+        report = {"imported": 0, "errors": []}
+        chunk = []
+        with open(path, newline="", encoding="utf-8") as handle:
+            for line_number, row in self._read_rows(handle, file_format):
+                try:
+                    if isinstance(row, Exception):
+                        raise row
+                    chunk.append((line_number, self.row_to_car(row)))
+                except ValueError as e:
+                    report["errors"].append((line_number, str(e)))
+                    continue
+                if len(chunk) >= chunk_size:
+                    self._insert_chunk(chunk, report)
+                    chunk = []
+        if chunk:
+            self._insert_chunk(chunk, report)
+        if self.car_cache and report["imported"]:
+            self.car_cache.invalidate_availability()
+        return report
+
+    # -------------------- Export --------------------
+
+    def iter_cars(self, chunk_size=1000):
+        """
+        Yields every car ordered by car_id, fetching one page at a time.
+
+        :param chunk_size: Number of rows fetched per query.
+        :return: A generator of Car objects.
+        """
+        last_id = 0
+        while True:
+            with self.db_connection.connect(read_only=True) as conn:
+                cursor = conn.cursor()
+                cursor.execute(select_cars_page, (last_id, chunk_size))
+                rows = cursor.fetchall()
+                description = cursor.description
+                cursor.close()
+            yield from Car.from_rows(rows, description)
+            if len(rows) < chunk_size:
+                return
+            last_id = rows[-1][0]
+
+    def export_cars(self, path, file_format=None, chunk_size=1000):
+        """
+        Exports every car to a CSV or JSON Lines file.
+
+        :param path: Path of the file to write.
+        :param file_format: 'csv' or 'jsonl'; detected from the extension when omitted.
+        :param chunk_size: Number of rows fetched per query.
+        :return: The number of cars written.
+        """
+        file_format = self._detect_format(path, file_format)
+        if file_format not in ("csv", "jsonl"):
+            raise ValueError(f"Unsupported export format '{file_format}'.")
+        count = 0
+        with open(path, "w", newline="", encoding="utf-8") as handle:
+            writer = csv.DictWriter(handle, fieldnames=CAR_FIELDS) if file_format == "csv" else None
+            if writer:
+                writer.writeheader()
+            for car in self.iter_cars(chunk_size):
+                data = car.to_dict()
+                data["available_now"] = bool(data["available_now"])
+                if writer:
+                    writer.writerow(data)
+                else:
+                    data["daily_rate"] = str(data["daily_rate"])
+                    handle.write(json.dumps(data) + "\n")
+                count += 1
+        return count
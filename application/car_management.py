@@ -1,4 +1,7 @@
-from database.queries import add_car, select_available_cars, update_car, delete_car
+from database.queries import (
+    add_car, select_available_cars, update_car, delete_car, delete_car_bookings, car_search_sort_columns,
+    car_search_sort_keys,
+)
 from data_models.car import Car
 
 class CarManagement:
@@ -6,13 +9,15 @@ class CarManagement:
     Manages car-related operations such as adding, updating, and retrieving cars.
     """
 
-    def __init__(self, db_connection):
+    def __init__(self, db_connection, car_cache=None):
         """
         Initializes the CarManager with a database connection.
 
         :param db_connection: The database connection object.
+        :param car_cache: Optional CarCache shared with the other services; writes invalidate it.
         """
         self.db_connection = db_connection
+        self.car_cache = car_cache
 
     def add_car(self, car):
         """
@@ -30,6 +35,8 @@ class CarManagement:
                      car.max_rent_period, car.daily_rate),
                 )
                 conn.commit()
+                if self.car_cache:
+                    self.car_cache.invalidate_availability()
 
         except Exception as e:
             print(f"Error while adding car: {e}")
@@ -40,25 +47,19 @@ class CarManagement:
 
         :return: A list of Car objects for available cars.
         """
+        version, read_only = None, True
+        if self.car_cache:
+            cached = self.car_cache.get_available_cars()
+            if cached is not None:
+                return cached
+            version, read_only = self.car_cache.fill_ticket()
         try:
-            with self.db_connection.connect() as conn:
+            with self.db_connection.connect(read_only=read_only) as conn:
                 cursor = conn.cursor()
                 cursor.execute(select_available_cars)
-                cars_data = cursor.fetchall()
-                cars = [
-                    Car(
-                        car_id=row[0],
-                        make=row[1],
-                        model=row[2],
-                        year=row[3],
-                        mileage=row[4],
-                        available_now=row[5],
-                        min_rent_period=row[6],
-                        max_rent_period=row[7],
-                        daily_rate=row[8],
-                    )
-                    for row in cars_data
-                ]
+                cars = Car.from_cursor(cursor)
+                if self.car_cache:
+                    self.car_cache.set_available_cars(cars, version)
                 return cars
         except Exception as e:
             print(f"Error while retrieving cars: {e}")
@@ -71,23 +72,22 @@ class CarManagement:
         :param car_id: The ID of the car to retrieve.
         :return: A Car object if found, None otherwise.
         """
+        version = None
+        if self.car_cache:
+            cached = self.car_cache.get(car_id)
+            if cached is not None:
+                return cached
+            version, _ = self.car_cache.fill_ticket()
         try:
             with self.db_connection.connect() as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT * FROM car_management WHERE car_id = %s", (car_id,))
                 car_data = cursor.fetchone()
                 if car_data:
-                    return Car(
-                        car_id=car_data[0],
-                        make=car_data[1],
-                        model=car_data[2],
-                        year=car_data[3],
-                        mileage=car_data[4],
-                        available_now=car_data[5],
-                        min_rent_period=car_data[6],
-                        max_rent_period=car_data[7],
-                        daily_rate=car_data[8]
-                    )
+                    car = Car.from_row(car_data, cursor.description)
+                    if self.car_cache:
+                        self.car_cache.put(car, version)
+                    return car
                 return None
         except Exception as e:
             print(f"Error while retrieving car: {e}")
@@ -113,6 +113,8 @@ class CarManagement:
                 cursor.execute(update_car,
                                (make, model, year, mileage, available, min_rent_period, max_rent_period, car_id))
                 conn.commit()
+                if self.car_cache:
+                    self.car_cache.invalidate(car_id)
                 print(f"Car with ID {car_id} updated successfully.")
         except Exception as e:
             print(f"Error while updating car: {e}")
@@ -128,10 +130,12 @@ class CarManagement:
             with self.db_connection.connect() as conn:
                 cursor = conn.cursor()
                 # Delete related rental bookings first
-                cursor.execute("DELETE FROM rental_booking WHERE car_id = %s", (car_id,))
+                cursor.execute(delete_car_bookings, (car_id,))
                 # Now delete the car
                 cursor.execute(delete_car, (car_id,))
                 conn.commit()
+                if self.car_cache:
+                    self.car_cache.invalidate(car_id)
 
         except Exception as e:
             print(f"Error while deleting car: {e}")
@@ -142,25 +146,19 @@ class CarManagement:
 
         :return: A list of Car objects for available cars.
         """
+        version, read_only = None, True
+        if self.car_cache:
+            cached = self.car_cache.get_available_cars()
+            if cached is not None:
+                return cached
+            version, read_only = self.car_cache.fill_ticket()
         try:
-            with self.db_connection.connect() as conn:
+            with self.db_connection.connect(read_only=read_only) as conn:
                 cursor = conn.cursor()
                 cursor.execute(select_available_cars)
-                cars_data = cursor.fetchall()
-                cars = [
-                    Car(
-                        car_id=row[0],
-                        make=row[1],
-                        model=row[2],
-                        year=row[3],
-                        mileage=row[4],
-                        available_now=row[5],
-                        min_rent_period=row[6],
-                        max_rent_period=row[7],
-                        daily_rate=row[8],
-                    )
-                    for row in cars_data
-                ]
+                cars = Car.from_cursor(cursor)
+                if self.car_cache:
+                    self.car_cache.set_available_cars(cars, version)
                 return cars
         except Exception as e:
             print(f"Error while retrieving cars: {e}")
@@ -173,25 +171,93 @@ class CarManagement:
         :return: A list of Car objects for all cars.
         """
         try:
-            with self.db_connection.connect() as conn:
+            with self.db_connection.connect(read_only=True) as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT * FROM car_management")
-                cars_data = cursor.fetchall()
-                cars = [
-                    Car(
-                        car_id=row[0],
-                        make=row[1],
-                        model=row[2],
-                        year=row[3],
-                        mileage=row[4],
-                        available_now=row[5],
-                        min_rent_period=row[6],
-                        max_rent_period=row[7],
-                        daily_rate=row[8],
-                    )
-                    for row in cars_data
-                ]
+                cars = Car.from_cursor(cursor)
                 return cars
         except Exception as e:
             print(f"Error while retrieving cars: {e}")
-            return []
\ No newline at end of file
+            return []
+
+    def search_cars(self, make=None, model=None, year_min=None, year_max=None, rate_min=None, rate_max=None,
+                    rental_days=None, available=None, sort_by="car_id", descending=False, page_size=20,
+                    after=None):
+        """
+        Searches cars with server-side filtering, sorting and keyset pagination.
+
+        :param make: Exact make to match.
+        :param model: Exact model to match.
+        :param year_min: Lowest manufacturing year.
+        :param year_max: Highest manufacturing year.
+        :param rate_min: Lowest daily rate.
+        :param rate_max: Highest daily rate.
+        :param rental_days: Only cars whose min/max rent period allows a rental of this many days.
+        :param available: True/False to filter on available_now; None for all cars.
+        :param sort_by: One of car_id, make (then model), year, mileage, daily_rate; ties are ordered by car_id.
+        :param descending: Sort in descending order.
+        :param page_size: Maximum number of cars returned.
+        :param after: Cursor returned by the previous page, or None for the first page.
+        :return: A tuple (list of Car objects, cursor for the next page or None).
+        :raises ValueError: If sort_by is not a sortable column or after does not fit it.
+        """
+        if sort_by not in car_search_sort_columns:
+            raise ValueError(f"Cannot sort cars by '{sort_by}'.")
+        keys = car_search_sort_keys[sort_by] + ("car_id",)
+        if after is not None and len(after) != len(keys):
+            raise ValueError("Invalid 'after' cursor.")
+        conditions = []
+        params = []
+        for column, operator, value in (
+            ("make", "=", make),
+            ("model", "=", model),
+            ("year", ">=", year_min),
+            ("year", "<=", year_max),
+            ("daily_rate", ">=", rate_min),
+            ("daily_rate", "<=", rate_max),
+            ("min_rent_period", "<=", rental_days),
+            ("max_rent_period", ">=", rental_days),
+        ):
+            if value is not None:
+                conditions.append(f"{column} {operator} %s")
+                params.append(value)
+        if available is not None:
+            conditions.append("available_now = %s")
+            params.append(1 if available else 0)
+
+        comparison = "<" if descending else ">"
+        direction = "DESC" if descending else "ASC"
+        if after is not None:
+            # Rows after the cursor in (key1, key2, ..., car_id) order, spelled out so MySQL can
+            # use the index range: k1 > v1 OR (k1 = v1 AND k2 > v2) OR ...
+            alternatives = []
+            for index, column in enumerate(keys):
+                alternatives.append(" AND ".join([f"{key} = %s" for key in keys[:index]]
+                                                 + [f"{column} {comparison} %s"]))
+                params.extend(after[:index + 1])
+            conditions.append("(" + " OR ".join(f"({alternative})" for alternative in alternatives) + ")")
+
+        query = "SELECT * FROM car_management"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY " + ", ".join(f"{key} {direction}" for key in keys)
+        query += " LIMIT %s"
+        params.append(page_size + 1)
+
+        try:
+            with self.db_connection.connect(read_only=True) as conn:
+                cursor = conn.cursor()
+                cursor.execute(query, tuple(params))
+                cars_data = cursor.fetchall()
+                description = cursor.description
+                cursor.close()
+        except Exception as e:
+            print(f"Error while searching cars: {e}")
+            return [], None
+
+        cars = Car.from_rows(cars_data[:page_size], description)
+        next_cursor = None
+        if len(cars_data) > page_size and cars:
+            last = cars[-1]
+            next_cursor = tuple(getattr(last, key) for key in keys)
+        return cars, next_cursor
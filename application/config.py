@@ -1,4 +1,4 @@
-from decouple import config
+from decouple import config, Csv
 
 # Database Configuration
 DatabaseConfig = {
@@ -9,3 +9,94 @@ DatabaseConfig = {
     'port': config('DB_PORT', cast=int, default=3306),        # MySQL server port
 }
 
+
+# Connection Pool Configuration
+DatabasePoolConfig = {
+    'min_size': config('DB_POOL_MIN_SIZE', cast=int, default=1),                  # Connections kept open at all times
+    'max_size': config('DB_POOL_MAX_SIZE', cast=int, default=5),                  # Upper bound on open connections
+    'checkout_timeout': config('DB_POOL_CHECKOUT_TIMEOUT', cast=float, default=10.0),  # Seconds to wait for a free connection
+    'idle_timeout': config('DB_POOL_IDLE_TIMEOUT', cast=float, default=300.0),    # Seconds before surplus idle connections close
+}
+
+# Read Replica Configuration
+# DB_REPLICA_HOSTS is a comma-separated list of host[:port] entries sharing the primary's credentials.
+ReplicaConfigs = [
+    dict(DatabaseConfig, host=entry.partition(':')[0], port=int(entry.partition(':')[2] or DatabaseConfig['port']))
+    for entry in config('DB_REPLICA_HOSTS', cast=Csv(), default='')
+]
+ReplicaRouterConfig = {
+    'max_replication_lag': config('DB_MAX_REPLICATION_LAG', cast=float, default=5.0),  # Seconds a replica may trail the primary
+    'lag_check_interval': config('DB_LAG_CHECK_INTERVAL', cast=float, default=5.0),    # Seconds between replica lag probes
+    'use_standalone': config('DB_REPLICA_STANDALONE', cast=bool, default=False),      # Use non-replicating servers as replicas (testing)
+}
+
+# Car Catalogue Cache Configuration
+CarCacheConfig = {
+    'max_size': config('CAR_CACHE_MAX_SIZE', cast=int, default=1024),  # Cars kept in memory (LRU)
+    'ttl': config('CAR_CACHE_TTL', cast=float, default=60.0),          # Seconds before a cached car is re-read
+}
+
+# Availability Engine Configuration
+AvailabilityConfig = {
+    'max_age': config('AVAILABILITY_MAX_AGE', cast=float, default=60.0),  # Seconds before date-range searches reload bookings
+}
+
+# Password Hashing Configuration
+PasswordHasherConfig = {
+    'rounds': config('BCRYPT_ROUNDS', cast=int, default=12),               # bcrypt work factor for new hashes
+    'workers': config('PASSWORD_HASH_WORKERS', cast=int, default=0) or None,  # Worker processes (0 = CPU count)
+}
+# Target seconds per bcrypt verification; when set, the work factor is calibrated at startup (0 = use BCRYPT_ROUNDS)
+PasswordHashTargetSeconds = config('BCRYPT_TARGET_SECONDS', cast=float, default=0.0)
+
+# Session Configuration
+SessionConfig = {
+    'secret': config('SESSION_SECRET', default=''),                # Token signing key (random per process when empty; required with SESSION_PERSIST)
+    'ttl': config('SESSION_TTL', cast=float, default=1800.0),       # Seconds of inactivity before a session expires
+    'max_sessions': config('SESSION_MAX', cast=int, default=10000), # Sessions kept in memory (LRU)
+    'sweep_interval': config('SESSION_SWEEP_INTERVAL', cast=float, default=60.0),  # Seconds between sweeps of expired sessions
+}
+PersistSessions = config('SESSION_PERSIST', cast=bool, default=False)  # Also store sessions in user_sessions (needs SESSION_SECRET)
+
+# Keep the daily_revenue, car_utilisation and customer_spend tables up to date and read the admin
+# reports from them (apply migration 4 and run "python application/summaries.py rebuild" before enabling)
+MaintainSummaries = config('SUMMARY_TABLES', cast=bool, default=False)
+
+# Dynamic Pricing Configuration
+PricingConfig = {
+    'weekend_multiplier': config('PRICING_WEEKEND_MULTIPLIER', cast=float, default=1.0),          # Saturday/Sunday rate multiplier
+    'seasons': config('PRICING_SEASONS', cast=Csv(), default=''),                                 # 'MM-DD:MM-DD:multiplier' entries
+    'long_rental_days': config('PRICING_LONG_RENTAL_DAYS', cast=int, default=0),                  # Rental length that earns the discount (0 = off)
+    'long_rental_multiplier': config('PRICING_LONG_RENTAL_MULTIPLIER', cast=float, default=1.0),  # Total multiplier for long rentals
+    'demand_threshold': config('PRICING_DEMAND_THRESHOLD', cast=float, default=0.0),              # Fleet occupancy that triggers surge pricing (0 = off)
+    'demand_multiplier': config('PRICING_DEMAND_MULTIPLIER', cast=float, default=1.0),            # Rate multiplier on high-demand days
+    'horizon_days': config('PRICING_HORIZON_DAYS', cast=int, default=400),                        # Days ahead covered by the rate tables
+    'refresh_interval': config('PRICING_REFRESH_INTERVAL', cast=float, default=300.0),            # Seconds between demand recomputations
+}
+DynamicPricing = config('DYNAMIC_PRICING', cast=bool, default=False)  # Quote rentals through the PricingEngine
+
+# Login Rate Limiting Configuration
+LoginRateLimitConfig = {
+    'account_capacity': config('LOGIN_ACCOUNT_BURST', cast=int, default=5),              # Attempts per username/email before throttling
+    'account_refill_rate': config('LOGIN_ACCOUNT_RATE', cast=float, default=1 / 60),     # Attempts per second regained per account
+    'client_capacity': config('LOGIN_CLIENT_BURST', cast=int, default=20),               # Attempts per client before throttling
+    'client_refill_rate': config('LOGIN_CLIENT_RATE', cast=float, default=1 / 6),        # Attempts per second regained per client
+    'sweep_batch': config('LOGIN_LIMIT_SWEEP_BATCH', cast=int, default=32),             # Idle buckets dropped per login attempt
+}
+
+# Unknown Account Filter Configuration
+AccountFilterConfig = {
+    'capacity': config('ACCOUNT_FILTER_CAPACITY', cast=int, default=100000),          # Minimum keys the Bloom filter is sized for
+    'error_rate': config('ACCOUNT_FILTER_ERROR_RATE', cast=float, default=0.01),      # Bloom filter false-positive rate
+    'negative_ttl': config('ACCOUNT_NEGATIVE_TTL', cast=float, default=30.0),         # Seconds a missing account is remembered
+    'negative_max_size': config('ACCOUNT_NEGATIVE_MAX', cast=int, default=10000),     # Missing accounts kept in memory
+    'sync_interval': config('ACCOUNT_FILTER_SYNC_INTERVAL', cast=float, default=1.0), # Seconds between checks for accounts registered elsewhere
+}
+
+# HTTP API Configuration
+ApiConfig = {
+    'host': config('API_HOST', default='127.0.0.1'),                          # Interface the API listens on
+    'port': config('API_PORT', cast=int, default=8000),                       # Port the API listens on
+    'workers': config('API_WORKERS', cast=int, default=0),                    # Worker processes (0 = CPU count with shared sessions, else 1)
+    'executor_threads': config('API_EXECUTOR_THREADS', cast=int, default=0) or None,  # Threads per worker for blocking calls (0 = pool size)
+}
@@ -0,0 +1,405 @@
+import os
+import sys
+
+if __name__ == "__main__":
+    # Allow "python application/fleet_frame.py" as well as "python -m application.fleet_frame"
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import struct
+from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+import numpy as np
+from database.queries import select_cars_page
+from data_models.car import Car
+
+# Numeric columns and their array types; daily rates are held as integer cents so sums are exact.
+NUMERIC_COLUMNS = {
+    "car_id": np.int64,
+    "year": np.int32,
+    "mileage": np.int64,
+    "available_now": np.bool_,
+    "min_rent_period": np.int32,
+    "max_rent_period": np.int32,
+    "daily_rate_cents": np.int64,
+}
+# Dictionary-encoded text columns: an int32 code per car indexing a small array of distinct values.
+CATEGORY_COLUMNS = ("make", "model")
+GROUP_KEYS = CATEGORY_COLUMNS + ("year", "available_now", "min_rent_period", "max_rent_period")
+
+SNAPSHOT_MAGIC = b"FLEETFR1"
+SNAPSHOT_ALIGNMENT = 64
+
+
+def _to_cents(rate):
+    return int(Decimal(str(rate)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP) * 100)
+
+
+class FleetFrame:
+    """
+    Column-oriented, array-backed snapshot of the car fleet for analytics.
+
+    Each car attribute is one typed NumPy array (make and model are dictionary-encoded as
+    int32 codes into arrays of distinct values), so filters and group-bys run as vectorised
+    operations over whole columns instead of loops over Car objects. A frame can be saved to a
+    snapshot file and opened again with load_snapshot(), which memory-maps the arrays: analysis
+    scripts start without querying MySQL and only touch the pages of the columns they use.
+    """
+
+    def __init__(self, columns, dictionaries):
+        """
+        Creates a frame from column arrays.
+
+        :param columns: A dictionary with an array per NUMERIC_COLUMNS entry and an int32 code array
+                        per CATEGORY_COLUMNS entry, all of the same length.
+        :param dictionaries: A dictionary of category column -> array of distinct values.
+        """
+        self.columns = columns
+        self.dictionaries = dictionaries
+
+    # -------------------- Construction --------------------
+
+    @classmethod
+    def from_rows(cls, rows, description=None):
+        """
+        Builds a frame from car_management rows.
+
+        :param rows: An iterable of row tuples.
+        :param description: The cursor description (or column names); defaults to the car_management column order.
+        :return: A FleetFrame.
+        """
+        builder = _FrameBuilder(description)
+        builder.extend(rows)
+        return builder.build()
+
+    @classmethod
+    def from_cars(cls, cars):
+        """
+        Builds a frame from Car objects.
+
+        :param cars: An iterable of Car objects.
+        :return: A FleetFrame.
+        """
+        return cls.from_rows(((getattr(car, field) for field in Car.FIELDS) for car in cars), Car.FIELDS)
+
+    @classmethod
+    def load(cls, db_connection, chunk_size=10000):
+        """
+        Loads the whole car_management table, one keyset page at a time.
+
+        Each page is appended to the column buffers and discarded, so no Car objects are created.
+
+        :param db_connection: The database connection object.
+        :param chunk_size: Rows fetched per query.
+        :return: A FleetFrame.
+        """
+        builder = None
+        last_id = 0
+        while True:
+            with db_connection.connect(read_only=True) as conn:
+                cursor = conn.cursor()
+                cursor.execute(select_cars_page, (last_id, chunk_size))
+                rows = cursor.fetchall()
+                if builder is None:
+                    builder = _FrameBuilder(cursor.description)
+                cursor.close()
+            builder.extend(rows)
+            if len(rows) < chunk_size:
+                return builder.build()
+            last_id = rows[-1][builder.car_id_index]
+
+    # -------------------- Access --------------------
+
+    def __len__(self):
+        return len(self.columns["car_id"])
+
+    def __repr__(self):
+        return f"<FleetFrame {len(self)} cars, {len(self.dictionaries['make'])} makes>"
+
+    def column(self, name):
+        """
+        Returns one column as an array: category columns are decoded to strings and
+        'daily_rate' is returned as float64 (use 'daily_rate_cents' for exact values).
+
+        :param name: A column name.
+        :return: A NumPy array.
+        """
+        if name in CATEGORY_COLUMNS:
+            return self.dictionaries[name][self.columns[name]]
+        if name == "daily_rate":
+            return self.columns["daily_rate_cents"] / 100.0
+        return self.columns[name]
+
+    def code(self, column, value):
+        """
+        Returns the dictionary code of a make or model, or -1 if no car has it.
+        """
+        matches = np.flatnonzero(self.dictionaries[column] == value)
+        return int(matches[0]) if len(matches) else -1
+
+    # -------------------- Filters --------------------
+
+    def mask(self, make=None, model=None, year_min=None, year_max=None, mileage_min=None, mileage_max=None,
+             rate_min=None, rate_max=None, available=None):
+        """
+        Builds a boolean mask of the cars matching every given condition (bounds are inclusive).
+
+        :param make: Make to match.
+        :param model: Model to match.
+        :param year_min: Earliest year.
+        :param year_max: Latest year.
+        :param mileage_min: Lowest mileage.
+        :param mileage_max: Highest mileage.
+        :param rate_min: Lowest daily rate.
+        :param rate_max: Highest daily rate.
+        :param available: True/False to match available_now.
+        :return: A boolean array with one entry per car.
+        """
+        columns = self.columns
+        mask = np.ones(len(self), dtype=bool)
+        for column, value in (("make", make), ("model", model)):
+            if value is not None:
+                mask &= columns[column] == self.code(column, value)
+        for column, low, high in (
+            ("year", year_min, year_max),
+            ("mileage", mileage_min, mileage_max),
+            ("daily_rate_cents", None if rate_min is None else _to_cents(rate_min),
+             None if rate_max is None else _to_cents(rate_max)),
+        ):
+            if low is not None:
+                mask &= columns[column] >= low
+            if high is not None:
+                mask &= columns[column] <= high
+        if available is not None:
+            mask &= columns["available_now"] == bool(available)
+        return mask
+
+    def where(self, mask=None, **conditions):
+        """
+        Returns a new frame with the matching cars.
+
+        :param mask: A boolean mask (or index array); built from conditions when omitted.
+        :param conditions: Keyword arguments for mask().
+        :return: A FleetFrame sharing the dictionaries of this one.
+        """
+        if mask is None:
+            mask = self.mask(**conditions)
+        return FleetFrame({name: np.asarray(values)[mask] for name, values in self.columns.items()},
+                          self.dictionaries)
+
+    # -------------------- Group-Bys --------------------
+
+    def group_by(self, key, mask=None):
+        """
+        Aggregates the fleet per value of a column.
+
+        :param key: One of GROUP_KEYS, or a tuple of them for a multi-column grouping.
+        :param mask: Optional boolean mask restricting the cars aggregated.
+        :return: A list of dictionaries, one per group (make and model in order of first appearance,
+                 other keys ascending), with the key column(s), cars,
+                 available, avg_daily_rate, min_daily_rate, max_daily_rate, avg_mileage and avg_year.
+        """
+        keys = (key,) if isinstance(key, str) else tuple(key)
+        for name in keys:
+            if name not in GROUP_KEYS:
+                raise ValueError(f"Cannot group by '{name}'.")
+        columns = self.columns if mask is None else {name: np.asarray(values)[mask]
+                                                     for name, values in self.columns.items()}
+        if not len(columns["car_id"]):
+            return []
+
+        # One integer per car identifying its group, and the distinct key tuples in sorted order.
+        key_values = np.stack([np.asarray(columns[name], dtype=np.int64) for name in keys], axis=1)
+        unique_keys, group = np.unique(key_values, axis=0, return_inverse=True)
+        group = group.reshape(-1)
+        groups = len(unique_keys)
+
+        cars = np.bincount(group, minlength=groups)
+        rate = np.asarray(columns["daily_rate_cents"], dtype=np.int64)
+        rate_sum = np.bincount(group, weights=rate, minlength=groups)
+        rate_min = np.full(groups, np.iinfo(np.int64).max)
+        rate_max = np.full(groups, np.iinfo(np.int64).min)
+        np.minimum.at(rate_min, group, rate)
+        np.maximum.at(rate_max, group, rate)
+        available = np.bincount(group, weights=columns["available_now"], minlength=groups)
+        mileage = np.bincount(group, weights=columns["mileage"], minlength=groups)
+        year = np.bincount(group, weights=columns["year"], minlength=groups)
+
+        result = []
+        for index in range(groups):
+            row = {}
+            for position, name in enumerate(keys):
+                value = int(unique_keys[index][position])
+                if name in CATEGORY_COLUMNS:
+                    value = str(self.dictionaries[name][value])
+                elif name == "available_now":
+                    value = bool(value)
+                row[name] = value
+            count = int(cars[index])
+            row.update(
+                cars=count,
+                available=int(available[index]),
+                avg_daily_rate=round(float(rate_sum[index]) / count / 100, 2),
+                min_daily_rate=int(rate_min[index]) / 100,
+                max_daily_rate=int(rate_max[index]) / 100,
+                avg_mileage=round(float(mileage[index]) / count, 1),
+                avg_year=round(float(year[index]) / count, 1),
+            )
+            result.append(row)
+        return result
+
+    # -------------------- Conversion --------------------
+
+    def to_cars(self, mask=None):
+        """
+        Materialises Car objects (for handing a filtered subset back to the services).
+
+        :param mask: Optional boolean mask or index array.
+        :return: A list of Car objects.
+        """
+        frame = self if mask is None else self.where(mask)
+        values = [
+            frame.column("car_id").tolist(),
+            frame.column("make").tolist(),
+            frame.column("model").tolist(),
+            frame.column("year").tolist(),
+            frame.column("mileage").tolist(),
+            frame.column("available_now").tolist(),
+            frame.column("min_rent_period").tolist(),
+            frame.column("max_rent_period").tolist(),
+            [Decimal(cents).scaleb(-2) for cents in frame.columns["daily_rate_cents"].tolist()],
+        ]
+        return [Car(*row) for row in zip(*values)]
+
+    # -------------------- Snapshots --------------------
+
+    def save_snapshot(self, path):
+        """
+        Writes the frame to a snapshot file that load_snapshot() can memory-map.
+
+        Layout: the magic bytes, an 8-byte header length, a JSON header (row count, dictionaries
+        and each column's dtype and offset from the start of the data), then every column as raw
+        little-endian array data, with the data and each column aligned to 64 bytes. The file is
+        written next to its destination and renamed into place, so readers never see a partial
+        snapshot.
+
+        :param path: Snapshot path.
+        :return: The number of cars written.
+        """
+        arrays = {name: np.ascontiguousarray(values, dtype=np.dtype(values.dtype).newbyteorder("<"))
+                  for name, values in self.columns.items()}
+        layout = {}
+        offset = 0
+        for name, values in arrays.items():
+            layout[name] = {"dtype": values.dtype.str, "offset": offset}
+            offset = self._align(offset + values.nbytes)
+        header = json.dumps({
+            "rows": len(self),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "columns": layout,
+            "dictionaries": {name: values.tolist() for name, values in self.dictionaries.items()},
+        }).encode("utf-8")
+        data_start = self._align(len(SNAPSHOT_MAGIC) + 8 + len(header))
+
+        temporary = f"{path}.tmp"
+        with open(temporary, "wb") as handle:
+            handle.write(SNAPSHOT_MAGIC + struct.pack("<Q", len(header)) + header)
+            for name, values in arrays.items():
+                handle.write(b"\0" * (data_start + layout[name]["offset"] - handle.tell()))
+                handle.write(values.tobytes())
+        os.replace(temporary, path)
+        return len(self)
+
+    @staticmethod
+    def _align(offset):
+        return -(-offset // SNAPSHOT_ALIGNMENT) * SNAPSHOT_ALIGNMENT
+
+    @classmethod
+    def load_snapshot(cls, path, mmap=True):
+        """
+        Opens a snapshot written by save_snapshot().
+
+        :param path: Snapshot path.
+        :param mmap: Memory-map the columns (read-only) instead of reading them into memory.
+        :return: A FleetFrame.
+        """
+        with open(path, "rb") as handle:
+            if handle.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+                raise ValueError(f"{path} is not a fleet snapshot.")
+            (header_length,) = struct.unpack("<Q", handle.read(8))
+            header = json.loads(handle.read(header_length))
+            data_start = cls._align(len(SNAPSHOT_MAGIC) + 8 + header_length)
+            rows = header["rows"]
+            columns = {}
+            for name, spec in header["columns"].items():
+                dtype = np.dtype(spec["dtype"])
+                if mmap and rows:
+                    columns[name] = np.memmap(path, dtype=dtype, mode="r", offset=data_start + spec["offset"],
+                                              shape=(rows,))
+                else:
+                    handle.seek(data_start + spec["offset"])
+                    columns[name] = np.fromfile(handle, dtype=dtype, count=rows)
+        dictionaries = {name: np.array(values, dtype=np.str_) for name, values in header["dictionaries"].items()}
+        return cls(columns, dictionaries)
+
+
+class _FrameBuilder:
+    """Accumulates rows into per-column buffers and dictionaries, then freezes them into a FleetFrame."""
+
+    def __init__(self, description=None):
+        names = [column if isinstance(column, str) else column[0] for column in (description or Car.FIELDS)]
+        self.index = {name: names.index(name) for name in Car.FIELDS}
+        self.car_id_index = self.index["car_id"]
+        self.codes = {name: {} for name in CATEGORY_COLUMNS}
+        self.values = {name: [] for name in list(NUMERIC_COLUMNS) + list(CATEGORY_COLUMNS)}
+
+    def extend(self, rows):
+        index, values, codes = self.index, self.values, self.codes
+        rate_cents = {}  # Fleets share a handful of rates; convert each distinct one once
+        for row in rows:
+            row = tuple(row)
+            for name in ("car_id", "year", "mileage", "min_rent_period", "max_rent_period"):
+                values[name].append(row[index[name]])
+            values["available_now"].append(bool(row[index["available_now"]]))
+            rate = row[index["daily_rate"]]
+            cents = rate_cents.get(rate)
+            if cents is None:
+                cents = rate_cents[rate] = _to_cents(rate)
+            values["daily_rate_cents"].append(cents)
+            for name in CATEGORY_COLUMNS:
+                dictionary = codes[name]
+                value = row[index[name]]
+                code = dictionary.get(value)
+                if code is None:
+                    code = dictionary[value] = len(dictionary)
+                values[name].append(code)
+
+    def build(self):
+        columns = {name: np.array(self.values[name], dtype=dtype) for name, dtype in NUMERIC_COLUMNS.items()}
+        for name in CATEGORY_COLUMNS:
+            columns[name] = np.array(self.values[name], dtype=np.int32)
+        dictionaries = {name: np.array([str(value) for value in self.codes[name]], dtype=np.str_)
+                        for name in CATEGORY_COLUMNS}
+        return FleetFrame(columns, dictionaries)
+
+
+if __name__ == "__main__":
+    import time
+    from application.config import DatabaseConfig
+    from database.db_connection import DatabaseConnection
+
+    if len(sys.argv) != 3 or sys.argv[1] not in ("snapshot", "summary"):
+        print("Usage: python -m application.fleet_frame snapshot <path>   (write a snapshot from the database)\n"
+              "       python -m application.fleet_frame summary <path>    (group a snapshot by make)")
+        sys.exit(2)
+    command, snapshot_path = sys.argv[1], sys.argv[2]
+    started = time.perf_counter()
+    if command == "snapshot":
+        frame = FleetFrame.load(DatabaseConnection.get('primary', DatabaseConfig))
+        frame.save_snapshot(snapshot_path)
+        print(f"Wrote {len(frame)} cars to {snapshot_path} in {time.perf_counter() - started:.2f}s")
+    else:
+        frame = FleetFrame.load_snapshot(snapshot_path)
+        for group in frame.group_by("make"):
+            print(group)
+        print(f"{len(frame)} cars summarised in {time.perf_counter() - started:.3f}s")
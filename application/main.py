@@ -1,11 +1,15 @@
 import os
 import sys
 
-# Set the working directory to the project directory
-project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-sys.path.insert(0, project_dir)
+if __name__ == "__main__":
+    # Set the working directory to the project directory. Only when run as a script: on spawn
+    # platforms (Windows, macOS) every password hashing worker re-imports this module as
+    # __mp_main__, and must not repeat start-up side effects (it inherits sys.path anyway).
+    project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path.insert(0, project_dir)
 
 import time
+import multiprocessing
 
 from datetime import datetime
 from tabulate import tabulate
@@ -14,8 +18,22 @@ from application.user_management import UserManagement
 from application.car_management import CarManagement
 from application.rental_booking import RentalBooking
 from application.rental_management import RentalManagement
+from application.car_cache import CarCache
+from application.availability import AvailabilityEngine
+from application.car_import_export import CarImportExport
+from application.password_hasher import PasswordHasher
+from application.session_manager import SessionManager
+from application.rate_limiter import LoginRateLimiter
+from application.account_filter import AccountFilter
+from application.reports import ReportEngine, EXPORT_TABLES
+from application.summaries import SummaryTables
+from application.pricing import PricingEngine
 from database.db_connection import DatabaseConnection
-from application.config import DatabaseConfig
+from application.config import DatabaseConfig, DatabasePoolConfig, ReplicaConfigs, ReplicaRouterConfig, \
+    CarCacheConfig, AvailabilityConfig, PasswordHasherConfig, PasswordHashTargetSeconds, SessionConfig, \
+    PersistSessions, LoginRateLimitConfig, AccountFilterConfig, MaintainSummaries, PricingConfig, DynamicPricing
+from database.replica_router import ReplicaRouter
+from database.queries import car_search_sort_columns
 from data_models.car import Car
 
 def clear_screen():
@@ -24,21 +42,43 @@ def clear_screen():
     else:
         os.system('clear')
 
-clear_screen()
 
 def main():
+    password_hasher = None
     try:
         # Initialize DatabaseConnection
-        db_connection = DatabaseConnection(DatabaseConfig)
+        db_connection = DatabaseConnection.get('primary', DatabaseConfig, pool_options=DatabasePoolConfig)
+        if ReplicaConfigs:
+            replicas = [
+                DatabaseConnection.get(f'replica_{index}', replica_config, pool_options=DatabasePoolConfig)
+                for index, replica_config in enumerate(ReplicaConfigs)
+            ]
+            db_connection = ReplicaRouter(db_connection, replicas, **ReplicaRouterConfig)
         db_connection.ping()  # Ensure the connection is alive
 
-        # Initialize services with the database connection
-        user_management = UserManagement(db_connection)
-        car_management = CarManagement(db_connection)
-        rental_booking = RentalBooking(db_connection)
-        rental_management = RentalManagement(db_connection)
+        # Initialize services with the database connection and a shared car catalogue cache
+        car_cache = CarCache(**CarCacheConfig)
+        availability = AvailabilityEngine(**AvailabilityConfig)
+        availability.load(db_connection)
+        password_hasher = PasswordHasher(**PasswordHasherConfig)
+        if PasswordHashTargetSeconds > 0:
+            password_hasher.calibrate(PasswordHashTargetSeconds)
+        account_filter = AccountFilter(**AccountFilterConfig)
+        account_filter.load(db_connection)
+        user_management = UserManagement(db_connection, password_hasher, LoginRateLimiter(**LoginRateLimitConfig),
+                                         account_filter)
+        car_management = CarManagement(db_connection, car_cache)
+        summaries = SummaryTables(db_connection) if MaintainSummaries else None
+        pricing = PricingEngine.from_config(**PricingConfig) if DynamicPricing else None
+        if pricing:
+            pricing.load_demand(db_connection, availability)
+        rental_booking = RentalBooking(db_connection, car_cache, availability, summaries, pricing)
+        rental_management = RentalManagement(db_connection, car_cache, availability, summaries)
+        car_import_export = CarImportExport(db_connection, car_cache)
+        session_manager = SessionManager(db_connection=db_connection if PersistSessions else None, **SessionConfig)
 
         while True:
+            session_manager.sweep_if_due()
             clear_screen()
             print("\n============================================")
             print("\tWelcome to Car Rental System")
@@ -55,10 +95,12 @@ def main():
             elif option == "2":
                 user = login_menu(user_management)
                 if user:
+                    session_token = session_manager.create_session(user)
                     if user.role == "admin":
-                        admin_menu(car_management, rental_management)
+                        admin_menu(car_management, rental_management, car_import_export, session_manager, session_token)
                     elif user.role == "customer":
-                        customer_menu(rental_booking, user.user_id)
+                        customer_menu(rental_booking, session_manager, session_token)
+                    session_manager.revoke(session_token)
 
             elif option == "3":
                 handle_payment(rental_booking)
@@ -69,6 +111,9 @@ def main():
                 print("Invalid choice. Please try again.")
     except Exception as e:
         print(f"An error occurred: {e}")
+    finally:
+        if password_hasher:
+            password_hasher.shutdown()
 
 #----------------------register_menu----------------------------
 def register_menu(user_management):
@@ -216,13 +261,17 @@ def login_menu(user_management):
 
 
 def handle_login(user_management):
-    clear_screen()
-    print("\n------------- Login -------------\n")
-    username = input("Enter username or email: ")
-    password = input("Enter password: ")
-    try:
-        print("Attempting to login...")
-        user = user_management.login_user(username, password)
+    while True:
+        clear_screen()
+        print("\n------------- Login -------------\n")
+        username = input("Enter username or email: ")
+        password = input("Enter password: ")
+        try:
+            print("Attempting to login...")
+            user = user_management.login_user(username, password)
+        except Exception as e:
+            print(f"Login failed: {e}")
+            return None
         if user:
             print(f"Login successful. Welcome, {user.username}!")
             time.sleep(2)
@@ -235,20 +284,17 @@ def handle_login(user_management):
                     return None  # Exit the login process
                 else:
                     print("Invalid choice. Please enter '1' or '2'.")
-        else:
-            print("Incorrect username or password.\n")
-            time.sleep(2)  # Wait for 5 seconds
-            while True:
-                exit_choice = input("Would you like to exit? (Yes/No): ").strip().lower()
-                if exit_choice == "yes":
-                    handle_login(user_management)
-                elif exit_choice == "no":
-                    break  # Retry login
-                else:
-                    print("Invalid choice. Please enter 'Yes' or 'No'.")
-    except Exception as e:
-        print(f"Login failed: {e}")
-        return None
+
+        print("Incorrect username or password.\n")
+        time.sleep(2)  # Wait for 2 seconds
+        while True:
+            exit_choice = input("Would you like to exit? (Yes/No): ").strip().lower()
+            if exit_choice in ("yes", "no"):
+                break
+            print("Invalid choice. Please enter 'Yes' or 'No'.")
+        if exit_choice == "yes":
+            return None
+        # "no": loop round and prompt for credentials again
 
 
 def handle_forgot_password(user_management):
@@ -290,8 +336,12 @@ def handle_forgot_password(user_management):
                 break
 
 #---------------------------admin_menu-------------------------------------
-def admin_menu(car_management, rental_management):
+def admin_menu(car_management, rental_management, car_import_export, session_manager, session_token):
     while True:
+        if not session_manager.authenticate(session_token):
+            print("Your session has expired. Please log in again.")
+            time.sleep(2)
+            break
         clear_screen()
         print("\n------------ Admin Menu -----------\n")
         print("1. Add Car")
@@ -302,7 +352,10 @@ def admin_menu(car_management, rental_management):
         print("6. Reject Rental Request")
         print("7. Returned Car")
         print("8. Generate Reports")
-        print("9. Logout\n")
+        print("9. Import Cars")
+        print("10. Export Cars")
+        print("11. Bulk Approve/Reject Rentals")
+        print("12. Logout\n")
 
         choice = input("Enter your choice: ")
 
@@ -329,8 +382,17 @@ def admin_menu(car_management, rental_management):
             return_car(rental_management)
         elif choice == "8":
             clear_screen()
-            generate_reports(rental_management)
+            generate_reports(rental_management, ReportEngine(rental_management.db_connection))
         elif choice == "9":
+            clear_screen()
+            import_cars(car_import_export)
+        elif choice == "10":
+            clear_screen()
+            export_cars(car_import_export)
+        elif choice == "11":
+            clear_screen()
+            bulk_review_rentals(rental_management)
+        elif choice == "12":
             print("Logging out...")
             break
         else:
@@ -379,6 +441,40 @@ def add_car(car_management):
             return
 
 
+def import_cars(car_import_export):
+    clear_screen()
+    print("\n------------- Import Cars -------------\n")
+    path = input("Enter path of the CSV or JSONL file to import: ").strip()
+    try:
+        report = car_import_export.import_cars(path)
+        print(f"Imported {report['imported']} cars.")
+        if report["errors"]:
+            print(f"{len(report['errors'])} rows were rejected:")
+            for line_number, message in report["errors"]:
+                print(f"  Line {line_number}: {message}")
+    except Exception as e:
+        print(f"Failed to import cars: {e}")
+    while True:
+        exit_choice = input("Do you want to exit? (Please enter yes): ").lower()
+        if exit_choice == "yes":
+            break
+
+
+def export_cars(car_import_export):
+    clear_screen()
+    print("\n------------- Export Cars -------------\n")
+    path = input("Enter path of the CSV or JSONL file to write: ").strip()
+    try:
+        count = car_import_export.export_cars(path)
+        print(f"Exported {count} cars to {path}.")
+    except Exception as e:
+        print(f"Failed to export cars: {e}")
+    while True:
+        exit_choice = input("Do you want to exit? (Please enter yes): ").lower()
+        if exit_choice == "yes":
+            break
+
+
 def update_car(car_management):
     clear_screen()
     print("\n------------- Update Cars -------------\n")
@@ -443,38 +539,59 @@ def delete_car(car_management):
             break  # Exit the loop if the user chooses not to delete another car
 
 
-def view_all_cars(car_management):
+def view_all_cars(car_management, page_size=20):
     clear_screen()
     print("\n\t\t\t------------------------------------ View All Cars ----------------------------")
+    make = input("Filter by make (leave blank for all): ").strip() or None
+    while True:
+        sort_by = input(f"Sort by ({'/'.join(car_search_sort_columns)}, blank for car_id): ").strip().lower() or "car_id"
+        if sort_by in car_search_sort_columns:
+            break
+        print(f"Cannot sort by '{sort_by}'.")
+    cursors = [None]  # cursors[i] is the 'after' cursor that fetches page i
     try:
-        cars = car_management.list_all_cars()  # Use a method that retrieves all cars
-        if cars:
-            table = [
-                [
-                    car.car_id,
-                    car.make,
-                    car.model,
-                    car.year,
-                    car.mileage,
-                    "Yes" if car.available_now else "No",  # Convert 0/1 to Yes/No
-                    car.min_rent_period,
-                    car.max_rent_period,
-                    f"NZD {car.daily_rate:,.2f}"  # Format the daily rate
+        while True:
+            cars, next_cursor = car_management.search_cars(make=make, sort_by=sort_by, page_size=page_size,
+                                                           after=cursors[-1])
+            clear_screen()
+            print(f"\n\t\t\t------------------------------------ View All Cars (Page {len(cursors)}) ----------------------------")
+            if cars:
+                table = [
+                    [
+                        car.car_id,
+                        car.make,
+                        car.model,
+                        car.year,
+                        car.mileage,
+                        "Yes" if car.available_now else "No",  # Convert 0/1 to Yes/No
+                        car.min_rent_period,
+                        car.max_rent_period,
+                        f"NZD {car.daily_rate:,.2f}"  # Format the daily rate
+                    ]
+                    for car in cars
                 ]
-                for car in cars
-            ]
-            headers = ["ID", "Make", "Model", "Year", "Mileage", "Available", "Min Rent Period",
-                       "Max Rent Period", "Daily Rate"]
-            print(tabulate(table, headers, tablefmt="grid"))
-            time.sleep(2)  # Wait for 2 seconds
-            while True:
-                exit_choice = input("Do you want to exit? (Please enter Yes): ").lower()
-                if exit_choice == "yes":
-                    break
-        else:
-            print("No cars available.")
+                headers = ["ID", "Make", "Model", "Year", "Mileage", "Available", "Min Rent Period",
+                           "Max Rent Period", "Daily Rate"]
+                print(tabulate(table, headers, tablefmt="grid"))
+            else:
+                print("No cars available.")
+
+            options = []
+            if next_cursor:
+                options.append("(N)ext")
+            if len(cursors) > 1:
+                options.append("(P)revious")
+            options.append("(E)xit")
+            choice = input(f"{', '.join(options)}: ").strip().lower()
+            if choice == "n" and next_cursor:
+                cursors.append(next_cursor)
+            elif choice == "p" and len(cursors) > 1:
+                cursors.pop()
+            elif choice in ("e", "exit", "yes"):
+                break
     except Exception as e:
         print(f"Failed to list cars: {e}")
+        time.sleep(2)
 
 def approve_rental(rental_management):
     clear_screen()
@@ -533,6 +650,37 @@ def reject_rental(rental_management):
         if choice == "yes":
             break
 
+def bulk_review_rentals(rental_management):
+    clear_screen()
+    print("\n---------- Bulk Approve/Reject Rentals ----------\n")
+    action = input("Enter (A)pprove or (R)eject: ").strip().lower()
+    if action not in ("a", "r"):
+        print("Invalid choice.")
+        time.sleep(2)
+        return
+    ids_input = input("Enter rental IDs separated by commas, or 'all' for every pending rental: ").strip().lower()
+    try:
+        if ids_input == "all":
+            rental_ids = None
+        else:
+            rental_ids = [int(rental_id) for rental_id in ids_input.replace(" ", "").split(",") if rental_id]
+        if action == "a":
+            results = rental_management.approve_rentals(rental_ids, status="pending")
+        else:
+            results = rental_management.reject_rentals(rental_ids, status="pending")
+        if results:
+            print(tabulate(sorted(results.items()), headers=["Rental ID", "Result"], tablefmt="grid"))
+        else:
+            print("No pending rentals found.")
+    except ValueError:
+        print("Rental IDs must be whole numbers.")
+    except Exception as e:
+        print(f"Error during bulk review: {e}")
+    while True:
+        choice = input("Do you want to exit? (Please enter yes): ").strip().lower()
+        if choice == "yes":
+            break
+
 def return_car(rental_management):
     clear_screen()
     print("\n------------- Return Car --------------\n")
@@ -550,18 +698,28 @@ def return_car(rental_management):
         print(f"Failed to return car: {e}")
 
 
-def generate_reports(rental_management):
+def generate_reports(rental_management, report_engine):
     clear_screen()
     print("\n------------- Generate Reports -------------\n")
+    start_date = input("Enter report start date (YYYY-MM-DD, blank for one year ago): ").strip() or None
+    end_date = input("Enter report end date (YYYY-MM-DD, blank for today): ").strip() or None
+    period = input("Group by (day/month/year, blank for month): ").strip().lower() or "month"
     try:
-        reports = rental_management.generate_reports()
-        print("\n--- Rental Reports ---")
-        if not reports:
+        reports = rental_management.generate_reports(start_date, end_date, period)
+        if not reports or not any(reports.values()):
             print("No rental reports available.")
-        else:
-            for report in reports:
-                print(report)
-                time.sleep(2)
+        for name, rows in reports.items():
+            print(f"\n--- {name.replace('_', ' ').title()} ---")
+            if rows:
+                print(tabulate([list(row.values()) for row in rows], headers=list(rows[0]), tablefmt="grid"))
+            else:
+                print("No data.")
+
+        path = input("\nExport a raw table? Enter a file path (.csv, .jsonl, .json, .cols) or leave blank: ").strip()
+        if path:
+            table = input(f"Table to export ({', '.join(EXPORT_TABLES)}): ").strip()
+            count = report_engine.export_table(table, path)
+            print(f"Exported {count} rows to {path}.")
     except Exception as e:
         print(f"Failed to generate reports: {e}")
 
@@ -570,8 +728,14 @@ def generate_reports(rental_management):
         if exit_choice == "yes":
             break
 
-def customer_menu(rental_booking, user_id):
+def customer_menu(rental_booking, session_manager, session_token):
     while True:
+        user = session_manager.authenticate(session_token)
+        if not user:
+            print("Your session has expired. Please log in again.")
+            time.sleep(2)
+            break
+        user_id = user.user_id
         clear_screen()
         print("\n------------ Customer Menu -------------\n")
         print("1. View Available Cars")
@@ -602,24 +766,39 @@ def customer_menu(rental_booking, user_id):
 
 
 
-def view_available_cars(rental_booking, user_id):
+def view_available_cars(rental_booking, user_id, page_size=20):
     try:
-        cars = rental_booking.get_available_cars()
+        start_date = input("Enter start date (YYYY-MM-DD) or leave blank to see all cars: ").strip()
+        end_date = input("Enter end date (YYYY-MM-DD): ").strip() if start_date else ""
+        cars = rental_booking.get_available_cars(start_date or None, end_date or None)
         if cars:
-            print("\n\t\t\t------------- Available Cars -------------\n")
-            table = [
-                [car.car_id, car.make, car.model, car.year, car.mileage, car.min_rent_period, car.max_rent_period, f"NZD {car.daily_rate:,.2f}"]
-                for car in cars
-            ]
-            headers = ["ID", "Make", "Model", "Year", "Mileage", "Min Rent Period", "Max Rent Period", "Daily Rate"]
-            print(tabulate(table, headers, tablefmt="grid"))
+            pages = (len(cars) + page_size - 1) // page_size
+            page = 0
             while True:
-                choice = input("Would you like to (1) book a car or (2) Exit? Enter 1 or 2: ").strip().lower()
+                clear_screen()
+                print(f"\n\t\t\t------------- Available Cars (Page {page + 1} of {pages}) -------------\n")
+                table = [
+                    [car.car_id, car.make, car.model, car.year, car.mileage, car.min_rent_period, car.max_rent_period, f"NZD {car.daily_rate:,.2f}"]
+                    for car in cars[page * page_size:(page + 1) * page_size]
+                ]
+                headers = ["ID", "Make", "Model", "Year", "Mileage", "Min Rent Period", "Max Rent Period", "Daily Rate"]
+                print(tabulate(table, headers, tablefmt="grid"))
+                options = ["(1) book a car"]
+                if page + 1 < pages:
+                    options.append("(N)ext page")
+                if page > 0:
+                    options.append("(P)revious page")
+                options.append("(2) Exit")
+                choice = input(f"Would you like to {', '.join(options)}? ").strip().lower()
                 if choice == "1":
                     book_car(rental_booking, user_id)
                     break
                 elif choice == "2":
                     return
+                elif choice == "n" and page + 1 < pages:
+                    page += 1
+                elif choice == "p" and page > 0:
+                    page -= 1
         else:
             print("\n\t\t\t------------- Available Cars -------------\n")
             print("No cars available.")
@@ -645,12 +824,14 @@ def book_car(rental_booking, user_id):
         start_date = input("Enter start date (YYYY-MM-DD): ")
         end_date = input("Enter end date (YYYY-MM-DD): ")
         try:
-            start_year = datetime.strptime(start_date, "%Y-%m-%d").year
-            end_year = datetime.strptime(end_date, "%Y-%m-%d").year
-            if start_year == current_year and end_year == current_year:
-                break
-            else:
+            start = datetime.strptime(start_date, "%Y-%m-%d")
+            end = datetime.strptime(end_date, "%Y-%m-%d")
+            if start.year != current_year or end.year != current_year:
                 print(f"Please enter dates within the current year {current_year}.")
+            elif end < start:
+                print("The end date must not be before the start date.")
+            else:
+                break
         except ValueError:
             print("Invalid date format. Please enter dates in YYYY-MM-DD format.")
 
@@ -658,8 +839,10 @@ def book_car(rental_booking, user_id):
         total_fee = rental_booking.calculate_fee(car_id, start_date, end_date)
         confirm = input(f"The total fee is {total_fee}. Confirm booking? (yes/no): ").lower()
         if confirm == "yes":
-            rental_booking.book_car(user_id, car_id, start_date, end_date, total_fee)
-            print("Booking confirmed!")
+            if rental_booking.book_car(user_id, car_id, start_date, end_date, total_fee):
+                print("Booking confirmed!")
+            else:
+                print("Booking could not be completed. Please choose other dates or another car.")
         else:
             print("Booking cancelled.")
 
@@ -740,4 +923,6 @@ def cancel_booking(rental_booking, user_id):
             cursor.close()
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Password hashing workers in the PyInstaller build
+    clear_screen()
     main()
\ No newline at end of file
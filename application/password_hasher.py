@@ -0,0 +1,206 @@
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+import bcrypt
+
+DEFAULT_ROUNDS = 12  # Same as bcrypt.gensalt()
+
+
+def hash_password(password, rounds):
+    """
+    Hashes a password with bcrypt.
+
+    :param password: The plain-text password.
+    :param rounds: The bcrypt work factor (log2 of the iteration count).
+    :return: The hash as a UTF-8 string.
+    """
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=rounds)).decode("utf-8")
+
+
+def check_password(password, password_hash):
+    """
+    Verifies a password against a bcrypt hash.
+
+    :param password: The plain-text password.
+    :param password_hash: The stored hash (str or bytes).
+    :return: True if the password matches.
+    """
+    if isinstance(password_hash, str):
+        password_hash = password_hash.encode("utf-8")
+    return bcrypt.checkpw(password.encode("utf-8"), password_hash)
+
+
+def hash_rounds(password_hash):
+    """
+    Reads the work factor from a bcrypt hash such as '$2b$12$...'.
+
+    :param password_hash: The stored hash (str or bytes).
+    :return: The work factor, or None if the hash is not in bcrypt format.
+    """
+    if isinstance(password_hash, (bytes, bytearray)):
+        password_hash = password_hash.decode("utf-8")
+    parts = password_hash.split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+def calibrate_rounds(target_seconds, min_rounds=10, max_rounds=16, probe_rounds=8):
+    """
+    Benchmarks this host and picks the highest work factor whose hash time stays within a target.
+
+    Each extra round doubles bcrypt's cost, so the time of a cheap probe hash is extrapolated and
+    the chosen factor is then measured once to correct for the extrapolation.
+
+    :param target_seconds: Desired time for one hash or verification.
+    :param min_rounds: Lowest work factor ever returned.
+    :param max_rounds: Highest work factor ever returned.
+    :param probe_rounds: Work factor of the benchmark hash.
+    :return: The chosen work factor.
+    """
+    def _timed(rounds):
+        started = time.perf_counter()
+        hash_password("calibration", rounds)
+        return time.perf_counter() - started
+
+    probe = min(_timed(probe_rounds) for _ in range(3))
+    rounds = probe_rounds
+    while rounds < max_rounds and probe * 2 ** (rounds + 1 - probe_rounds) <= target_seconds:
+        rounds += 1
+    rounds = max(min_rounds, rounds)
+    while rounds > min_rounds and _timed(rounds) > target_seconds * 1.5:
+        rounds -= 1
+    return rounds
+
+
+def chain_future(future, transform):
+    """
+    Returns a new Future resolved with transform(result) once future completes.
+
+    :param future: The source Future.
+    :param transform: Callable applied to the source result.
+    """
+    chained = Future()
+
+    def _done(source):
+        try:
+            chained.set_result(transform(source.result()))
+        except Exception as e:
+            chained.set_exception(e)
+
+    future.add_done_callback(_done)
+    return chained
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt hashing and verification on a pool of worker processes.
+
+    bcrypt costs hundreds of milliseconds of CPU per call at typical work factors. Running it in
+    separate processes keeps the rest of the application responsive and lets many logins be
+    verified in parallel across cores. Every call has a Future-returning variant; the plain
+    variants block until the result is ready.
+    """
+
+    def __init__(self, rounds=DEFAULT_ROUNDS, workers=None, use_processes=True):
+        """
+        Initializes the hasher.
+
+        :param rounds: bcrypt work factor used for new hashes.
+        :param workers: Number of worker processes (defaults to the CPU count).
+        :param use_processes: False to use threads instead, e.g. where processes cannot be spawned.
+        """
+        self.rounds = rounds
+        self.workers = workers or os.cpu_count() or 1
+        executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        self._executor = executor_class(max_workers=self.workers)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._max_pending = 0
+        self._completed = 0
+
+    def _submit(self, function, *args):
+        with self._lock:
+            self._pending += 1
+            self._max_pending = max(self._max_pending, self._pending)
+        future = self._executor.submit(function, *args)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_done(self, future):
+        with self._lock:
+            self._pending -= 1
+            self._completed += 1
+
+    def hash_async(self, password, rounds=None):
+        """
+        Hashes a password in a worker.
+
+        :param password: The plain-text password.
+        :param rounds: Optional work factor overriding the hasher's default.
+        :return: A Future resolving to the hash string.
+        """
+        return self._submit(hash_password, password, rounds or self.rounds)
+
+    def verify_async(self, password, password_hash):
+        """
+        Verifies a password in a worker.
+
+        :param password: The plain-text password.
+        :param password_hash: The stored hash.
+        :return: A Future resolving to True if the password matches.
+        """
+        return self._submit(check_password, password, password_hash)
+
+    def needs_rehash(self, password_hash):
+        """
+        Checks whether a stored hash uses a lower work factor than the current one.
+
+        Hashes are only ever upgraded: processes that calibrate to different work factors (the
+        CLI and each API worker calibrate on their own) would otherwise re-hash the same password
+        back and forth on every login. Stored hashes converge on the highest factor in use.
+
+        :param password_hash: The stored hash.
+        :return: True if the hash should be replaced on the next successful login.
+        """
+        rounds = hash_rounds(password_hash)
+        return rounds is None or rounds < self.rounds
+
+    def calibrate(self, target_seconds, min_rounds=10, max_rounds=16):
+        """
+        Benchmarks a worker and sets the work factor used for new hashes.
+
+        :param target_seconds: Desired time for one verification.
+        :param min_rounds: Lowest acceptable work factor.
+        :param max_rounds: Highest acceptable work factor.
+        :return: The chosen work factor.
+        """
+        self.rounds = self._executor.submit(calibrate_rounds, target_seconds, min_rounds, max_rounds).result()
+        return self.rounds
+
+    def hash(self, password, rounds=None):
+        """Hashes a password, blocking until a worker has finished."""
+        return self.hash_async(password, rounds).result()
+
+    def verify(self, password, password_hash):
+        """Verifies a password, blocking until a worker has finished."""
+        return self.verify_async(password, password_hash).result()
+
+    def stats(self):
+        """
+        Returns queue metrics.
+
+        :return: A dictionary with the current queue depth, its high-water mark, completed jobs and workers.
+        """
+        with self._lock:
+            return {
+                "queue_depth": self._pending,
+                "max_queue_depth": self._max_pending,
+                "completed": self._completed,
+                "workers": self.workers,
+            }
+
+    def shutdown(self, wait=True):
+        """Stops the worker pool."""
+        self._executor.shutdown(wait=wait)
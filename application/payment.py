@@ -5,12 +5,14 @@ class Payment:
     Handles payment processing for car rentals.
     """
 
-    def __init__(self, db_connection):
+    def __init__(self, db_connection, summaries=None):
         """
         Initialize the Payment class with a database connection.
         :param db_connection: The database connection object.
+        :param summaries: Optional SummaryTables updated in the same transaction as the payment.
         """
         self.db_connection = db_connection
+        self.summaries = summaries
 
     def process_payment(self, rental_id, amount):
         query = """
@@ -25,8 +27,13 @@ class Payment:
                 rental_id = int(rental_id)
                 amount = float(amount)
 
+                before = self.summaries.booking_state(cursor, rental_id) if self.summaries else None
+
                 # Execute the query
                 cursor.execute(query, (amount, rental_id))
+                if before:
+                    self.summaries.record_booking_change(
+                        cursor, before, dict(before, status="confirmed", amount_paid=amount))
                 conn.commit()
                 print("Payment processed successfully.")
                 return True
@@ -34,9 +41,11 @@ class Payment:
                 print("Invalid rental_id or amount type")
                 return False
             except mysql.connector.Error as db_err:
+                conn.rollback()
                 print(f"Database error processing payment: {db_err}")
                 return False
             except Exception as e:
+                conn.rollback()
                 print(f"Error processing payment: {e}")
                 return False
             finally:
@@ -0,0 +1,418 @@
+import abc
+import threading
+import time
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP
+import numpy as np
+from database.queries import count_cars
+from data_models.dates import to_ordinal
+
+UNIX_EPOCH = date(1970, 1, 1).toordinal()
+
+
+def _to_cents(amount):
+    return int(Decimal(str(amount)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP) * 100)
+
+
+def _month_day(text):
+    """Parses 'MM-DD' into the number MMDD."""
+    month, day = (int(part) for part in text.split("-"))
+    if not (1 <= month <= 12 and 1 <= day <= 31):
+        raise ValueError(f"Invalid month-day '{text}'.")
+    return month * 100 + day
+
+
+# -------------------- Rules --------------------
+
+class PricingRule(abc.ABC):
+    """
+    A price multiplier, optionally restricted to some cars.
+
+    Per-day rules (per_day = True) give a multiplier for each calendar day and are compiled
+    into the rate tables; length rules (per_day = False) scale a quote's total by the number of
+    days rented.
+    """
+
+    per_day = True
+
+    def __init__(self, car_ids=None):
+        """
+        :param car_ids: Cars the rule applies to; None for every car.
+        """
+        self.car_ids = None if car_ids is None else frozenset(car_ids)
+
+    def applies_to(self, car_id):
+        return self.car_ids is None or car_id in self.car_ids
+
+    @abc.abstractmethod
+    def multipliers(self, days):
+        """
+        Multipliers for an array of days.
+
+        :param days: An int64 array of day numbers (date.toordinal()).
+        :return: A float64 array of the same length.
+        """
+
+
+class SeasonalRule(PricingRule):
+    """Multiplies the rate between two month-days every year (the range may wrap past new year)."""
+
+    def __init__(self, start, end, multiplier, car_ids=None):
+        """
+        :param start: First day of the season ('MM-DD').
+        :param end: Last day of the season ('MM-DD'), inclusive.
+        :param multiplier: Rate multiplier inside the season.
+        :param car_ids: Cars the rule applies to; None for every car.
+        """
+        super().__init__(car_ids)
+        self.start = _month_day(start)
+        self.end = _month_day(end)
+        self.multiplier = float(multiplier)
+
+    def multipliers(self, days):
+        dates = (days - UNIX_EPOCH).astype("datetime64[D]")
+        months = dates.astype("datetime64[M]")
+        month_days = (months.astype(np.int64) % 12 + 1) * 100 + (dates - months).astype(np.int64) + 1
+        if self.start <= self.end:
+            inside = (month_days >= self.start) & (month_days <= self.end)
+        else:
+            inside = (month_days >= self.start) | (month_days <= self.end)
+        return np.where(inside, self.multiplier, 1.0)
+
+    def __repr__(self):
+        return f"<SeasonalRule {self.start:04d}-{self.end:04d} x{self.multiplier}>"
+
+
+class WeekendRule(PricingRule):
+    """Multiplies the rate on given weekdays (Saturday and Sunday by default)."""
+
+    def __init__(self, multiplier, weekdays=(5, 6), car_ids=None):
+        """
+        :param multiplier: Rate multiplier on those days.
+        :param weekdays: Weekday numbers as in date.weekday() (Monday is 0).
+        :param car_ids: Cars the rule applies to; None for every car.
+        """
+        super().__init__(car_ids)
+        self.multiplier = float(multiplier)
+        self.weekdays = tuple(weekdays)
+
+    def multipliers(self, days):
+        return np.where(np.isin((days - 1) % 7, self.weekdays), self.multiplier, 1.0)
+
+    def __repr__(self):
+        return f"<WeekendRule {self.weekdays} x{self.multiplier}>"
+
+
+class DemandRule(PricingRule):
+    """
+    Multiplies the rate on days when a large share of the fleet is already booked.
+
+    Occupancy is supplied by PricingEngine.refresh_demand(); days without data count as empty.
+    """
+
+    def __init__(self, tiers, car_ids=None):
+        """
+        :param tiers: (occupancy threshold 0-1, multiplier) pairs; the highest threshold reached applies.
+        :param car_ids: Cars the rule applies to; None for every car.
+        """
+        super().__init__(car_ids)
+        self.tiers = sorted((float(threshold), float(multiplier)) for threshold, multiplier in tiers)
+        self.first_day = 0
+        self.occupancy = np.zeros(0)
+
+    def set_occupancy(self, first_day, occupancy):
+        """
+        :param first_day: Day number of occupancy[0].
+        :param occupancy: Share of the fleet booked on each day from first_day.
+        """
+        self.first_day = first_day
+        self.occupancy = np.asarray(occupancy, dtype=np.float64)
+
+    def multipliers(self, days):
+        index = days - self.first_day
+        known = (index >= 0) & (index < len(self.occupancy))
+        occupancy = np.zeros(len(days))
+        occupancy[known] = self.occupancy[index[known]]
+        result = np.ones(len(days))
+        for threshold, multiplier in self.tiers:
+            result = np.where(occupancy >= threshold, multiplier, result)
+        return result
+
+    def __repr__(self):
+        return f"<DemandRule {self.tiers}>"
+
+
+class LongRentalRule(PricingRule):
+    """Scales the total of longer rentals, e.g. 10% off from 7 days."""
+
+    per_day = False
+
+    def __init__(self, tiers, car_ids=None):
+        """
+        :param tiers: (minimum days, multiplier) pairs; the longest minimum reached applies.
+        :param car_ids: Cars the rule applies to; None for every car.
+        """
+        super().__init__(car_ids)
+        self.tiers = sorted((int(min_days), float(multiplier)) for min_days, multiplier in tiers)
+
+    def multipliers(self, days):
+        return np.ones(len(days))  # Length rules leave the daily prices unchanged
+
+    def length_multiplier(self, days):
+        result = 1.0
+        for min_days, multiplier in self.tiers:
+            if days >= min_days:
+                result = multiplier
+        return result
+
+    def __repr__(self):
+        return f"<LongRentalRule {self.tiers}>"
+
+
+# -------------------- Engine --------------------
+
+class PricingEngine:
+    """
+    Quotes rental prices under seasonal, weekend, demand and long-rental rules.
+
+    For each car, the per-day rules are compiled once into a table of daily prices in integer
+    cents covering a window of days (from a month ago to horizon_days ahead), stored as a
+    prefix sum: the price of any range inside the window is prefix[end + 1] - prefix[start],
+    so a quote costs O(1) however long the rental is. Tables are cached in memory, keyed by car
+    and rebuilt when the car's daily rate changes; changing a rule only drops the tables of the
+    cars the rule applies to. Ranges outside the window are priced directly from the rules.
+
+    Each table records the window it was compiled for, so a quote never mixes a table with a
+    window moved by a concurrent rebase(). refresh_if_stale() keeps long-running processes
+    current: it moves the window as days pass and recomputes demand from reloaded bookings.
+    """
+
+    def __init__(self, rules=(), horizon_days=400, refresh_interval=None):
+        """
+        Initializes the engine.
+
+        :param rules: PricingRule objects.
+        :param horizon_days: Days ahead covered by the compiled tables.
+        :param refresh_interval: Seconds between refreshes made by refresh_if_stale(); None never refreshes.
+        """
+        self.horizon_days = horizon_days
+        self.refresh_interval = refresh_interval
+        self.refreshed_at = None
+        self._rules = list(rules)
+        self._tables = {}  # car_id -> (rate in cents, first day of the window, prefix sums)
+        self._lock = threading.RLock()
+        self.compilations = 0
+        self.first_day = None
+        self.rebase()
+
+    @classmethod
+    def from_config(cls, weekend_multiplier=1.0, seasons=(), long_rental_days=0, long_rental_multiplier=1.0,
+                    demand_threshold=0.0, demand_multiplier=1.0, horizon_days=400, refresh_interval=None):
+        """
+        Builds an engine from the PricingConfig settings; multipliers of 1.0 add no rule.
+
+        :param seasons: 'MM-DD:MM-DD:multiplier' strings.
+        :return: A PricingEngine.
+        """
+        rules = []
+        if weekend_multiplier != 1.0:
+            rules.append(WeekendRule(weekend_multiplier))
+        for season in seasons:
+            start, end, multiplier = season.split(":")
+            rules.append(SeasonalRule(start, end, float(multiplier)))
+        if long_rental_days and long_rental_multiplier != 1.0:
+            rules.append(LongRentalRule([(long_rental_days, long_rental_multiplier)]))
+        if demand_threshold and demand_multiplier != 1.0:
+            rules.append(DemandRule([(demand_threshold, demand_multiplier)]))
+        return cls(rules, horizon_days, refresh_interval)
+
+    # -------------------- Rules and Invalidation --------------------
+
+    @property
+    def rules(self):
+        return list(self._rules)
+
+    def add_rule(self, rule):
+        """Adds a rule and drops the tables of the cars it applies to."""
+        with self._lock:
+            self._rules.append(rule)
+            self.invalidate(rule.car_ids)
+
+    def remove_rule(self, rule):
+        """Removes a rule and drops the tables of the cars it applied to."""
+        with self._lock:
+            self._rules.remove(rule)
+            self.invalidate(rule.car_ids)
+
+    def invalidate(self, car_ids=None):
+        """
+        Drops compiled tables so they are rebuilt on the next quote.
+
+        :param car_ids: Cars whose tables are dropped; None for every car.
+        """
+        with self._lock:
+            if car_ids is None:
+                self._tables.clear()
+            else:
+                for car_id in car_ids:
+                    self._tables.pop(car_id, None)
+
+    def rebase(self, today=None):
+        """
+        Moves the table window to start a month before today, dropping every table if it moved.
+
+        Long-running processes call this (refresh_if_stale() does) so the window keeps covering upcoming dates.
+
+        :return: True if the window moved.
+        """
+        with self._lock:
+            first_day = to_ordinal(today or date.today()) - 31
+            if first_day == self.first_day:
+                return False
+            self.first_day = first_day
+            self.window_days = 31 + self.horizon_days
+            self._tables.clear()
+            return True
+
+    def refresh_demand(self, availability, fleet_size):
+        """
+        Recomputes daily fleet occupancy for the DemandRules from an AvailabilityEngine.
+
+        Only the tables of cars whose demand multipliers actually changed are dropped.
+
+        :param availability: The AvailabilityEngine holding the live bookings.
+        :param fleet_size: Number of cars in the fleet.
+        """
+        with self._lock:
+            self.rebase()
+            demand_rules = [rule for rule in self._rules if isinstance(rule, DemandRule)]
+            if not demand_rules:
+                return
+            days = np.arange(self.first_day, self.first_day + self.window_days, dtype=np.int64)
+            counts = np.array(availability.booked_cars_per_day(self.first_day, self.first_day + self.window_days - 1), dtype=np.float64)
+            occupancy = counts / fleet_size if fleet_size else np.zeros(len(counts))
+            for rule in demand_rules:
+                before = rule.multipliers(days)
+                rule.set_occupancy(self.first_day, occupancy)
+                if not np.array_equal(before, rule.multipliers(days)):
+                    self.invalidate(rule.car_ids)
+
+    def refresh_if_stale(self, db_connection, availability=None):
+        """
+        Moves the window and recomputes demand once refresh_interval has passed since the last refresh.
+
+        The AvailabilityEngine is reloaded first if it is out of date, so demand reflects
+        bookings made by other processes too.
+
+        :param db_connection: The database connection object.
+        :param availability: Optional AvailabilityEngine supplying occupancy for the DemandRules.
+        :return: True if a refresh was made.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self.refresh_interval is None or (self.refreshed_at is not None
+                                                 and now - self.refreshed_at < self.refresh_interval):
+                return False
+            self.refreshed_at = now  # Claimed: concurrent callers do not refresh as well
+        if availability is None:
+            self.rebase()
+            return True
+        try:
+            availability.reload_if_stale(db_connection)
+            self.load_demand(db_connection, availability)
+        except Exception as e:
+            print(f"Error while refreshing demand pricing: {e}")
+            return False
+        return True
+
+    def load_demand(self, db_connection, availability):
+        """refresh_demand() with the fleet size counted from car_management."""
+        with db_connection.connect(read_only=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute(count_cars)
+            fleet_size = cursor.fetchone()[0]
+            cursor.close()
+        self.refresh_demand(availability, fleet_size)
+        self.refreshed_at = time.monotonic()
+
+    # -------------------- Tables --------------------
+
+    def _daily_prices(self, car_id, rate_cents, days):
+        multiplier = np.ones(len(days))
+        for rule in list(self._rules):
+            if rule.per_day and rule.applies_to(car_id):
+                multiplier *= rule.multipliers(days)
+        return np.rint(rate_cents * multiplier).astype(np.int64)
+
+    def _table(self, car_id, rate_cents):
+        """
+        Returns the car's table, compiling it if missing or stale.
+
+        :return: A (first day of the window, prefix sums) tuple; the window is the one the table was compiled for.
+        """
+        entry = self._tables.get(car_id)
+        if entry is not None and entry[0] == rate_cents:
+            return entry[1], entry[2]
+        with self._lock:
+            entry = self._tables.get(car_id)
+            if entry is not None and entry[0] == rate_cents:  # Compiled by another thread meanwhile
+                return entry[1], entry[2]
+            first_day = self.first_day
+            days = np.arange(first_day, first_day + self.window_days, dtype=np.int64)
+            prefix = np.zeros(len(days) + 1, dtype=np.int64)
+            np.cumsum(self._daily_prices(car_id, rate_cents, days), out=prefix[1:])
+            self._tables[car_id] = (rate_cents, first_day, prefix)
+            self.compilations += 1
+            return first_day, prefix
+
+    # -------------------- Quotes --------------------
+
+    def quote_cents(self, car_id, daily_rate, start_date, end_date):
+        """
+        Prices a rental in integer cents.
+
+        :param car_id: The car's ID (rules may apply to specific cars).
+        :param daily_rate: The car's base daily rate.
+        :param start_date: First rental day (date, datetime or YYYY-MM-DD).
+        :param end_date: Last rental day (date, datetime or YYYY-MM-DD), inclusive.
+        :return: The price in cents.
+        """
+        start, end = to_ordinal(start_date), to_ordinal(end_date)
+        if end < start:
+            raise ValueError("End date must not be before start date.")
+        rate_cents = _to_cents(daily_rate)
+        first_day, prefix = self._table(car_id, rate_cents)
+        if first_day <= start and end < first_day + len(prefix) - 1:
+            total = int(prefix[end - first_day + 1] - prefix[start - first_day])
+        else:
+            total = int(self._daily_prices(car_id, rate_cents, np.arange(start, end + 1, dtype=np.int64)).sum())
+
+        days = end - start + 1
+        multiplier = 1.0
+        for rule in list(self._rules):
+            if not rule.per_day and rule.applies_to(car_id):
+                multiplier *= rule.length_multiplier(days)
+        if multiplier != 1.0:
+            total = int((Decimal(total) * Decimal(str(multiplier))).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+        return total
+
+    def quote(self, car_id, daily_rate, start_date, end_date):
+        """
+        Prices a rental.
+
+        :return: The price as a Decimal rounded to cents.
+        """
+        return Decimal(self.quote_cents(car_id, daily_rate, start_date, end_date)).scaleb(-2)
+
+    def daily_prices(self, car_id, daily_rate, start_date, end_date):
+        """
+        The price of each day of a rental before length rules, e.g. for showing a breakdown.
+
+        :return: A list of Decimals, one per day.
+        """
+        start, end = to_ordinal(start_date), to_ordinal(end_date)
+        prices = self._daily_prices(car_id, _to_cents(daily_rate), np.arange(start, end + 1, dtype=np.int64))
+        return [Decimal(cents).scaleb(-2) for cents in prices.tolist()]
+
+    def stats(self):
+        return {"cars_compiled": len(self._tables), "compilations": self.compilations, "rules": len(self._rules)}
@@ -0,0 +1,190 @@
+import threading
+import time
+
+
+class LoginThrottled(Exception):
+    """Raised (through the login Future) when a login attempt is refused by the rate limiter."""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Too many login attempts. Try again in {retry_after:.0f} seconds.")
+        self.retry_after = retry_after
+
+
+class TokenBuckets:
+    """
+    A set of token buckets keyed by string, e.g. one per username or client address.
+
+    Each key holds a single (tokens, timestamp) tuple and tokens are refilled lazily when the key
+    is next used, so there is no per-key timer. A bucket that has refilled to capacity is
+    indistinguishable from a missing one, which is what sweep() relies on to drop idle keys and
+    keep the store small even when millions of distinct keys have been seen.
+
+    Keys are kept in the order they were last updated (a key is moved to the end whenever it
+    changes), so the idle ones collect at the front and sweep() only looks at those.
+    """
+
+    def __init__(self, capacity, refill_rate):
+        """
+        Initializes the buckets.
+
+        :param capacity: Maximum burst of attempts per key.
+        :param refill_rate: Tokens added back per second.
+        """
+        self.capacity = float(capacity)
+        self.refill_rate = float(refill_rate)
+        self._buckets = {}
+
+    def _tokens(self, key, now):
+        entry = self._buckets.get(key)
+        if entry is None:
+            return self.capacity
+        tokens, updated = entry
+        return min(self.capacity, tokens + (now - updated) * self.refill_rate)
+
+    def available(self, key, now):
+        """Returns whether key has a whole token left. Caller holds the limiter's lock."""
+        return self._tokens(key, now) >= 1.0
+
+    def _set(self, key, tokens, now):
+        self._buckets.pop(key, None)
+        self._buckets[key] = (tokens, now)
+
+    def take(self, key, now):
+        """Removes one token from key. Caller holds the limiter's lock."""
+        self._set(key, self._tokens(key, now) - 1.0, now)
+
+    def give_back(self, key, now):
+        """Returns one token to key, up to capacity. Caller holds the limiter's lock."""
+        if key in self._buckets:
+            self._set(key, min(self.capacity, self._tokens(key, now) + 1.0), now)
+
+    def retry_after(self, key, now):
+        """Seconds until key has a whole token again."""
+        missing = 1.0 - self._tokens(key, now)
+        return max(0.0, missing / self.refill_rate) if self.refill_rate else float("inf")
+
+    def sweep(self, now, limit=None):
+        """
+        Drops buckets that have refilled to capacity, oldest first. Caller holds the limiter's lock.
+
+        Stops at the first bucket that is still refilling, or after limit buckets, so a call costs
+        O(limit) however many keys are stored.
+
+        :param now: The current time.
+        :param limit: Most buckets to drop; None drops every idle bucket at the front.
+        :return: The number of buckets removed.
+        """
+        if not self.refill_rate:
+            return 0
+        removed = 0
+        while self._buckets and (limit is None or removed < limit):
+            key = next(iter(self._buckets))
+            tokens, updated = self._buckets[key]
+            # A bucket is full again once enough time has passed to refill what it is missing.
+            if (now - updated) * self.refill_rate < self.capacity - tokens:
+                break
+            del self._buckets[key]
+            removed += 1
+        return removed
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class LoginRateLimiter:
+    """
+    Throttles login attempts per account (username or email) and per client.
+
+    An attempt is allowed only if both the account's bucket and the client's bucket have a token,
+    and then one token is taken from each. The account bucket stops a password from being
+    guessed from many clients; the client bucket stops one client spraying many accounts. The
+    check is pure in-memory arithmetic, so it is done before any database query or bcrypt work.
+    A successful login hands its account token back (see succeeded()), so only failed attempts
+    count against an account.
+
+    Every allow() call drops up to sweep_batch idle buckets, so the store stays small without a
+    periodic pass over every key while the lock is held.
+    """
+
+    def __init__(self, account_capacity=5, account_refill_rate=1 / 60, client_capacity=20,
+                 client_refill_rate=1 / 6, sweep_batch=32):
+        """
+        Initializes the limiter.
+
+        :param account_capacity: Burst of attempts allowed per account.
+        :param account_refill_rate: Attempts per second regained by an account.
+        :param client_capacity: Burst of attempts allowed per client.
+        :param client_refill_rate: Attempts per second regained by a client.
+        :param sweep_batch: Most idle buckets of each kind dropped per attempt.
+        """
+        self.accounts = TokenBuckets(account_capacity, account_refill_rate)
+        self.clients = TokenBuckets(client_capacity, client_refill_rate)
+        self.sweep_batch = sweep_batch
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    @staticmethod
+    def _account_key(account):
+        return (account or "").strip().lower()
+
+    def allow(self, account, client=None):
+        """
+        Records a login attempt if it is within the limits.
+
+        :param account: The username or email being logged into.
+        :param client: Optional client identifier, such as an IP address.
+        :return: True if the attempt may proceed, False if it should be refused.
+        """
+        account = self._account_key(account)
+        now = time.monotonic()
+        with self._lock:
+            self._sweep(now, self.sweep_batch)
+            if not self.accounts.available(account, now) or (
+                    client is not None and not self.clients.available(client, now)):
+                self.rejected += 1
+                return False
+            self.accounts.take(account, now)
+            if client is not None:
+                self.clients.take(client, now)
+            return True
+
+    def succeeded(self, account):
+        """
+        Gives back the account token taken by an attempt that logged in successfully.
+
+        :param account: The username or email that was logged into.
+        """
+        with self._lock:
+            self.accounts.give_back(self._account_key(account), time.monotonic())
+
+    def retry_after(self, account, client=None):
+        """
+        Returns the number of seconds until an attempt for account and client would be allowed.
+        """
+        now = time.monotonic()
+        with self._lock:
+            wait = self.accounts.retry_after(self._account_key(account), now)
+            if client is not None:
+                wait = max(wait, self.clients.retry_after(client, now))
+            return wait
+
+    def _sweep(self, now, limit=None):
+        return self.accounts.sweep(now, limit) + self.clients.sweep(now, limit)
+
+    def sweep(self):
+        """
+        Drops the buckets that have refilled to capacity from the front of each store.
+
+        :return: The number of buckets removed.
+        """
+        with self._lock:
+            return self._sweep(time.monotonic())
+
+    def stats(self):
+        """
+        Returns limiter metrics.
+
+        :return: A dictionary with the number of tracked accounts and clients and rejected attempts.
+        """
+        with self._lock:
+            return {"accounts": len(self.accounts), "clients": len(self.clients), "rejected": self.rejected}
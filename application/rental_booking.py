@@ -1,69 +1,136 @@
 #from database.queries import create_rental, select_available_cars
 from data_models.car import Car
-from datetime import datetime
+from data_models.dates import rental_days, to_ordinal
+from decimal import Decimal, ROUND_HALF_UP
+import numpy as np
 from application.payment import Payment
+from application.summaries import SummaryDelta
+from database.queries import select_rental_history, cancel_customer_booking
+from database.statements import statements
 
 class RentalBooking:
     """
     Handles rental booking logic for customers.
     """
 
-    def __init__(self, db_connection):
+    def __init__(self, db_connection, car_cache=None, availability=None, summaries=None, pricing=None):
         """
         Initialize the RentalManager with a database connection.
         :param db_connection: The database connection object.
+        :param car_cache: Optional CarCache used to serve catalogue reads from memory.
+        :param availability: Optional AvailabilityEngine consulted for date-range availability.
+        :param summaries: Optional SummaryTables updated in the same transaction as bookings and payments.
+        :param pricing: Optional PricingEngine applying dynamic pricing rules to quotes.
         """
         self.db_connection = db_connection
-        self.payment = Payment(db_connection)  # Initialize Payment class
+        self.car_cache = car_cache
+        self.availability = availability
+        self.summaries = summaries
+        self.pricing = pricing
+        self.payment = Payment(db_connection, summaries)  # Initialize Payment class
 
     def book_car(self, user_id, car_id, start_date, end_date, total_cost):
         """
         Book a car for a specific user and rental period.
+
+        The booking runs as one transaction: the car row is locked with SELECT ... FOR UPDATE,
+        which makes concurrent bookings of the same car wait for each other, then the car's
+        non-cancelled bookings are checked for an overlapping date range and the new booking
+        is inserted only if there is none. Two clients can therefore never both book the same
+        car for overlapping dates. The AvailabilityEngine is only a hint (other processes may
+        have changed the car's bookings); when it disagrees with the database, the car's
+        bookings are reloaded into it from inside the transaction.
         :param user_id: ID of the user booking the car.
         :param car_id: ID of the car to be booked.
         :param start_date: Start date of the rental (YYYY-MM-DD).
         :param end_date: End date of the rental (YYYY-MM-DD).
         :param total_cost: Total cost of the rental.
-        :return: None
-        """
-        query = """
-        INSERT INTO rental_booking (car_id, customer_id, rental_start_date, rental_end_date, total_rental_days, status, total_rental_price)
-        VALUES (%s, %s, %s, %s, %s, 'pending', %s)
+        :return: True if the booking was recorded, False otherwise.
         """
+        try:
+            total_rental_days = rental_days(start_date, end_date)
+        except ValueError as e:
+            print(f"Error while booking car: {e}")
+            return False
+        if total_rental_days < 1:
+            print("End date must not be before start date.")
+            return False
+        hinted_free = self.availability.is_available(car_id, start_date, end_date) if self.availability else None
         with self.db_connection.connect() as conn:
-            cursor = conn.cursor()
             try:
-                rental_days = (datetime.strptime(end_date, "%Y-%m-%d") - datetime.strptime(start_date, "%Y-%m-%d")).days + 1
-                cursor.execute(query, (car_id, user_id, start_date, end_date, rental_days, total_cost))
+                # Lock first, then check: the overlap check must run after the lock is granted so
+                # it sees any booking committed by the transaction that held it.
+                if not statements.execute(conn, "lock_car_for_booking", (car_id,)).fetchall():
+                    conn.rollback()
+                    print(f"Car {car_id} does not exist.")
+                    return False
+                conflict = bool(statements.execute(conn, "select_booking_conflict",
+                                                   (car_id, end_date, start_date)).fetchall())
+                if self.availability and hinted_free == conflict:
+                    self.availability.replace_car(
+                        car_id, statements.execute(conn, "select_car_bookings", (car_id,)).fetchall())
+                if conflict:
+                    conn.rollback()
+                    print(f"Car {car_id} is already booked between {start_date} and {end_date}.")
+                    return False
+                cursor = statements.execute(conn, "create_booking",
+                                            (car_id, user_id, start_date, end_date, total_rental_days, total_cost))
+                booking_id = cursor.lastrowid
+                if self.summaries:
+                    summary_cursor = conn.cursor()
+                    try:
+                        self.summaries.record_booking_change(summary_cursor, None, {
+                            "booking_id": booking_id, "car_id": car_id, "customer_id": user_id,
+                            "rental_start_date": start_date, "rental_end_date": end_date,
+                            "total_rental_days": total_rental_days, "status": "pending",
+                            "total_rental_price": total_cost, "amount_paid": 0,
+                        })
+                    finally:
+                        summary_cursor.close()
                 conn.commit()
-                print("Car booked successfully.")
             except Exception as e:
+                conn.rollback()
                 print(f"Error while booking car: {e}")
+                return False
+        # The booking is committed; the hint is updated outside the transaction's error handling.
+        if self.availability:
+            self.availability.reserve(car_id, start_date, end_date, booking_id)
+        print("Car booked successfully.")
+        return True
 
-    def get_available_cars(self):
+    def get_available_cars(self, start_date=None, end_date=None):
         """
         Retrieve all available cars for booking.
+        :param start_date: Optional start date (YYYY-MM-DD); with end_date, only cars free for the whole range are returned.
+        :param end_date: Optional end date (YYYY-MM-DD).
         :return: A list of available cars as Car objects.
         """
-        with self.db_connection.connect() as conn:
+        cars = self._get_cars_on_offer()
+        if start_date and end_date and self.availability:
+            self.availability.reload_if_stale(self.db_connection)
+            free_ids = set(self.availability.free_car_ids([car.car_id for car in cars], start_date, end_date))
+            cars = [car for car in cars if car.car_id in free_ids]
+        return cars
+
+    def _get_cars_on_offer(self):
+        """
+        Retrieve the cars flagged as available_now, from the cache when possible.
+        :return: A list of Car objects.
+        """
+        version, read_only = None, True
+        if self.car_cache:
+            cached = self.car_cache.get_available_cars()
+            if cached is not None:
+                return cached
+            version, read_only = self.car_cache.fill_ticket()
+        with self.db_connection.connect(read_only=read_only) as conn:
             cursor = conn.cursor()
             try:
                 cursor.execute("SELECT * FROM car_management WHERE available_now = 1")
-                cars_data = cursor.fetchall()
-                return [
-                    Car(
-                        car_id=row[0],
-                        make=row[1],
-                        model=row[2],
-                        year=row[3],
-                        mileage=row[4],
-                        available_now=row[5],
-                        min_rent_period=row[6],
-                        max_rent_period=row[7],
-                        daily_rate=row[8]
-                    )
-                    for row in cars_data
-                ]
+                cars = Car.from_cursor(cursor)
+                if self.car_cache:
+                    self.car_cache.set_available_cars(cars, version)
+                return cars
             except Exception as e:
                 print(f"Error while retrieving available cars: {e}")
                 return []
@@ -94,43 +161,140 @@ class RentalBooking:
         :param end_date: End date of the rental (YYYY-MM-DD).
         :return: Total rental fee.
         """
-        query = "SELECT daily_rate FROM car_management WHERE car_id = %s"
+        if self.pricing:
+            self.pricing.refresh_if_stale(self.db_connection, self.availability)
+        if self.car_cache:
+            car = self.car_cache.get(car_id)
+            if car is not None:
+                return self.calculate_rental_fees(car.daily_rate, start_date, end_date,
+                                                  pricing=self.pricing, car_id=car_id)
         with self.db_connection.connect() as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, (car_id,))
-            result = cursor.fetchone()
+            rows = statements.execute(conn, "select_car_daily_rate", (car_id,)).fetchall()
+            result = rows[0] if rows else None
             if result:
                 daily_rate = result[0]
-                return self.calculate_rental_fees(daily_rate, start_date, end_date)
+                return self.calculate_rental_fees(daily_rate, start_date, end_date, pricing=self.pricing, car_id=car_id)
             else:
                 raise ValueError(f"Car with ID {car_id} not found.")
 
     @staticmethod
-    def calculate_rental_fees(daily_rate, start_date, end_date, additional_charges=0):
+    def calculate_rental_fees(daily_rate, start_date, end_date, additional_charges=0, pricing=None, car_id=None):
         """
         Calculate the total rental cost.
         :param daily_rate: Daily rental rate for the car.
-        :param start_date: Start date of the rental (YYYY-MM-DD).
-        :param end_date: End date of the rental (YYYY-MM-DD).
+        :param start_date: Start date of the rental (date, datetime or YYYY-MM-DD).
+        :param end_date: End date of the rental (date, datetime or YYYY-MM-DD).
         :param additional_charges: Any additional charges (default 0).
+        :param pricing: Optional PricingEngine; when given, the rental is priced under its rules.
+        :param car_id: The car's ID, used by pricing rules that apply to specific cars.
         :return: Total cost of the rental.
         """
-        start = datetime.strptime(start_date, "%Y-%m-%d")
-        end = datetime.strptime(end_date, "%Y-%m-%d")
-        duration = (end - start).days + 1  # Include the start day
+        if pricing:
+            return pricing.quote(car_id, daily_rate, start_date, end_date) + additional_charges
+        duration = rental_days(start_date, end_date)  # Include the start day
         return (daily_rate * duration) + additional_charges
 
+    def calculate_fees_batch(self, quotes):
+        """
+        Calculate rental fees for many (car_id, start_date, end_date) requests at once.
+
+        All daily rates missing from the car cache are fetched in a single query and the
+        totals are computed in one vectorised pass (or, with a PricingEngine, one O(1) quote each).
+        :param quotes: Iterable of (car_id, start_date, end_date) tuples, dates as YYYY-MM-DD.
+        :return: A list of Decimal totals in input order; None where the car does not exist,
+                 a date is malformed or the end date is before the start date.
+        """
+        quotes = list(quotes)
+        if not quotes:
+            return []
+        car_ids = [quote[0] for quote in quotes]
+        rates = {}
+        if self.car_cache:
+            for car_id in set(car_ids):
+                car = self.car_cache.get(car_id)
+                if car is not None:
+                    rates[car_id] = car.daily_rate
+        missing = list({car_id for car_id in car_ids if car_id not in rates})
+        if missing:
+            placeholders = ", ".join(["%s"] * len(missing))
+            query = f"SELECT car_id, daily_rate FROM car_management WHERE car_id IN ({placeholders})"
+            with self.db_connection.connect(read_only=True) as conn:
+                cursor = conn.cursor()
+                cursor.execute(query, tuple(missing))
+                rates.update(cursor.fetchall())
+                cursor.close()
+        if self.pricing:
+            self.pricing.refresh_if_stale(self.db_connection, self.availability)
+            return [self._quote_or_none(car_id, rates.get(car_id), start_date, end_date)
+                    for car_id, start_date, end_date in quotes]
+        return self.calculate_rental_fees_batch(
+            [rates.get(car_id) for car_id in car_ids],
+            [quote[1] for quote in quotes],
+            [quote[2] for quote in quotes],
+        )
+
+    def _quote_or_none(self, car_id, daily_rate, start_date, end_date):
+        try:
+            if daily_rate is None or rental_days(start_date, end_date) <= 0:
+                return None
+        except (ValueError, TypeError):
+            return None
+        return self.pricing.quote(car_id, daily_rate, start_date, end_date)
+
+    @staticmethod
+    def _rate_cents(rate):
+        """A daily rate in integer cents, or None when it is missing or not a number."""
+        try:
+            return int(Decimal(str(rate)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP) * 100)
+        except (ArithmeticError, ValueError):
+            return None
+
+    @staticmethod
+    def _day_span(start_date, end_date):
+        """(start, end) day numbers, or None when either date is missing or malformed."""
+        try:
+            start, end = to_ordinal(start_date), to_ordinal(end_date)
+        except (ValueError, TypeError, AttributeError):
+            return None
+        return None if start is None or end is None else (start, end)
+
+    @staticmethod
+    def calculate_rental_fees_batch(daily_rates, start_dates, end_dates):
+        """
+        Vectorised version of calculate_rental_fees.
+
+        Rates are converted to integer cents so the multiplication is exact; the totals are
+        returned as Decimals rounded to cents. Each item is validated on its own, so one malformed
+        date or rate only makes that item None.
+        :param daily_rates: Daily rates (numbers or Decimals); None marks an unknown car.
+        :param start_dates: Start dates (YYYY-MM-DD), same length as daily_rates.
+        :param end_dates: End dates (YYYY-MM-DD), same length as daily_rates.
+        :return: A list of Decimal totals, None where the rate is None or not a number, a date is
+                 malformed or the range is invalid.
+        """
+        cents = [RentalBooking._rate_cents(rate) if rate is not None else None for rate in daily_rates]
+        spans = [RentalBooking._day_span(start, end) for start, end in zip(start_dates, end_dates)]
+        known = np.array([cent is not None and span is not None for cent, span in zip(cents, spans)], dtype=bool)
+        rate_cents = np.array([cent or 0 for cent in cents], dtype=np.int64)
+        starts = np.array([span[0] if span else 0 for span in spans], dtype=np.int64)
+        ends = np.array([span[1] if span else 0 for span in spans], dtype=np.int64)
+        days = ends - starts + 1  # Include the start day
+        valid = known & (days > 0)
+        totals = rate_cents * days
+        return [Decimal(int(total)).scaleb(-2) if ok else None for total, ok in zip(totals.tolist(), valid.tolist())]
+
     def view_rental_history(self, user_id):
-        query = "SELECT * FROM rental_booking WHERE customer_id = %s"
         cursor = None
         try:
-            cursor = self.db_connection.cursor(dictionary=True)
-            cursor.execute(query, (user_id,))
-            rentals = cursor.fetchall()
-            if rentals:
-                return rentals
-            else:
-                return []
+            # Read from the primary: customers look at their history right after booking or cancelling.
+            with self.db_connection.connect() as conn:
+                cursor = conn.cursor(dictionary=True)
+                cursor.execute(select_rental_history, (user_id,))
+                rentals = cursor.fetchall()
+                if rentals:
+                    return rentals
+                else:
+                    return []
         except Exception as e:
             print(f"Error fetching rental history: {e}")
             return []
@@ -139,19 +303,65 @@ class RentalBooking:
                 cursor.close()
 
     def cancel_booking(self, user_id, rental_id):
-        query = "DELETE FROM rental_booking WHERE customer_id = %s AND booking_id = %s"
+        """
+        Cancels (deletes) one of a customer's bookings.
+        :param user_id: ID of the customer who owns the booking.
+        :param rental_id: ID of the booking.
+        :return: True if the booking was deleted, False if the customer has no such booking or on error.
+        """
         cursor = None
         try:
-            cursor = self.db_connection.cursor()
-            cursor.execute(query, (user_id, rental_id))
-            self.db_connection.commit()
+            if self.summaries:
+                deleted = self._cancel_booking_with_summaries(user_id, rental_id)
+            else:
+                cursor = self.db_connection.cursor()
+                cursor.execute(cancel_customer_booking, (user_id, rental_id))
+                deleted = cursor.rowcount > 0
+                self.db_connection.commit()
+            if not deleted:
+                print("Booking not found.")
+                return False
+            if self.availability:
+                self.availability.release(rental_id)
             print("Booking cancelled successfully.")
+            return True
         except Exception as e:
             print(f"Error cancelling booking: {e}")
+            return False
         finally:
             if cursor:
                 cursor.close()
 
+    def _cancel_booking_with_summaries(self, user_id, rental_id):
+        """
+        Deletes a booking and takes it (and any late fee charged on its return) out of the summary tables.
+
+        :return: True if the booking was deleted, False if the customer has no such booking.
+        """
+        with self.db_connection.connect() as conn:
+            cursor = conn.cursor()
+            try:
+                before = self.summaries.booking_state(cursor, rental_id)
+                if not before or before["customer_id"] != user_id:
+                    conn.rollback()
+                    return False
+                returns = self.summaries.return_state(cursor, rental_id)
+                cursor.execute(cancel_customer_booking, (user_id, rental_id))
+                if cursor.rowcount == 0:
+                    conn.rollback()
+                    return False
+                delta = SummaryDelta()
+                delta.change_booking(before, None)
+                delta.change_returns(user_id, returns, [])
+                self.summaries.record(cursor, delta)
+                conn.commit()
+                return True
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+
     def initiate_payment(self, rental_id, amount):
         """
         Initiate the payment process for a rental.
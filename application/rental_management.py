@@ -1,6 +1,12 @@
-from database.queries import get_pending_rentals, approve_rental # update_rental_record, get_rental_details
+from database.queries import get_pending_rentals, approve_rental, record_rental_return, record_return_payment, \
+    find_bookings_for_review, select_booking_cars_in, lock_cars_in, lock_bookings_for_approval_in, \
+    lock_confirmed_bookings_of_cars_in, lock_booking_states_in, confirm_bookings_in, cancel_bookings_in, \
+    mark_cars_rented_in # update_rental_record, get_rental_details
 from data_models.rental import Rental
-from datetime import datetime
+from data_models.dates import to_ordinal
+from database.statements import statements
+from application.reports import ReportEngine
+from application.summaries import SummaryDelta, SummaryTables, BOOKING_STATE_COLUMNS, to_money
 
 
 class RentalManagement:
@@ -8,12 +14,19 @@ class RentalManagement:
     Handles rental management logic for admin operations.
     """
 
-    def __init__(self, db_connection):
+    def __init__(self, db_connection, car_cache=None, availability=None, summaries=None):
         """
         Initialize the RentalAdminManager with a database connection.
         :param db_connection: The database connection object.
+        :param car_cache: Optional CarCache invalidated when an approval changes a car's availability.
+        :param availability: Optional AvailabilityEngine released when a booking is rejected.
+        :param summaries: Optional SummaryTables updated in the same transaction as rejections and returns
+                          (approvals do not change the summary totals).
         """
         self.db_connection = db_connection
+        self.car_cache = car_cache
+        self.availability = availability
+        self.summaries = summaries
 
     def get_pending_rentals(self):
         """
@@ -24,19 +37,7 @@ class RentalManagement:
             cursor = conn.cursor()
             try:
                 cursor.execute(get_pending_rentals)
-                rentals_data = cursor.fetchall()
-                return [
-                    Rental(
-                        rental_id=row[0],
-                        user_id=row[1],
-                        car_id=row[2],
-                        start_date=row[3],
-                        end_date=row[4],
-                        total_cost=row[5],
-                        status=row[6],
-                    )
-                    for row in rentals_data
-                ]
+                return Rental.from_cursor(cursor)
             except Exception as e:
                 print(f"Error while retrieving pending rentals: {e}")
                 return []
@@ -50,18 +51,49 @@ class RentalManagement:
 
 
     def approve_rental(self, rental_id):
+        """
+        Approve a pending rental request.
+
+        The car row and then the booking row are locked for the duration of the transaction
+        (the same order book_car locks in, so the two cannot deadlock), which serialises
+        concurrent approvals of the same booking or of overlapping bookings of the same car:
+        the booking must not have been cancelled, and no other confirmed booking of the car
+        may overlap its dates. book_car already refuses overlapping bookings; this check
+        covers bookings that did not go through it (imported or older rows).
+        :param rental_id: The ID of the rental (booking) to approve.
+        :return: True if the rental was approved, False otherwise.
+        """
         with self.db_connection.connect() as conn:
-            cursor = conn.cursor()
             try:
                 # Check if the rental ID exists
-                cursor.execute("SELECT car_id FROM rental_booking WHERE booking_id = %s", (rental_id,))
-                result = cursor.fetchone()
+                result = statements.execute(conn, "select_booking_car", (rental_id,)).fetchall()
                 if not result:
+                    conn.rollback()
                     print(f"Error: Rental ID {rental_id} does not exist.")
-                    return
-
-                car_id = result[0]
+                    return False
 
+                car_id = result[0][0]
+                statements.execute(conn, "lock_car_for_booking", (car_id,)).fetchall()
+                booking = statements.execute(conn, "lock_booking_for_approval", (rental_id,)).fetchall()
+                if not booking:  # Cancelled since it was looked up
+                    conn.rollback()
+                    print(f"Error: Rental ID {rental_id} does not exist.")
+                    return False
+
+                status, start_date, end_date = booking[0]
+                if status == "cancelled":
+                    conn.rollback()
+                    print(f"Error: Rental ID {rental_id} has been cancelled.")
+                    return False
+
+                conflict = statements.execute(conn, "select_approval_conflict",
+                                              (car_id, rental_id, end_date, start_date)).fetchall()
+                if conflict:
+                    conn.rollback()
+                    print(f"Error: Car {car_id} is already confirmed for booking {conflict[0][0]} on overlapping dates.")
+                    return False
+
+                cursor = conn.cursor()
                 # Approve the rental if it exists
                 cursor.execute(
                     "UPDATE rental_booking SET status = 'confirmed' WHERE booking_id = %s",
@@ -73,36 +105,217 @@ class RentalManagement:
                     "UPDATE car_management SET available_now = 0 WHERE car_id = %s",
                     (car_id,)
                 )
+                cursor.close()
 
                 conn.commit()
+                if self.car_cache:
+                    self.car_cache.invalidate(car_id)
                 print(f"Rental ID {rental_id} approved successfully.")
+                return True
             except Exception as e:
+                conn.rollback()
                 print(f"Error while approving rental: {e}")
+                return False
 
     def reject_rental(self, rental_id):
         with self.db_connection.connect() as conn:
             cursor = conn.cursor()
             try:
+                before = self.summaries.booking_state(cursor, rental_id) if self.summaries else None
                 cursor.execute("UPDATE rental_booking SET status = 'cancelled' WHERE booking_id = %s", (rental_id,))
+                if before:
+                    self.summaries.record_booking_change(cursor, before, dict(before, status="cancelled"))
                 conn.commit()
+                if self.availability:
+                    self.availability.release(rental_id)
                 print(f"Rental ID {rental_id} rejected successfully.")
+                return True
             except Exception as e:
+                conn.rollback()
                 print(f"Error while rejecting rental: {e}")
+                return False
+
+    # -------------------- Bulk Review --------------------
+
+    BATCH_SIZE = 1000  # IDs per IN (...) list
+
+    @staticmethod
+    def _placeholders(values):
+        return ", ".join(["%s"] * len(values))
+
+    def _fetch_in(self, cursor, query, values):
+        """Runs a query with an IN ({ids}) list once per batch of values and returns all rows."""
+        rows = []
+        values = list(values)
+        for start in range(0, len(values), self.BATCH_SIZE):
+            batch = values[start:start + self.BATCH_SIZE]
+            cursor.execute(query.format(ids=self._placeholders(batch)), tuple(batch))
+            rows.extend(cursor.fetchall())
+        return rows
+
+    def _execute_in(self, cursor, query, values):
+        values = list(values)
+        for start in range(0, len(values), self.BATCH_SIZE):
+            batch = values[start:start + self.BATCH_SIZE]
+            cursor.execute(query.format(ids=self._placeholders(batch)), tuple(batch))
+
+    def find_rental_ids(self, status="pending", payment_status=None, car_id=None, start_date_to=None):
+        """
+        Find bookings to review in bulk.
+        :param status: Booking status to match (e.g. 'pending').
+        :param payment_status: Optional payment status to match (e.g. 'paid').
+        :param car_id: Optional car to restrict to.
+        :param start_date_to: Optional latest rental start date (YYYY-MM-DD).
+        :return: A list of booking IDs in ID order.
+        """
+        filters = ""
+        params = [status]
+        for column, operator, value in (
+            ("payment_status", "=", payment_status),
+            ("car_id", "=", car_id),
+            ("rental_start_date", "<=", start_date_to),
+        ):
+            if value is not None:
+                filters += f" AND {column} {operator} %s"
+                params.append(value)
+        query = find_bookings_for_review.format(filters=filters)
+        with self.db_connection.connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, tuple(params))
+            rental_ids = [row[0] for row in cursor.fetchall()]
+            cursor.close()
+            return rental_ids
+
+    def approve_rentals(self, rental_ids=None, **filters):
+        """
+        Approve many rental requests in one transaction.
+
+        Instead of a lookup, two UPDATEs and a commit per booking, the bookings and their cars
+        are locked with one SELECT ... FOR UPDATE each (cars in ID order, then bookings, like
+        approve_rental), conflicts are resolved in memory and the approvals are written with one
+        UPDATE per table. A booking is refused if it has been cancelled or overlaps a confirmed
+        booking of the same car, including one approved earlier in the same batch (bookings are
+        considered in start-date order).
+        :param rental_ids: Booking IDs to approve; when None, the bookings matching filters.
+        :param filters: Keyword arguments for find_rental_ids (e.g. status, payment_status).
+        :return: A dictionary of booking ID -> 'approved', 'not_found', 'cancelled' or 'conflict'
+                 (every ID maps to 'error' if the transaction failed).
+        """
+        if rental_ids is None:
+            rental_ids = self.find_rental_ids(**filters)
+        rental_ids = list(dict.fromkeys(int(rental_id) for rental_id in rental_ids))
+        results = {rental_id: "not_found" for rental_id in rental_ids}
+        if not rental_ids:
+            return results
 
-    def generate_reports(self):
         with self.db_connection.connect() as conn:
             cursor = conn.cursor()
             try:
-                cursor.execute("SELECT * FROM rental_management")
-                reports = cursor.fetchall()
-                if not reports:
-                    print("No rental reports available.")
-                    return []
-                return reports
+                car_by_booking = dict(self._fetch_in(cursor, select_booking_cars_in, rental_ids))
+                car_ids = sorted(set(car_by_booking.values()))
+                if car_ids:
+                    self._fetch_in(cursor, lock_cars_in, car_ids)
+                bookings = self._fetch_in(cursor, lock_bookings_for_approval_in, sorted(car_by_booking))
+                # Every confirmed booking of the affected cars, outside the batch, that could overlap.
+                confirmed = {}
+                if car_ids:
+                    for booking_id, car_id, start_date, end_date in self._fetch_in(
+                            cursor, lock_confirmed_bookings_of_cars_in, car_ids):
+                        if booking_id not in results:
+                            confirmed.setdefault(car_id, []).append((start_date, end_date))
+
+                approved_cars = set()
+                for booking_id, car_id, status, start_date, end_date in sorted(bookings, key=lambda row: row[3]):
+                    if status == "cancelled":
+                        results[booking_id] = "cancelled"
+                        continue
+                    taken = confirmed.setdefault(car_id, [])
+                    if any(start_date <= other_end and other_start <= end_date for other_start, other_end in taken):
+                        results[booking_id] = "conflict"
+                        continue
+                    taken.append((start_date, end_date))
+                    results[booking_id] = "approved"
+                    approved_cars.add(car_id)
+
+                approved = [rental_id for rental_id, result in results.items() if result == "approved"]
+                self._execute_in(cursor, confirm_bookings_in, approved)
+                self._execute_in(cursor, mark_cars_rented_in, sorted(approved_cars))
+                conn.commit()
             except Exception as e:
-                print(f"Failed to generate reports: {e}")
-                return []
+                conn.rollback()
+                print(f"Error while approving rentals: {e}")
+                return {rental_id: "error" for rental_id in rental_ids}
+            finally:
+                cursor.close()
+
+        if self.car_cache:
+            for car_id in approved_cars:
+                self.car_cache.invalidate(car_id)
+        print(f"Approved {len(approved)} of {len(rental_ids)} rental(s).")
+        return results
+
+    def reject_rentals(self, rental_ids=None, **filters):
+        """
+        Reject many rental requests in one transaction.
+        :param rental_ids: Booking IDs to reject; when None, the bookings matching filters.
+        :param filters: Keyword arguments for find_rental_ids (e.g. status, start_date_to).
+        :return: A dictionary of booking ID -> 'rejected', 'not_found' or 'cancelled' (already rejected)
+                 (every ID maps to 'error' if the transaction failed).
+        """
+        if rental_ids is None:
+            rental_ids = self.find_rental_ids(**filters)
+        rental_ids = list(dict.fromkeys(int(rental_id) for rental_id in rental_ids))
+        results = {rental_id: "not_found" for rental_id in rental_ids}
+        if not rental_ids:
+            return results
 
+        with self.db_connection.connect() as conn:
+            cursor = conn.cursor()
+            try:
+                delta = SummaryDelta()
+                for row in self._fetch_in(cursor, lock_booking_states_in, rental_ids):
+                    state = dict(zip(BOOKING_STATE_COLUMNS, row))
+                    if state["status"] == "cancelled":
+                        results[state["booking_id"]] = "cancelled"
+                    else:
+                        results[state["booking_id"]] = "rejected"
+                        delta.change_booking(state, dict(state, status="cancelled"))
+                rejected = [rental_id for rental_id, result in results.items() if result == "rejected"]
+                self._execute_in(cursor, cancel_bookings_in, rejected)
+                if self.summaries:
+                    self.summaries.record(cursor, delta)
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                print(f"Error while rejecting rentals: {e}")
+                return {rental_id: "error" for rental_id in rental_ids}
+            finally:
+                cursor.close()
+
+        if self.availability:
+            for rental_id in rejected:
+                self.availability.release(rental_id)
+        print(f"Rejected {len(rejected)} of {len(rental_ids)} rental(s).")
+        return results
+
+    def generate_reports(self, start_date=None, end_date=None, period="month"):
+        """
+        Generate the rental reports, aggregated by the database.
+
+        With summary tables, the reports are read from their precomputed rows; otherwise
+        ReportEngine aggregates rental_booking and rental_management.
+        :param start_date: First date included (YYYY-MM-DD); defaults to a year before end_date.
+        :param end_date: Last date included (YYYY-MM-DD); defaults to today.
+        :param period: 'day', 'month' or 'year' for the per-period reports.
+        :return: A dictionary of report name -> list of row dictionaries (empty on error).
+        """
+        try:
+            if self.summaries:
+                return self.summaries.summary(start_date, end_date, period)
+            return ReportEngine(self.db_connection).summary(start_date, end_date, period)
+        except Exception as e:
+            print(f"Failed to generate reports: {e}")
+            return {}
 
     def update_rental_status(self, rental_id, status):
         """
@@ -141,16 +354,16 @@ class RentalManagement:
         end_date = rental['end_date']
         car_id = rental['car_id']
 
-        # Convert dates to datetime objects
+        # Convert dates to day numbers
         try:
-            end_date_obj = datetime.strptime(end_date, "%Y-%m-%d")
-            return_date_actual_obj = datetime.strptime(return_date_actual, "%Y-%m-%d")
+            end_day = to_ordinal(end_date)
+            return_day = to_ordinal(return_date_actual)
         except ValueError:
             raise ValueError("Invalid date format for return date.")
 
         # Calculate late days if the return is later than the due date
-        if return_date_actual_obj > end_date_obj:
-            late_days = (return_date_actual_obj - end_date_obj).days
+        if return_day > end_day:
+            late_days = return_day - end_day
 
             # Fetch daily rate for the car
             query_car = "SELECT daily_rate FROM cars WHERE car_id = %s"
@@ -166,55 +379,52 @@ class RentalManagement:
     def process_return(self, rental_id, return_date_actual):
         """
         Process the return of a rental and calculate the late fee if applicable.
+
+        The booking is read and locked, and the rental_management and rental_booking rows are
+        updated, in one transaction.
         :param rental_id: The ID of the rental.
         :param return_date_actual: The actual return date (YYYY-MM-DD).
         :return: A dictionary with late fee and comments.
         """
-        # Fetch rental details
-        query = "SELECT rental_end_date, total_rental_price FROM rental_booking WHERE booking_id = %s"
         with self.db_connection.connect() as conn:
             cursor = conn.cursor()
-            cursor.execute(query, (rental_id,))
-            rental = cursor.fetchone()
+            try:
+                # Fetch rental details
+                rental = SummaryTables.booking_state(cursor, rental_id)
+                if not rental:
+                    raise ValueError(f"Rental with ID {rental_id} not found.")
 
-        if not rental:
-            raise ValueError(f"Rental with ID {rental_id} not found.")
+                rental_end_date = rental["rental_end_date"]
+                total_rental_price = rental["total_rental_price"]
 
-        rental_end_date = rental[0]
-        total_rental_price = rental[1]
+                # Calculate late days and late fee
+                late_days = to_ordinal(return_date_actual) - to_ordinal(rental_end_date)
+                late_fee = 0
+                comments = "Return on time"
 
-        # Convert dates to datetime objects
-        return_date_actual_obj = datetime.strptime(return_date_actual, "%Y-%m-%d").date()
+                if late_days > 0:
+                    late_fee = late_days * float(total_rental_price) * 0.15
+                    comments = f"Late by {late_days} days"
 
-        # Calculate late days and late fee
-        late_days = (return_date_actual_obj - rental_end_date).days
-        late_fee = 0
-        comments = "Return on time"
+                returns = self.summaries.return_state(cursor, rental_id) if self.summaries else []
 
-        if late_days > 0:
-            late_fee = late_days * float(total_rental_price) * 0.15
-            comments = f"Late by {late_days} days"
+                # Update the rental record in rental_management table
+                cursor.execute(record_rental_return, (return_date_actual, late_fee, rental_id))
 
-        # Update the rental record in rental_management table
-        update_query = """
-            UPDATE rental_management
-            SET return_date = %s, late_returns_fee = %s, status = 'returned'
-            WHERE booking_id = %s
-        """
-        with self.db_connection.connect() as conn:
-            cursor = conn.cursor()
-            cursor.execute(update_query, (return_date_actual, late_fee, rental_id))
-            conn.commit()
+                # Update the payment status and amount paid in rental_booking table
+                cursor.execute(record_return_payment, (late_fee, rental_id))
 
-        # Update the payment status and amount paid in rental_booking table
-        update_payment_query = """
-            UPDATE rental_booking
-            SET payment_status = 'paid', amount_paid = total_rental_price + %s
-            WHERE booking_id = %s
-        """
-        with self.db_connection.connect() as conn:
-            cursor = conn.cursor()
-            cursor.execute(update_payment_query, (late_fee, rental_id))
-            conn.commit()
+                if self.summaries:
+                    delta = SummaryDelta()
+                    delta.change_booking(rental, dict(rental, amount_paid=to_money(total_rental_price) + to_money(late_fee)))
+                    delta.change_returns(rental["customer_id"], returns,
+                                         [(return_date_actual, late_fee, "returned")] * len(returns))
+                    self.summaries.record(cursor, delta)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
 
-        return {"late_fee": late_fee, "comments": comments}
\ No newline at end of file
+        return {"late_fee": late_fee, "comments": comments}
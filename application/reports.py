@@ -0,0 +1,399 @@
+import csv
+import io
+import json
+import os
+import zipfile
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+import numpy as np
+from database.queries import report_revenue_by_period, report_revenue_by_car, report_revenue_by_customer, \
+    report_car_utilisation, report_late_returns, export_table
+
+PERIOD_FORMATS = {"day": "%Y-%m-%d", "month": "%Y-%m", "year": "%Y"}
+# Tables that may be exported raw (user_management is left out: it holds password hashes).
+EXPORT_TABLES = ("rental_booking", "rental_management", "car_management")
+FILE_FORMATS = ("csv", "jsonl", "json", "columnar")
+
+
+def detect_format(path, file_format=None):
+    """
+    Picks an output format from an explicit name or the file extension.
+
+    :param path: Output path.
+    :param file_format: 'csv', 'jsonl', 'json' or 'columnar'; detected from the extension when omitted.
+    :return: The format name.
+    """
+    if file_format:
+        file_format = file_format.lower()
+    else:
+        extension = os.path.splitext(path)[1].lower()
+        file_format = {".jsonl": "jsonl", ".ndjson": "jsonl", ".json": "json", ".cols": "columnar"}.get(extension, "csv")
+    if file_format not in FILE_FORMATS:
+        raise ValueError(f"Unsupported report format '{file_format}'.")
+    return file_format
+
+
+def _json_default(value):
+    """json.dumps hook for the non-JSON types the MySQL driver returns."""
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode("utf-8")
+    return str(value)
+
+
+# -------------------- Columnar Files --------------------
+
+def _column_array(values):
+    """Converts one column of a row group to a typed NumPy array."""
+    sample = next((value for value in values if value is not None), None)
+    if isinstance(sample, int) and None not in values:  # Includes bool
+        return np.array(values, dtype=np.int64)
+    if isinstance(sample, (int, float, Decimal)):
+        return np.array([np.nan if value is None else float(value) for value in values], dtype=np.float64)
+    if isinstance(sample, datetime):
+        return np.array([np.datetime64(value, "s") if value else np.datetime64("NaT") for value in values])
+    if isinstance(sample, date):
+        return np.array([np.datetime64(value, "D") if value else np.datetime64("NaT") for value in values])
+    return np.array(["" if value is None else str(_json_default(value)) for value in values], dtype=np.str_)
+
+
+def _missing_array(dtype, count):
+    """An all-missing column of count rows that concatenates with arrays of dtype (NaT, NaN or '')."""
+    if dtype.kind == "M":
+        return np.full(count, np.datetime64("NaT"), dtype=dtype)
+    if dtype.kind == "U":
+        return np.full(count, "", dtype=dtype)
+    return np.full(count, np.nan)
+
+
+class ColumnarWriter:
+    """
+    Writes rows to a Parquet-like columnar file, one row group at a time.
+
+    The file is a zip archive holding, for every row group, one .npy array per column
+    ('00000/make.npy'), plus a 'schema.json' with the column names and row group sizes. Each
+    column is a typed array (int64, float64, datetime64 or fixed-width unicode), so a reader can
+    load just the columns it needs with read_columnar(). Memory use is bounded by the row group size.
+
+    A column's type is fixed by the first row group in which it has a value, and later groups are
+    converted to it. Where a later group needs a wider type of the same kind (NULLs or fractions in
+    an integer column, longer strings, datetimes in a date column) the column's type is widened and
+    recorded under 'dtypes' in the schema, which read_columnar() converts every group to; values of
+    a different kind (e.g. text in a numeric column) raise ValueError. Groups where the column is all
+    NULL are written as NaT, NaN or ''; those written before the type was known are listed under
+    'null_groups' in the schema, and read_columnar() converts them to the column's type.
+    """
+
+    def __init__(self, path, columns, row_group_size=50000):
+        """
+        Opens a columnar file for writing.
+
+        :param path: Output path (conventionally with a .cols extension).
+        :param columns: Column names.
+        :param row_group_size: Rows buffered before a row group is written.
+        """
+        self.columns = list(columns)
+        self.row_group_size = row_group_size
+        self._archive = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED)
+        self._buffer = []
+        self._row_groups = []
+        self._dtypes = {}
+        self._null_groups = {}
+
+    def write(self, row):
+        self._buffer.append(row)
+        if len(self._buffer) >= self.row_group_size:
+            self._flush()
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        # Taken up front so that close() after a conflicting group still writes a readable file.
+        rows, self._buffer = self._buffer, []
+        group = f"{len(self._row_groups):05d}"
+        for index, column in enumerate(self.columns):
+            values = [row[index] for row in rows]
+            if any(value is not None for value in values):
+                array = self._typed(column, _column_array(values))
+            elif column in self._dtypes:
+                array = self._typed(column, _missing_array(self._dtypes[column], len(values)))
+            else:
+                self._null_groups.setdefault(column, []).append(len(self._row_groups))
+                array = _missing_array(np.dtype(np.float64), len(values))
+            data = io.BytesIO()
+            np.save(data, array, allow_pickle=False)
+            self._archive.writestr(f"{group}/{column}.npy", data.getvalue())
+        self._row_groups.append(len(rows))
+
+    def _typed(self, column, array):
+        """Converts a row group's column to the column's type, widening the type where the group needs it."""
+        dtype = self._dtypes.setdefault(column, array.dtype)
+        if array.dtype != dtype:
+            numeric = {array.dtype.kind, dtype.kind} <= {"i", "f"}
+            if array.dtype.kind != dtype.kind and not numeric:
+                raise ValueError(f"Column '{column}' has {array.dtype} values in row group {len(self._row_groups)} "
+                                 f"but {dtype} values in earlier row groups.")
+            dtype = self._dtypes[column] = np.promote_types(dtype, array.dtype)
+        return array.astype(dtype, copy=False)
+
+    def close(self):
+        self._flush()
+        dtypes = {column: dtype.str for column, dtype in self._dtypes.items()}
+        self._archive.writestr("schema.json", json.dumps({"columns": self.columns, "row_groups": self._row_groups,
+                                                          "dtypes": dtypes, "null_groups": self._null_groups}))
+        self._archive.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def read_columnar(path, columns=None):
+    """
+    Reads a file written by ColumnarWriter.
+
+    :param path: Path of the columnar file.
+    :param columns: Optional list of columns to load; all columns when omitted.
+    :return: A dictionary of column name -> NumPy array.
+    """
+    with zipfile.ZipFile(path) as archive:
+        schema = json.loads(archive.read("schema.json"))
+        result = {}
+        for column in columns or schema["columns"]:
+            parts = [
+                np.load(io.BytesIO(archive.read(f"{group:05d}/{column}.npy")), allow_pickle=False)
+                for group in range(len(schema["row_groups"]))
+            ]
+            null_groups = set(schema.get("null_groups", {}).get(column, []))
+            dtype = schema.get("dtypes", {}).get(column)
+            if dtype is None:  # Written before the schema recorded column types
+                dtype = next((part.dtype for group, part in enumerate(parts) if group not in null_groups), None)
+            if dtype is not None:
+                dtype = np.dtype(dtype)
+                parts = [_missing_array(dtype, len(part)) if group in null_groups else part.astype(dtype, copy=False)
+                         for group, part in enumerate(parts)]
+            result[column] = np.concatenate(parts) if parts else np.array([])
+        return result
+
+
+def write_rows(columns, rows, path, file_format=None):
+    """
+    Streams rows to a CSV, JSON Lines, JSON or columnar file.
+
+    :param columns: Column names.
+    :param rows: An iterable of row tuples; it is consumed once and never held in memory.
+    :param path: Output path.
+    :param file_format: Output format; detected from the extension when omitted.
+    :return: The number of rows written.
+    """
+    file_format = detect_format(path, file_format)
+    count = 0
+    if file_format == "csv":
+        counter = [0]
+
+        def counted():
+            for row in rows:
+                counter[0] += 1
+                yield row
+
+        with open(path, "w", newline="", encoding="utf-8") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(columns)
+            writer.writerows(counted())  # csv writes Decimal and date values in their str() form
+        return counter[0]
+    if file_format == "columnar":
+        with ColumnarWriter(path, columns) as writer:
+            for row in rows:
+                writer.write(row)
+                count += 1
+        return count
+    with open(path, "w", encoding="utf-8") as handle:
+        if file_format == "jsonl":
+            for row in rows:
+                handle.write(json.dumps(dict(zip(columns, row)), default=_json_default) + "\n")
+                count += 1
+        else:
+            handle.write("[")
+            for row in rows:
+                handle.write((",\n" if count else "\n") + json.dumps(dict(zip(columns, row)), default=_json_default))
+                count += 1
+            handle.write("\n]\n")
+    return count
+
+
+# -------------------- Report Engine --------------------
+
+class ReportEngine:
+    """
+    Builds rental reports with the aggregation done by the database.
+
+    Each report is a single GROUP BY query, so only the aggregated rows cross the network no
+    matter how many bookings the period holds. Raw exports stream rows through an unbuffered
+    cursor in chunks straight into the output file, so memory stays bounded for any table size.
+    """
+
+    def __init__(self, db_connection):
+        """
+        Initializes the report engine with a database connection.
+
+        :param db_connection: The database connection object.
+        """
+        self.db_connection = db_connection
+
+    @staticmethod
+    def _date_range(start_date, end_date):
+        """Defaults to the year up to today; accepts dates or YYYY-MM-DD strings."""
+        end_date = end_date or date.today()
+        start_date = start_date or (date.fromisoformat(str(end_date)) - timedelta(days=365))
+        return str(start_date), str(end_date)
+
+    def _aggregate(self, query, params):
+        """Runs a report query and returns its rows as dictionaries."""
+        with self.db_connection.connect(read_only=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            columns = [column[0] for column in cursor.description]
+            rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+            cursor.close()
+            return rows
+
+    def revenue_by_period(self, start_date=None, end_date=None, period="month"):
+        """
+        Revenue and booking counts per day, month or year of the rental start date.
+
+        :param start_date: First rental start date included (defaults to a year before end_date).
+        :param end_date: Last rental start date included (defaults to today).
+        :param period: 'day', 'month' or 'year'.
+        :return: A list of dictionaries with period, bookings, rental_days, booked_revenue and paid_revenue.
+        """
+        if period not in PERIOD_FORMATS:
+            raise ValueError(f"Unknown report period '{period}'.")
+        start_date, end_date = self._date_range(start_date, end_date)
+        return self._aggregate(report_revenue_by_period, (PERIOD_FORMATS[period], start_date, end_date))
+
+    def revenue_by_car(self, start_date=None, end_date=None):
+        """
+        Revenue per car, highest first.
+
+        :return: A list of dictionaries with car_id, make, model, bookings, rental_days and revenue.
+        """
+        return self._aggregate(report_revenue_by_car, self._date_range(start_date, end_date))
+
+    def revenue_by_customer(self, start_date=None, end_date=None):
+        """
+        Revenue per customer, highest first.
+
+        :return: A list of dictionaries with customer_id, username, bookings, rental_days and revenue.
+        """
+        return self._aggregate(report_revenue_by_customer, self._date_range(start_date, end_date))
+
+    def utilisation(self, start_date=None, end_date=None):
+        """
+        Share of the days between start_date and end_date (inclusive) on which each car was booked.
+
+        :return: A list of dictionaries with car_id, make, model, booked_days and utilisation (0-1).
+        """
+        start_date, end_date = self._date_range(start_date, end_date)
+        window_days = (date.fromisoformat(end_date) - date.fromisoformat(start_date)).days + 1
+        rows = self._aggregate(report_car_utilisation, (end_date, start_date, end_date, start_date))
+        for row in rows:
+            row["booked_days"] = int(row["booked_days"] or 0)
+            row["utilisation"] = round(row["booked_days"] / window_days, 4) if window_days > 0 else 0.0
+        return rows
+
+    def late_return_rate(self, start_date=None, end_date=None, period="month"):
+        """
+        Returned rentals, how many were late and the late fees charged, per period of the return date.
+
+        :return: A list of dictionaries with period, returns, late_returns, late_fees and late_rate (0-1).
+        """
+        if period not in PERIOD_FORMATS:
+            raise ValueError(f"Unknown report period '{period}'.")
+        start_date, end_date = self._date_range(start_date, end_date)
+        rows = self._aggregate(report_late_returns, (PERIOD_FORMATS[period], start_date, end_date))
+        for row in rows:
+            row["late_returns"] = int(row["late_returns"] or 0)
+            row["late_rate"] = round(row["late_returns"] / row["returns"], 4) if row["returns"] else 0.0
+        return rows
+
+    def summary(self, start_date=None, end_date=None, period="month"):
+        """
+        Runs every report for one date range.
+
+        :return: A dictionary of report name -> list of row dictionaries.
+        """
+        return {
+            "revenue_by_period": self.revenue_by_period(start_date, end_date, period),
+            "revenue_by_car": self.revenue_by_car(start_date, end_date),
+            "revenue_by_customer": self.revenue_by_customer(start_date, end_date),
+            "utilisation": self.utilisation(start_date, end_date),
+            "late_returns": self.late_return_rate(start_date, end_date, period),
+        }
+
+    # -------------------- Exports --------------------
+
+    def stream_table(self, table, chunk_size=5000):
+        """
+        Streams every row of a table through an unbuffered cursor.
+
+        :param table: One of EXPORT_TABLES.
+        :param chunk_size: Rows fetched from the server at a time.
+        :return: A tuple (column names, generator of row tuples). The generator holds a pooled
+                 connection until it is exhausted or closed.
+        """
+        if table not in EXPORT_TABLES:
+            raise ValueError(f"Table '{table}' cannot be exported.")
+        conn = self.db_connection.connect(read_only=True)
+        cursor = conn.cursor(buffered=False)
+        try:
+            cursor.execute(export_table.format(table=table))
+            columns = [column[0] for column in cursor.description]
+        except Exception:
+            cursor.close()
+            conn.close()
+            raise
+
+        def rows():
+            try:
+                while True:
+                    chunk = cursor.fetchmany(chunk_size)
+                    if not chunk:
+                        return
+                    yield from chunk
+            finally:
+                cursor.close()
+                conn.close()
+
+        return columns, rows()
+
+    def export_table(self, table, path, file_format=None, chunk_size=5000):
+        """
+        Exports a whole table to a file without holding it in memory.
+
+        :param table: One of EXPORT_TABLES.
+        :param path: Output path.
+        :param file_format: 'csv', 'jsonl', 'json' or 'columnar'; detected from the extension when omitted.
+        :param chunk_size: Rows fetched from the server at a time.
+        :return: The number of rows written.
+        """
+        file_format = detect_format(path, file_format)
+        columns, rows = self.stream_table(table, chunk_size)
+        try:
+            return write_rows(columns, rows, path, file_format)
+        finally:
+            rows.close()
+
+    @staticmethod
+    def export_report(rows, path, file_format=None):
+        """
+        Writes the rows of one report (a list of dictionaries) to a file.
+
+        :return: The number of rows written.
+        """
+        columns = list(rows[0]) if rows else []
+        return write_rows(columns, (tuple(row[column] for column in columns) for row in rows), path, file_format)
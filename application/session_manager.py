@@ -0,0 +1,253 @@
+import base64
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from data_models.user import User
+from database.queries import insert_session, select_session, touch_session, delete_session, delete_expired_sessions
+
+
+class SessionManager:
+    """
+    Issues signed session tokens after login and resolves them back to users.
+
+    A token is '<session id>.<HMAC-SHA256 signature>'. Checking the signature rejects forged
+    tokens without any lookup, and valid ones are resolved from an in-memory LRU store with a
+    sliding TTL, so authenticated operations need neither a bcrypt verify nor a user_management
+    query. With a database connection, sessions are also written to the user_sessions table
+    so they survive restarts and can be shared between processes using the same secret. The
+    table is then the source of truth: every authentication extends the stored expiry with one
+    UPDATE, which also finds sessions revoked (deleted) by another process, and the memory store
+    only saves loading the user.
+
+    Expired sessions are dropped by sweep(), which the CLI and API call every sweep_interval
+    seconds through sweep_if_due(); it also deletes expired user_sessions rows.
+    """
+
+    def __init__(self, secret=None, ttl=1800.0, max_sessions=10000, db_connection=None, sweep_interval=60.0):
+        """
+        Initializes the session manager.
+
+        :param secret: Signing key (str or bytes); a random key is generated when omitted.
+        :param ttl: Seconds of inactivity after which a session expires.
+        :param max_sessions: Sessions kept in memory; the least recently used are evicted first.
+        :param db_connection: Optional database connection used to persist sessions.
+        :param sweep_interval: Seconds between sweeps of expired sessions by sweep_if_due().
+        :raises ValueError: If sessions are persisted without a secret.
+        """
+        if not secret:
+            if db_connection:
+                # A random key would make every stored session unverifiable after a restart and in other processes.
+                raise ValueError("Persisted sessions need a SESSION_SECRET.")
+            secret = secrets.token_bytes(32)
+        self._secret = secret.encode("utf-8") if isinstance(secret, str) else secret
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.db_connection = db_connection
+        self.sweep_interval = sweep_interval
+        self._sessions = OrderedDict()  # session_id -> (User, expires_at), soonest expiry first
+        self._lock = threading.Lock()
+        self._swept_at = time.time()
+
+    def _sign(self, session_id):
+        digest = hmac.new(self._secret, session_id.encode("utf-8"), hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(digest).rstrip(b"=").decode("ascii")
+
+    def _session_id(self, token):
+        """Returns the session ID of a correctly signed token, or None."""
+        if not token or "." not in token:
+            return None
+        session_id, signature = token.rsplit(".", 1)
+        if not hmac.compare_digest(signature, self._sign(session_id)):
+            return None
+        return session_id
+
+    def _remember(self, session_id, user, expires_at):
+        """Stores a session in memory. Caller holds the lock."""
+        self._sessions[session_id] = (user, expires_at)
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+    def create_session(self, user):
+        """
+        Starts a session for an authenticated user.
+
+        :param user: The User returned by UserManagement.login_user.
+        :return: The session token.
+        """
+        session_id = secrets.token_urlsafe(24)
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._remember(session_id, user, expires_at)
+        if self.db_connection:
+            self._store(session_id, user, expires_at)
+        return f"{session_id}.{self._sign(session_id)}"
+
+    def authenticate(self, token):
+        """
+        Resolves a token to its user and extends the session.
+
+        :param token: A token from create_session.
+        :return: The User, or None if the token is forged, unknown or expired.
+        """
+        session_id = self._session_id(token)
+        if session_id is None:
+            return None
+        now = time.time()
+        if self.db_connection:
+            return self._authenticate_persisted(session_id, now)
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            user, expires_at = entry
+            if expires_at <= now:
+                del self._sessions[session_id]
+                return None
+            self._remember(session_id, user, now + self.ttl)
+            return user
+
+    def _authenticate_persisted(self, session_id, now):
+        """authenticate() for persisted sessions: the user_sessions row decides whether the session is live."""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+        if entry is None:
+            entry = self._load(session_id)
+            if entry is None or entry[1] <= now:
+                return None
+        if not self._touch(session_id, now):
+            with self._lock:
+                self._sessions.pop(session_id, None)
+            return None
+        with self._lock:
+            self._remember(session_id, entry[0], now + self.ttl)
+        return entry[0]
+
+    def revoke(self, token):
+        """
+        Ends a session, e.g. on logout.
+
+        :param token: A token from create_session.
+        :return: None
+        """
+        session_id = self._session_id(token)
+        if session_id is None:
+            return
+        with self._lock:
+            self._sessions.pop(session_id, None)
+        if self.db_connection:
+            self._delete(session_id)
+
+    def sweep(self):
+        """
+        Drops expired sessions from memory and deletes expired persisted sessions.
+
+        Every session is moved to the end of the store with an expiry of now + ttl whenever it is
+        used, so the expired ones are at the front and the scan stops at the first live session.
+
+        :return: The number of sessions removed from memory.
+        """
+        now = time.time()
+        removed = 0
+        with self._lock:
+            self._swept_at = now
+            while self._sessions:
+                session_id, (_, expires_at) = next(iter(self._sessions.items()))
+                if expires_at > now:
+                    break
+                del self._sessions[session_id]
+                removed += 1
+        if self.db_connection:
+            self._delete_expired(now)
+        return removed
+
+    def sweep_if_due(self):
+        """
+        Runs sweep() if sweep_interval seconds have passed since the last one.
+
+        :return: The number of sessions removed from memory (0 when no sweep was due).
+        """
+        with self._lock:
+            if time.time() - self._swept_at < self.sweep_interval:
+                return 0
+            self._swept_at = time.time()
+        return self.sweep()
+
+    # -------------------- Persistence --------------------
+
+    def _store(self, session_id, user, expires_at):
+        try:
+            with self.db_connection.connect() as conn:
+                cursor = conn.cursor()
+                cursor.execute(insert_session, (session_id, user.user_id, user.username, user.role,
+                                       datetime.fromtimestamp(expires_at)))
+                conn.commit()
+                cursor.close()
+        except Exception as e:
+            print(f"Error while storing session: {e}")
+
+    def _load(self, session_id):
+        try:
+            with self.db_connection.connect() as conn:
+                cursor = conn.cursor()
+                cursor.execute(select_session, (session_id,))
+                row = cursor.fetchone()
+                cursor.close()
+        except Exception as e:
+            print(f"Error while loading session: {e}")
+            return None
+        if not row:
+            return None
+        user_id, username, role, expires_at = row
+        return User(user_id=user_id, username=username, password_hash=None, role=role), self._timestamp(expires_at)
+
+    @staticmethod
+    def _timestamp(expires_at):
+        if isinstance(expires_at, str):
+            expires_at = datetime.fromisoformat(expires_at)
+        return expires_at.timestamp()
+
+    def _touch(self, session_id, now):
+        """Extends a persisted session to now + ttl; returns False if it was revoked or has expired."""
+        try:
+            with self.db_connection.connect() as conn:
+                cursor = conn.cursor()
+                cursor.execute(touch_session, (datetime.fromtimestamp(now + self.ttl), session_id,
+                                               datetime.fromtimestamp(now)))
+                touched = cursor.rowcount > 0
+                conn.commit()
+                if not touched:
+                    # MySQL counts changed rows, so a second touch within the same second (DATETIME
+                    # has whole seconds) changes nothing; check that the row is still live instead.
+                    cursor.execute(select_session, (session_id,))
+                    row = cursor.fetchone()
+                    touched = bool(row) and self._timestamp(row[3]) > now
+                cursor.close()
+                return touched
+        except Exception as e:
+            print(f"Error while extending session: {e}")
+            return False
+
+    def _delete(self, session_id):
+        try:
+            with self.db_connection.connect() as conn:
+                cursor = conn.cursor()
+                cursor.execute(delete_session, (session_id,))
+                conn.commit()
+                cursor.close()
+        except Exception as e:
+            print(f"Error while deleting session: {e}")
+
+    def _delete_expired(self, now):
+        try:
+            with self.db_connection.connect() as conn:
+                cursor = conn.cursor()
+                cursor.execute(delete_expired_sessions, (datetime.fromtimestamp(now),))
+                conn.commit()
+                cursor.close()
+        except Exception as e:
+            print(f"Error while deleting expired sessions: {e}")
@@ -0,0 +1,347 @@
+import os
+import sys
+
+if __name__ == "__main__":
+    # Allow "python application/summaries.py" as well as "python -m application.summaries"
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+from data_models.dates import to_date as _day
+from database.queries import select_booking_state, select_return_state, upsert_daily_revenue, \
+    upsert_car_utilisation, upsert_customer_spend, summary_rebuild_bookings, summary_rebuild_late_fees, \
+    summary_clear_table, summary_daily_revenue, summary_revenue_by_period, summary_car_utilisation, \
+    summary_customer_spend
+
+PERIOD_FORMATS = {"day": "%Y-%m-%d", "month": "%Y-%m", "year": "%Y"}
+
+CENT = Decimal("0.01")
+BOOKING_STATE_COLUMNS = ("booking_id", "car_id", "customer_id", "rental_start_date", "rental_end_date",
+                         "total_rental_days", "status", "total_rental_price", "amount_paid")
+
+
+def to_money(value):
+    """Rounds an amount the way a DECIMAL(10, 2) column stores it."""
+    return Decimal(str(value or 0)).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def _month_days(start, end):
+    """Splits the inclusive range [start, end] into (first day of month, days in that month) pairs."""
+    while start <= end:
+        next_month = (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+        last = min(end, next_month - timedelta(days=1))
+        yield start.replace(day=1), (last - start).days + 1
+        start = next_month
+
+
+class SummaryDelta:
+    """
+    Changes to the three summary tables, accumulated in memory and written with one upsert per table.
+
+    daily_revenue is keyed by rental start date (late fees by return date), car_utilisation by
+    car and month, customer_spend by customer. Contributions are added for a booking's new state
+    and subtracted for its old state, so any change (new booking, payment, rejection, return) is
+    recorded the same way. Like ReportEngine, every booking that is not cancelled counts, so an
+    approval (pending -> confirmed) leaves the totals unchanged.
+    """
+
+    def __init__(self):
+        # day -> [bookings, rental_days, booked_revenue, paid_revenue, late_fees]
+        self.daily = defaultdict(lambda: [0, 0, Decimal(0), Decimal(0), Decimal(0)])
+        # (car_id, month) -> [booked_days, bookings]
+        self.cars = defaultdict(lambda: [0, 0])
+        # customer_id -> [bookings, booked_amount, paid_amount, late_fees]
+        self.customers = defaultdict(lambda: [0, Decimal(0), Decimal(0), Decimal(0)])
+
+    def add_booking(self, state, sign=1):
+        """
+        Adds (or with sign=-1 removes) a booking's contribution.
+
+        Cancelled bookings contribute nothing.
+
+        :param state: A dictionary with the BOOKING_STATE_COLUMNS, or None.
+        :param sign: 1 to add, -1 to subtract.
+        """
+        if not state or state["status"] == "cancelled":
+            return
+        start, end = _day(state["rental_start_date"]), _day(state["rental_end_date"])
+        price, paid = to_money(state["total_rental_price"]), to_money(state["amount_paid"])
+        daily = self.daily[start]
+        daily[0] += sign
+        daily[1] += sign * int(state["total_rental_days"])
+        daily[2] += sign * price
+        daily[3] += sign * paid
+        customer = self.customers[state["customer_id"]]
+        customer[0] += sign
+        customer[1] += sign * price
+        customer[2] += sign * paid
+        for month, days in _month_days(start, end):
+            car = self.cars[(state["car_id"], month)]
+            car[0] += sign * days
+            car[1] += sign
+
+    def add_late_fee(self, customer_id, return_date, fee, sign=1):
+        """
+        Adds (or with sign=-1 removes) a late fee charged on a return.
+
+        :param customer_id: The customer who returned the car.
+        :param return_date: The actual return date.
+        :param fee: The late fee.
+        :param sign: 1 to add, -1 to subtract.
+        """
+        fee = to_money(fee)
+        if not fee or return_date is None:
+            return
+        self.daily[_day(return_date)][4] += sign * fee
+        self.customers[customer_id][3] += sign * fee
+
+    def change_booking(self, before, after):
+        """Records a booking going from state before to state after (either may be None)."""
+        self.add_booking(before, -1)
+        self.add_booking(after, 1)
+
+    def change_returns(self, customer_id, before, after):
+        """
+        Records a booking's rental_management rows going from before to after.
+
+        :param customer_id: The customer of the booking.
+        :param before: (return_date, late_returns_fee, status) tuples read with SummaryTables.return_state().
+        :param after: The same tuples after the change.
+        """
+        for rows, sign in ((before, -1), (after, 1)):
+            for return_date, fee, status in rows:
+                if status == "returned":
+                    self.add_late_fee(customer_id, return_date, fee, sign)
+
+    def rows(self):
+        """Returns the non-zero changes as parameter lists for the three upserts, in key order."""
+        daily = [(day, *values) for day, values in sorted(self.daily.items()) if any(values)]
+        cars = [(car_id, month, *values) for (car_id, month), values in sorted(self.cars.items()) if any(values)]
+        customers = [(customer_id, *values) for customer_id, values in sorted(self.customers.items()) if any(values)]
+        return daily, cars, customers
+
+
+class SummaryTables:
+    """
+    Maintains the daily_revenue, car_utilisation and customer_spend summary tables.
+
+    The services call record() inside their own transactions, just before committing, so the
+    summaries change atomically with the bookings they describe and dashboards read a handful of
+    precomputed rows instead of rescanning rental_booking and rental_management. Upserts are
+    applied in key order so concurrent transactions lock summary rows in the same order.
+    rebuild() recomputes the tables from scratch, e.g. after the migration that creates them.
+    summary() answers the admin report screen from these tables when SUMMARY_TABLES is on.
+    """
+
+    def __init__(self, db_connection):
+        """
+        Initializes the summary tables with a database connection.
+
+        :param db_connection: The database connection object.
+        """
+        self.db_connection = db_connection
+
+    @staticmethod
+    def booking_state(cursor, booking_id):
+        """
+        Reads and locks a booking's current state.
+
+        :param cursor: A cursor inside the caller's transaction.
+        :param booking_id: The booking ID.
+        :return: A dictionary with the BOOKING_STATE_COLUMNS, or None if the booking does not exist.
+        """
+        cursor.execute(select_booking_state, (booking_id,))
+        row = cursor.fetchone()
+        return dict(zip(BOOKING_STATE_COLUMNS, row)) if row else None
+
+    @staticmethod
+    def return_state(cursor, booking_id):
+        """
+        Reads and locks the rental_management rows of a booking.
+
+        :param cursor: A cursor inside the caller's transaction.
+        :param booking_id: The booking ID.
+        :return: A list of (return_date, late_returns_fee, status) tuples.
+        """
+        cursor.execute(select_return_state, (booking_id,))
+        return cursor.fetchall()
+
+    @staticmethod
+    def record(cursor, delta):
+        """
+        Applies a SummaryDelta inside the caller's transaction.
+
+        :param cursor: A cursor inside the caller's transaction.
+        :param delta: The SummaryDelta to apply.
+        """
+        daily, cars, customers = delta.rows()
+        if daily:
+            cursor.executemany(upsert_daily_revenue, daily)
+        if cars:
+            cursor.executemany(upsert_car_utilisation, cars)
+        if customers:
+            cursor.executemany(upsert_customer_spend, customers)
+
+    def record_booking_change(self, cursor, before, after):
+        """
+        Records one booking's change of state inside the caller's transaction.
+
+        :param cursor: A cursor inside the caller's transaction.
+        :param before: The state read with booking_state() before the change, or None for a new booking.
+        :param after: The state after the change, or None if the booking was deleted.
+        """
+        delta = SummaryDelta()
+        delta.change_booking(before, after)
+        self.record(cursor, delta)
+
+    # -------------------- Rebuild --------------------
+
+    def rebuild(self, chunk_size=10000):
+        """
+        Recomputes every summary table from rental_booking and rental_management.
+
+        Bookings are streamed in chunks and folded into in-memory totals whose size depends on
+        the number of days, cars and customers, not on the number of bookings. The tables are
+        replaced in a single transaction. The rows are read with shared locks, so bookings,
+        payments and returns wait until the rebuild commits instead of recording deltas that
+        the rebuild would then overwrite; run it off-peak.
+
+        :param chunk_size: Rows fetched at a time.
+        :return: A dictionary with the number of rows written per table.
+        """
+        delta = SummaryDelta()
+        with self.db_connection.connect() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(summary_rebuild_bookings)
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    for row in rows:
+                        delta.add_booking(dict(zip(BOOKING_STATE_COLUMNS, row)))
+                cursor.execute(summary_rebuild_late_fees)
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    for customer_id, return_date, fee in rows:
+                        delta.add_late_fee(customer_id, return_date, fee)
+
+                for table in ("daily_revenue", "car_utilisation", "customer_spend"):
+                    cursor.execute(summary_clear_table.format(table=table))
+                self.record(cursor, delta)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+        daily, cars, customers = delta.rows()
+        return {"daily_revenue": len(daily), "car_utilisation": len(cars), "customer_spend": len(customers)}
+
+    # -------------------- Dashboard Reads --------------------
+
+    def _read(self, query, params=()):
+        with self.db_connection.connect(read_only=True) as conn:
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+            cursor.close()
+            return rows
+
+    def daily_revenue(self, start_date, end_date):
+        """
+        Precomputed revenue per day.
+
+        :param start_date: First day (YYYY-MM-DD).
+        :param end_date: Last day (YYYY-MM-DD).
+        :return: A list of dictionaries with day, bookings, rental_days, booked_revenue, paid_revenue and late_fees.
+        """
+        return self._read(summary_daily_revenue, (start_date, end_date))
+
+    def revenue_by_period(self, start_date, end_date, period="month"):
+        """
+        Precomputed revenue per day, month or year.
+
+        :param start_date: First day (YYYY-MM-DD).
+        :param end_date: Last day (YYYY-MM-DD).
+        :param period: 'day', 'month' or 'year'.
+        :return: A list of dictionaries with period, bookings, rental_days, booked_revenue, paid_revenue and late_fees.
+        """
+        if period not in PERIOD_FORMATS:
+            raise ValueError(f"Unknown report period '{period}'.")
+        return self._read(summary_revenue_by_period, (PERIOD_FORMATS[period], start_date, end_date))
+
+    def car_utilisation(self, month):
+        """
+        Precomputed booked days per car for one month.
+
+        :param month: Any date in the month (YYYY-MM-DD).
+        :return: A list of dictionaries with car_id, month, booked_days, bookings and utilisation (0-1).
+        """
+        first = _day(month).replace(day=1)
+        days_in_month = ((first + timedelta(days=31)).replace(day=1) - first).days
+        rows = self._read(summary_car_utilisation, (first.isoformat(), first.isoformat()))
+        for row in rows:
+            row["utilisation"] = round(row["booked_days"] / days_in_month, 4)
+        return rows
+
+    def utilisation(self, start_date, end_date):
+        """
+        Precomputed booked days per car over the whole months from start_date to end_date.
+
+        :param start_date: Any date in the first month (YYYY-MM-DD).
+        :param end_date: Any date in the last month (YYYY-MM-DD).
+        :return: A list of dictionaries with car_id, make, model, booked_days, bookings and utilisation (0-1).
+        """
+        first = _day(start_date).replace(day=1)
+        last = _day(end_date).replace(day=1)
+        days = ((last + timedelta(days=31)).replace(day=1) - first).days
+        rows = self._read(summary_car_utilisation, (first.isoformat(), last.isoformat()))
+        for row in rows:
+            row["booked_days"] = int(row["booked_days"] or 0)
+            row["utilisation"] = round(row["booked_days"] / days, 4) if days > 0 else 0.0
+        return rows
+
+    def customer_spend(self, limit=20):
+        """
+        Precomputed spend per customer, highest first.
+
+        :param limit: Number of customers returned.
+        :return: A list of dictionaries with customer_id, bookings, booked_amount, paid_amount and late_fees.
+        """
+        return self._read(summary_customer_spend, (limit,))
+
+    def summary(self, start_date=None, end_date=None, period="month", limit=20):
+        """
+        The admin report screen's reports, read from the summary tables.
+
+        :param start_date: First date included (YYYY-MM-DD); defaults to a year before end_date.
+        :param end_date: Last date included (YYYY-MM-DD); defaults to today.
+        :param period: 'day', 'month' or 'year' for the revenue report.
+        :param limit: Number of customers in the spend report.
+        :return: A dictionary of report name -> list of row dictionaries.
+        """
+        end_date = _day(end_date) if end_date else date.today()
+        start_date = _day(start_date) if start_date else end_date - timedelta(days=365)
+        start_date, end_date = start_date.isoformat(), end_date.isoformat()
+        return {
+            "revenue_by_period": self.revenue_by_period(start_date, end_date, period),
+            "utilisation_by_month": self.utilisation(start_date, end_date),
+            "customer_spend": self.customer_spend(limit),
+        }
+
+
+if __name__ == "__main__":
+    from application.config import DatabaseConfig
+    from database.db_connection import DatabaseConnection
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "rebuild"
+    if command == "rebuild":
+        counts = SummaryTables(DatabaseConnection.get('primary', DatabaseConfig)).rebuild()
+        print(f"Rebuilt summary tables: {counts}")
+    else:
+        print("Usage: python -m application.summaries rebuild")
+        sys.exit(2)
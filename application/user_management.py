@@ -1,24 +1,56 @@
 import mysql.connector
-import bcrypt
-from database.queries import create_user
+from database.queries import create_user, rehash_user_password, select_user_exists, set_user_reset_code
 from database.db_connection import DatabaseConnection
+from database.statements import statements
 import string
 import random
+import threading
 from datetime import datetime, timedelta
 from data_models.user import User
+from application.password_hasher import hash_password, check_password, chain_future, DEFAULT_ROUNDS
+from application.rate_limiter import LoginThrottled
+from concurrent.futures import Future, ThreadPoolExecutor
 
 class UserManagement:
     """
     Manages user-related operations such as registration, login, and password reset.
     """
 
-    def __init__(self, db_connection: DatabaseConnection):
+    def __init__(self, db_connection: DatabaseConnection, password_hasher=None, rate_limiter=None,
+                 account_filter=None):
         """
         Initializes the UserManager with a database connection.
 
         :param db_connection: The database connection object.
+        :param password_hasher: Optional PasswordHasher that runs bcrypt off the calling thread.
+        :param rate_limiter: Optional LoginRateLimiter consulted before every login attempt.
+        :param account_filter: Optional AccountFilter that answers lookups for unknown accounts in memory.
         """
         self.db_connection = db_connection
+        self.password_hasher = password_hasher
+        self.rate_limiter = rate_limiter
+        self.account_filter = account_filter
+        self._background = None  # Thread for database writes that follow a login, created on first use
+        self._background_lock = threading.Lock()
+
+    # -------------------- Password Hashing --------------------
+
+    def _hash_password(self, password):
+        """Hashes a password on the hasher's workers, or inline when no hasher is configured."""
+        if self.password_hasher:
+            return self.password_hasher.hash(password)
+        return hash_password(password, DEFAULT_ROUNDS)
+
+    def _verify_password_async(self, password, password_hash):
+        """Returns a Future resolving to whether the password matches the hash."""
+        if self.password_hasher:
+            return self.password_hasher.verify_async(password, password_hash)
+        future = Future()
+        try:
+            future.set_result(check_password(password, password_hash))
+        except Exception as e:
+            future.set_exception(e)
+        return future
 
     # -------------------- Reset Token Functionality --------------------
 
@@ -29,18 +61,19 @@ class UserManagement:
 
     def set_reset_code(self, email):
         """Generate and save a reset token for the user."""
+        if self.account_filter and not self.account_filter.might_exist(email):
+            return None
         code = self.generate_reset_code()
         expiry_time = datetime.now() + timedelta(minutes=15)  # Token valid for 15 minutes
-        query = """
-           UPDATE user_management 
-           SET reset_code = %s, reset_code_expiry = %s 
-           WHERE email = %s
-           """
         cursor = None
         try:
             cursor = self.db_connection.cursor()
-            cursor.execute(query, (code, expiry_time, email))
+            cursor.execute(set_user_reset_code, (code, expiry_time, email))
             self.db_connection.commit()
+            if cursor.rowcount == 0:
+                if self.account_filter:
+                    self.account_filter.remember_missing(email)
+                return None
             return code
         except Exception as e:
             print(f"Database Error: {e}")
@@ -84,9 +117,9 @@ class UserManagement:
            """
         cursor = None
         try:
+            password_hash = self._hash_password(new_password)
             cursor = self.db_connection.cursor()
-            password_hash = bcrypt.hashpw(new_password.encode("utf-8"), bcrypt.gensalt())
-            cursor.execute(query, (password_hash.decode("utf-8"), email))
+            cursor.execute(query, (password_hash, email))
             self.db_connection.commit()
         except Exception as e:
             print(f"Error during password update: {e}")
@@ -113,7 +146,7 @@ class UserManagement:
         Registers a new user with detailed profile information.
         """
         # Hash the password for secure storage
-        password_hash = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt())
+        password_hash = self._hash_password(password)
         # Store the hashed password in the database
 
         # If the user is an admin, set license_number and license_expiry_date to None
@@ -131,7 +164,7 @@ class UserManagement:
                     create_user,
                     (
                         username,
-                        password_hash.decode("utf-8"),
+                        password_hash,
                         role,
                         first_name,
                         last_name,
@@ -143,6 +176,8 @@ class UserManagement:
                     ),
                 )
                 conn.commit()
+                if self.account_filter:
+                    self.account_filter.add(username, email)
                 print(f"User '{username}' registered successfully.")
         except mysql.connector.Error as e:
             print(f"Error during registration: {e}")
@@ -154,51 +189,117 @@ class UserManagement:
 
     # -------------------- User Login --------------------
 
-    def login_user(self, username, password):
-        cursor = None
+    def login_user(self, username, password, client=None):
+        future = self.login_user_async(username, password, client)
+        try:
+            return future.result()
+        except LoginThrottled as e:
+            print(e)
+            return None
+        except Exception as e:
+            print(f"Error during login: {e}")
+            return None
+
+    def login_user_async(self, username, password, client=None):
+        """
+        Looks the user up and verifies the password on the hasher's workers.
+
+        The database lookup runs on the calling thread; only the bcrypt check is deferred, so
+        many logins can be verified in parallel.
+
+        :param username: Username or email.
+        :param password: The plain-text password.
+        :param client: Optional client identifier (e.g. IP address) for rate limiting.
+        :return: A Future resolving to a User on success, or None; it fails with LoginThrottled when
+            the attempt is refused by the rate limiter.
+        """
+        failed = Future()
+        failed.set_result(None)
+        if self.rate_limiter and not self.rate_limiter.allow(username, client):
+            throttled = Future()
+            throttled.set_exception(LoginThrottled(self.rate_limiter.retry_after(username, client)))
+            return throttled
+        if self.account_filter and not self.account_filter.might_exist(username):
+            return failed  # User does not exist
         try:
             self.db_connection.ping()
             with self.db_connection.connect() as conn:
-                cursor = conn.cursor(dictionary=True)
-                cursor.execute(
-                    "SELECT user_id, password_hash, role FROM user_management WHERE BINARY username = %s OR BINARY email = %s",
-                    (username, username)
-                )
-                result = cursor.fetchone()
-                if result:
-                    user_id = result['user_id']
-                    stored_password_hash = result['password_hash']
-                    role = result['role']
-                    if stored_password_hash and bcrypt.checkpw(password.encode('utf-8'), stored_password_hash.encode('utf-8')):
-                        return User(user_id=user_id, username=username, password_hash=stored_password_hash, role=role)
-                    else:
-                        return None  # Incorrect password
-                else:
-                    return None  # User does not exist
+                rows = statements.execute(conn, "login_user_lookup", (username, username, username, username)).fetchall()
         except mysql.connector.Error as db_err:
             print(f"Database error during login: {db_err}")
-            return None
+            return failed
         except Exception as e:
             print(f"Error during login: {e}")
-            return None
-        finally:
-            if cursor:
-                cursor.close()
+            return failed
+
+        if not rows:
+            if self.account_filter:
+                self.account_filter.remember_missing(username)
+            return failed  # User does not exist
+        user_id, stored_password_hash, role = rows[0]
+        if isinstance(stored_password_hash, (bytes, bytearray)):
+            stored_password_hash = stored_password_hash.decode('utf-8')
+        if not stored_password_hash:
+            return failed
+
+        def _to_user(matches):
+            if matches:
+                if self.rate_limiter:
+                    self.rate_limiter.succeeded(username)
+                if self.password_hasher and self.password_hasher.needs_rehash(stored_password_hash):
+                    self._rehash_password(user_id, password, stored_password_hash)
+                return User(user_id=user_id, username=username, password_hash=stored_password_hash, role=role)
+            return None  # Incorrect password
+
+        return chain_future(self._verify_password_async(password, stored_password_hash), _to_user)
+
+    def _run_in_background(self, function, *args):
+        """Runs a blocking call on the background thread, off the hasher's result-handling thread."""
+        with self._background_lock:
+            if self._background is None:
+                self._background = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rehash")
+        return self._background.submit(function, *args)
+
+    def _rehash_password(self, user_id, password, old_hash):
+        """
+        Re-hashes a password at the current work factor in the background and stores the new hash.
+
+        Called after a successful login whose stored hash used an outdated work factor, so hashes
+        follow the calibrated cost upwards without forcing password resets. The hash is
+        only replaced if it is still old_hash, so a rehash racing a password reset cannot write
+        the old password back.
+        """
+        def _store(new_hash):
+            try:
+                with self.db_connection.connect() as conn:
+                    cursor = conn.cursor()
+                    cursor.execute(rehash_user_password, (new_hash, user_id, old_hash))
+                    conn.commit()
+                    cursor.close()
+            except Exception as e:
+                print(f"Error while upgrading password hash: {e}")
+
+        def _hashed(future):
+            try:
+                self._run_in_background(_store, future.result())
+            except Exception as e:
+                print(f"Error while upgrading password hash: {e}")
+
+        self.password_hasher.hash_async(password).add_done_callback(_hashed)
 
     # -------------------- Check User Existence --------------------
 
     def check_user_exists(self, email):
         """Check if a user exists with the given email."""
-        query = """
-           SELECT user_id
-           FROM user_management
-           WHERE email = %s
-           """
+        if self.account_filter and not self.account_filter.might_exist(email):
+            return False
         cursor = None
         try:
             cursor = self.db_connection.cursor()
-            cursor.execute(query, (email,))
+            cursor.execute(select_user_exists, (email,))
             user = cursor.fetchone()
+            if user is None and self.account_filter:
+                self.account_filter.remember_missing(email)
             return user is not None
         except Exception as e:
             print(f"Error during user existence check: {e}")
@@ -0,0 +1,143 @@
+"""
+Load test for the HTTP API (application/api.py).
+
+Opens a number of keep-alive connections and sends requests on each as fast as responses come
+back for a fixed duration, then reports requests/sec and latency percentiles. Only the standard
+library is used, so it can run from any machine that can reach the API.
+
+    python benchmarks/api_load_test.py --url http://127.0.0.1:8000 --path "/cars?page_size=20" \
+        --concurrency 64 --duration 20
+
+With --username/--password it logs in first and sends the session token, which is needed for
+the booking and rental endpoints. The one token is reused by every connection, so against an API
+running several workers the sessions must be shared (SESSION_PERSIST=True and a SESSION_SECRET).
+--body sends a JSON body (with --method POST).
+"""
+import argparse
+import asyncio
+import json
+import time
+from urllib.parse import urlsplit
+
+
+async def _request(reader, writer, host, method, path, body, token):
+    headers = [f"{method} {path} HTTP/1.1", f"Host: {host}", "Connection: keep-alive"]
+    if token:
+        headers.append(f"Authorization: Bearer {token}")
+    payload = body.encode("utf-8") if body else b""
+    if payload:
+        headers.append("Content-Type: application/json")
+    headers.append(f"Content-Length: {len(payload)}")
+    writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + payload)
+    await writer.drain()
+
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("connection closed by server")
+    status = int(status_line.split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    content = await reader.readexactly(length) if length else b""
+    return status, content
+
+
+async def _login(host, port, username, password):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        status, content = await _request(reader, writer, host, "POST", "/login",
+                                         json.dumps({"username": username, "password": password}), None)
+    finally:
+        writer.close()
+    if status != 200:
+        raise SystemExit(f"Login failed with HTTP {status}: {content.decode('utf-8', 'replace')}")
+    return json.loads(content)["token"]
+
+
+async def _client(host, port, method, path, body, token, deadline, results):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                status, _ = await _request(reader, writer, host, method, path, body, token)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                results["errors"] += 1
+                writer.close()
+                reader, writer = await asyncio.open_connection(host, port)
+                continue
+            results["latencies"].append(time.perf_counter() - started)
+            results["statuses"][status] = results["statuses"].get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+async def run(url, path, method="GET", body=None, concurrency=32, duration=10.0, username=None, password=None):
+    """
+    Runs the load test.
+
+    :param url: Base URL of the API, e.g. http://127.0.0.1:8000.
+    :param path: Request path including the query string.
+    :param method: HTTP method.
+    :param body: Optional JSON body.
+    :param concurrency: Number of concurrent keep-alive connections.
+    :param duration: Seconds to run for.
+    :param username: Optional username to log in with.
+    :param password: Password for username.
+    :return: A dictionary with request counts, requests/sec and latency percentiles (ms).
+    """
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    token = await _login(host, port, username, password) if username else None
+    results = {"latencies": [], "statuses": {}, "errors": 0}
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*[
+        _client(host, port, method, path, body, token, deadline, results) for _ in range(concurrency)
+    ])
+    elapsed = time.perf_counter() - started
+    latencies = sorted(results["latencies"])
+    return {
+        "requests": len(latencies),
+        "errors": results["errors"],
+        "statuses": results["statuses"],
+        "requests_per_second": len(latencies) / elapsed,
+        "p50_ms": _percentile(latencies, 0.50) * 1000,
+        "p95_ms": _percentile(latencies, 0.95) * 1000,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the car rental HTTP API.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--path", default="/cars?page_size=20")
+    parser.add_argument("--method", default="GET")
+    parser.add_argument("--body", help="JSON request body")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--username")
+    parser.add_argument("--password")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args.url, args.path, args.method.upper(), args.body, args.concurrency, args.duration,
+                             args.username, args.password))
+    print(f"{report['requests']} requests in {args.duration:.0f}s over {args.concurrency} connections")
+    print(f"Requests/sec: {report['requests_per_second']:.1f}")
+    print(f"Latency p50 {report['p50_ms']:.1f} ms, p95 {report['p95_ms']:.1f} ms, p99 {report['p99_ms']:.1f} ms")
+    print(f"Status codes: {report['statuses']}, connection errors: {report['errors']}")
+
+
+if __name__ == "__main__":
+    main()
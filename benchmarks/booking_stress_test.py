@@ -0,0 +1,227 @@
+"""
+Concurrency stress test for RentalBooking.book_car and RentalManagement.approve_rental(s).
+
+book_car refuses a booking that overlaps any live booking of the car, and approval refuses to
+confirm one that overlaps a confirmed booking (for rows that did not go through book_car). Each
+layer is tested on its own:
+
+1. Many threads book a handful of cars for random, heavily overlapping date ranges at the same
+   time; the database must then hold no two live bookings of the same car with overlapping dates.
+2. Overlapping pending bookings are inserted directly for a second set of cars, as an import
+   would, and the threads approve them concurrently (half one at a time, half in batches); no two
+   confirmed bookings of a car may overlap, and some approvals must have been refused.
+
+    python benchmarks/booking_stress_test.py --threads 64 --attempts 100 --cars 3
+
+The test creates its own cars (make 'STRESS-TEST') in the configured database and deletes them
+and their bookings when it finishes. Run it against a disposable database.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import contextlib
+import random
+import threading
+import time
+from datetime import date, timedelta
+from application.rental_booking import RentalBooking
+from application.rental_management import RentalManagement
+
+STRESS_MAKE = "STRESS-TEST"
+
+overlapping_bookings = """
+SELECT a.booking_id, b.booking_id FROM rental_booking a
+JOIN rental_booking b ON a.car_id = b.car_id AND a.booking_id < b.booking_id
+WHERE a.car_id IN ({cars}) AND a.status <> 'cancelled' AND b.status <> 'cancelled'
+  AND a.rental_start_date <= b.rental_end_date AND b.rental_start_date <= a.rental_end_date
+"""
+overlapping_confirmed = """
+SELECT a.booking_id, b.booking_id FROM rental_booking a
+JOIN rental_booking b ON a.car_id = b.car_id AND a.booking_id < b.booking_id
+WHERE a.car_id IN ({cars}) AND a.status = 'confirmed' AND b.status = 'confirmed'
+  AND a.rental_start_date <= b.rental_end_date AND b.rental_start_date <= a.rental_end_date
+"""
+
+
+def _create_cars(db_connection, count):
+    car_ids = []
+    with db_connection.connect() as conn:
+        cursor = conn.cursor()
+        for _ in range(count):
+            cursor.execute(
+                "INSERT INTO car_management (make, model, year, mileage, available_now, min_rent_period, "
+                "max_rent_period, daily_rate) VALUES (%s, 'Load', 2024, 0, 1, 1, 30, 50.00)",
+                (STRESS_MAKE,),
+            )
+            car_ids.append(cursor.lastrowid)
+        conn.commit()
+        cursor.close()
+    return car_ids
+
+
+def _insert_pending(db_connection, plans):
+    """Inserts (car_id, start, days) bookings directly, without book_car's overlap check."""
+    booking_ids = []
+    with db_connection.connect() as conn:
+        cursor = conn.cursor()
+        for car_id, start, days in plans:
+            end = start + timedelta(days=days - 1)
+            cursor.execute(
+                "INSERT INTO rental_booking (car_id, customer_id, rental_start_date, rental_end_date, "
+                "total_rental_days, status, total_rental_price) VALUES (%s, 1, %s, %s, %s, 'pending', %s)",
+                (car_id, start.isoformat(), end.isoformat(), days, 50 * days),
+            )
+            booking_ids.append(cursor.lastrowid)
+        conn.commit()
+        cursor.close()
+    return booking_ids
+
+
+def _overlaps(db_connection, query, car_ids):
+    placeholders = ", ".join(["%s"] * len(car_ids))
+    with db_connection.connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query.format(cars=placeholders), tuple(car_ids))
+        pairs = cursor.fetchall()
+        cursor.close()
+    return pairs
+
+
+def _cleanup(db_connection, car_ids):
+    placeholders = ", ".join(["%s"] * len(car_ids))
+    with db_connection.connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"DELETE FROM rental_booking WHERE car_id IN ({placeholders})", tuple(car_ids))
+        cursor.execute(f"DELETE FROM car_management WHERE car_id IN ({placeholders})", tuple(car_ids))
+        conn.commit()
+        cursor.close()
+
+
+def _run_threads(threads, target):
+    barrier = threading.Barrier(threads)
+    workers = [threading.Thread(target=target, args=(index, barrier)) for index in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - started
+
+
+def run_stress(db_connection, cars=3, threads=32, attempts=50, horizon_days=60, seed=None):
+    """
+    Runs the stress test.
+
+    :param db_connection: The database connection object (its pool should allow `threads` connections).
+    :param cars: Number of cars contended for.
+    :param threads: Number of concurrent clients.
+    :param attempts: Booking attempts per client.
+    :param horizon_days: Bookings start within this many days, so a small value means more overlap.
+    :param seed: Optional random seed.
+    :return: A dictionary with booking/approval counts, throughput and the overlapping pairs found.
+    """
+    rng = random.Random(seed)
+    car_ids = _create_cars(db_connection, cars)
+    approval_car_ids = _create_cars(db_connection, cars)
+    booking = RentalBooking(db_connection)
+    management = RentalManagement(db_connection)
+    first_day = date.today() + timedelta(days=1)
+
+    def random_plans(cars_to_use):
+        return [
+            [
+                (rng.choice(cars_to_use), first_day + timedelta(days=rng.randrange(horizon_days)), rng.randint(1, 7))
+                for _ in range(attempts)
+            ]
+            for _ in range(threads)
+        ]
+
+    plans = random_plans(car_ids)
+    counts = {"booked": 0, "refused": 0, "approval_refused": 0}
+    lock = threading.Lock()
+
+    def book(index, barrier):
+        barrier.wait()
+        for car_id, start, days in plans[index]:
+            end = start + timedelta(days=days - 1)
+            ok = booking.book_car(1, car_id, start.isoformat(), end.isoformat(), 50 * days)
+            with lock:
+                counts["booked" if ok else "refused"] += 1
+
+    try:
+        booking_seconds = _run_threads(threads, book)
+        overlaps = _overlaps(db_connection, overlapping_bookings, car_ids)
+
+        # Pending bookings that only approval can keep apart: one thread's worth of plans, each twice.
+        booking_ids = _insert_pending(db_connection, random_plans(approval_car_ids)[0] * 2)
+        decided = {}
+
+        def approve(index, barrier):
+            barrier.wait()
+            # Every client tries to approve every booking, so each booking is approved concurrently.
+            shift = index % len(booking_ids)
+            for start in range(0, len(booking_ids), 8):
+                batch = (booking_ids[shift:] + booking_ids[:shift])[start:start + 8]
+                if index % 2:
+                    results = management.approve_rentals(batch)
+                else:
+                    results = {booking_id: "approved" if management.approve_rental(booking_id) else "refused"
+                               for booking_id in batch}
+                with lock:
+                    for booking_id, result in results.items():
+                        decided.setdefault(booking_id, set()).add(result)
+
+        approval_seconds = _run_threads(threads, approve) if booking_ids else 0.0
+        counts["approval_refused"] = sum("approved" not in results for results in decided.values())
+        confirmed_overlaps = _overlaps(db_connection, overlapping_confirmed, approval_car_ids)
+    finally:
+        _cleanup(db_connection, car_ids + approval_car_ids)
+
+    attempts_total = threads * attempts
+    return dict(counts, attempts=attempts_total, overlaps=overlaps, confirmed_overlaps=confirmed_overlaps,
+                pending=len(booking_ids), bookings_per_second=attempts_total / booking_seconds if booking_seconds else 0.0,
+                approval_seconds=approval_seconds)
+
+
+def main():
+    from application.config import DatabaseConfig, DatabasePoolConfig
+    from database.db_connection import DatabaseConnection
+
+    parser = argparse.ArgumentParser(description="Stress test concurrent car bookings for double bookings.")
+    parser.add_argument("--cars", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--attempts", type=int, default=50)
+    parser.add_argument("--horizon-days", type=int, default=60)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--verbose", action="store_true", help="show the services' per-booking messages")
+    args = parser.parse_args()
+
+    pool_options = dict(DatabasePoolConfig, max_size=max(DatabasePoolConfig['max_size'], args.threads))
+    db_connection = DatabaseConnection.get('stress', DatabaseConfig, pool_options=pool_options)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(sys.stdout if args.verbose else devnull):
+        report = run_stress(db_connection, args.cars, args.threads, args.attempts, args.horizon_days, args.seed)
+    print(f"{report['attempts']} booking attempts: {report['booked']} booked, {report['refused']} refused "
+          f"({report['bookings_per_second']:.0f} attempts/sec)")
+    print(f"{report['pending']} overlapping pending bookings: {report['pending'] - report['approval_refused']} "
+          f"approved, {report['approval_refused']} refused ({report['approval_seconds']:.1f}s)")
+    failed = False
+    if report["overlaps"]:
+        print(f"FAILED: {len(report['overlaps'])} overlapping booking pairs, e.g. {report['overlaps'][:5]}")
+        failed = True
+    if report["confirmed_overlaps"]:
+        print(f"FAILED: {len(report['confirmed_overlaps'])} overlapping confirmed pairs, "
+              f"e.g. {report['confirmed_overlaps'][:5]}")
+        failed = True
+    if report["pending"] and not report["approval_refused"]:
+        print("FAILED: approval never refused an overlapping booking, so its conflict check was not exercised")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("OK: no double bookings")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Micro-benchmark for building data models from database rows.
+
+Compares the previous way of building a Car (a __dict__-backed object filled field by field
+from row[0]..row[8]) with the slotted Car built by Car.from_rows(), on synthetic rows shaped
+like "SELECT * FROM car_management". Reports objects/sec and the memory held per object
+(measured with tracemalloc, excluding the rows themselves).
+
+    python benchmarks/data_model_benchmark.py --rows 200000 --repeat 5
+
+No database is needed.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import gc
+import time
+import tracemalloc
+from decimal import Decimal
+from data_models.car import Car
+
+CAR_COLUMNS = ("car_id", "make", "model", "year", "mileage", "available_now", "min_rent_period", "max_rent_period",
+               "daily_rate")
+
+
+class DictCar:
+    """The Car model as it was before __slots__: every instance carries a __dict__."""
+
+    def __init__(self, car_id, make, model, year, mileage, available_now, min_rent_period, max_rent_period, daily_rate):
+        self.car_id = car_id
+        self.make = make
+        self.model = model
+        self.year = year
+        self.mileage = mileage
+        self.available_now = available_now
+        self.min_rent_period = min_rent_period
+        self.max_rent_period = max_rent_period
+        self.daily_rate = daily_rate
+
+
+def build_dict_cars(rows):
+    return [
+        DictCar(
+            car_id=row[0],
+            make=row[1],
+            model=row[2],
+            year=row[3],
+            mileage=row[4],
+            available_now=row[5],
+            min_rent_period=row[6],
+            max_rent_period=row[7],
+            daily_rate=row[8],
+        )
+        for row in rows
+    ]
+
+
+def build_slotted_cars(rows):
+    return Car.from_rows(rows, CAR_COLUMNS)
+
+
+def make_rows(count):
+    makes = [("Toyota", "Corolla"), ("Ford", "Focus"), ("BMW", "320i"), ("Kia", "Rio")]
+    rate = Decimal("49.99")
+    return [
+        (car_id, *makes[car_id % len(makes)], 2010 + car_id % 15, car_id * 7 % 200000, car_id % 2, 1, 30, rate)
+        for car_id in range(1, count + 1)
+    ]
+
+
+def measure(build, rows, repeat):
+    """
+    Times build(rows) and measures the memory its objects hold.
+
+    :return: A tuple (objects per second of the best run, bytes per object).
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        objects = build(rows)
+        best = min(best, time.perf_counter() - started)
+        del objects
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = build(rows)
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del objects
+    return len(rows) / best, held / len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark building Car objects from rows.")
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    results = [
+        ("dict-backed, row[0]..row[8]", measure(build_dict_cars, rows, args.repeat)),
+        ("__slots__, Car.from_rows", measure(build_slotted_cars, rows, args.repeat)),
+    ]
+    print(f"{args.rows} rows, best of {args.repeat} runs")
+    for name, (per_second, per_object) in results:
+        print(f"{name:<30} {per_second:>12,.0f} objects/sec {per_object:>8.0f} bytes/object")
+    (before_rate, before_size), (after_rate, after_size) = results[0][1], results[1][1]
+    print(f"Speed-up {after_rate / before_rate:.2f}x, memory per object {after_size / before_size:.0%} of before")
+
+
+if __name__ == "__main__":
+    main()
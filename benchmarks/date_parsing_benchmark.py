@@ -0,0 +1,109 @@
+"""
+Micro-benchmark for date handling in the data models and fee calculation.
+
+Compares parsing every date with datetime.strptime (what Rental, Booking and
+RentalBooking.calculate_rental_fees did before) with the shared data_models.dates layer,
+which memoises date.fromisoformat and keeps day numbers for arithmetic. Rows are
+synthetic rental_management rows whose dates fall within two years, both as
+'YYYY-MM-DD' strings and as date objects (what the MySQL driver returns).
+
+    python benchmarks/date_parsing_benchmark.py --rows 200000 --repeat 5
+
+No database is needed.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta
+from application.rental_booking import RentalBooking
+from data_models.dates import rental_days
+from data_models.rental import Rental
+
+RENTAL_COLUMNS = ("rental_id", "customer_id", "car_id", "start_date", "end_date", "total_amount", "status")
+
+
+class StrptimeRental:
+    """The date handling of Rental before the shared layer: strptime into datetimes on construction."""
+
+    def __init__(self, rental_id, user_id, car_id, start_date, end_date, total_cost, status):
+        self.rental_id = rental_id
+        self.user_id = user_id
+        self.car_id = car_id
+        self.start_date = datetime.strptime(start_date, "%Y-%m-%d")
+        self.end_date = datetime.strptime(end_date, "%Y-%m-%d")
+        self.total_cost = total_cost
+        self.status = status
+
+    def rental_duration(self):
+        return (self.end_date - self.start_date).days + 1
+
+
+def strptime_fees(daily_rate, start_date, end_date):
+    start = datetime.strptime(start_date, "%Y-%m-%d")
+    end = datetime.strptime(end_date, "%Y-%m-%d")
+    return daily_rate * ((end - start).days + 1)
+
+
+def make_rows(count, as_dates, seed=1):
+    rng = random.Random(seed)
+    first = date(2024, 1, 1)
+    rows = []
+    for rental_id in range(1, count + 1):
+        start = first + timedelta(days=rng.randrange(730))
+        end = start + timedelta(days=rng.randint(0, 13))
+        if not as_dates:
+            start, end = start.isoformat(), end.isoformat()
+        rows.append((rental_id, rng.randint(1, 5000), rng.randint(1, 500), start, end, 100, "pending_approval"))
+    return rows
+
+
+def best_rate(function, count, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return count / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark date parsing in model construction and fee calculation.")
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    string_rows = make_rows(args.rows, as_dates=False)
+    date_rows = make_rows(args.rows, as_dates=True)
+    results = [
+        ("Rental rows, strptime", best_rate(
+            lambda: [StrptimeRental(*row).rental_duration() for row in string_rows], args.rows, args.repeat)),
+        ("Rental rows (str), dates layer", best_rate(
+            lambda: [rental.rental_duration() for rental in Rental.from_rows(string_rows, RENTAL_COLUMNS)],
+            args.rows, args.repeat)),
+        ("Rental rows (date), dates layer", best_rate(
+            lambda: [rental.rental_duration() for rental in Rental.from_rows(date_rows, RENTAL_COLUMNS)],
+            args.rows, args.repeat)),
+        ("fees, strptime", best_rate(
+            lambda: [strptime_fees(50, row[3], row[4]) for row in string_rows], args.rows, args.repeat)),
+        ("fees, calculate_rental_fees", best_rate(
+            lambda: [RentalBooking.calculate_rental_fees(50, row[3], row[4]) for row in string_rows],
+            args.rows, args.repeat)),
+        ("day counts, rental_days", best_rate(
+            lambda: [rental_days(row[3], row[4]) for row in string_rows], args.rows, args.repeat)),
+    ]
+    print(f"{args.rows} rows with dates spread over two years, best of {args.repeat} runs")
+    for name, per_second in results:
+        print(f"{name:<34} {per_second:>12,.0f} rows/sec")
+    try:
+        StrptimeRental(*date_rows[0])
+    except TypeError as e:
+        print(f"strptime with the date objects MySQL returns fails: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Micro-benchmark for dynamic pricing quotes.
+
+Compares pricing each rental by evaluating every rule for every day (what a straightforward
+implementation does) with PricingEngine.quote(), which answers from precomputed per-car
+prefix sums in O(1). Rentals are random ranges of 1-30 days within the coming year over a
+fleet of --cars cars, priced with weekend, seasonal and long-rental rules.
+
+    python benchmarks/pricing_benchmark.py --quotes 100000 --cars 500
+
+No database is needed.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+from application.pricing import PricingEngine
+
+SEASONS = ["07-01:08-31:1.3", "12-20:01-05:1.5"]
+
+
+def season_multiplier(day):
+    month_day = day.month * 100 + day.day
+    if 701 <= month_day <= 831:
+        return 1.3
+    if month_day >= 1220 or month_day <= 105:
+        return 1.5
+    return 1.0
+
+
+def per_day_quote(daily_rate, start, end):
+    """Prices a rental one day at a time, applying the same rules as the engine below."""
+    cents = int(daily_rate * 100)
+    total = 0
+    day = start
+    while day <= end:
+        multiplier = season_multiplier(day)
+        if day.weekday() >= 5:
+            multiplier *= 1.2
+        total += round(cents * multiplier)
+        day += timedelta(days=1)
+    if (end - start).days + 1 >= 7:
+        total = int((Decimal(total) * Decimal("0.9")).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+    return Decimal(total).scaleb(-2)
+
+
+def make_quotes(count, cars, seed=1):
+    rng = random.Random(seed)
+    today = date.today()
+    rates = {car_id: Decimal(rng.choice(["29.99", "49.99", "89.00", "150.00"])) for car_id in range(1, cars + 1)}
+    quotes = []
+    for _ in range(count):
+        car_id = rng.randint(1, cars)
+        start = today + timedelta(days=rng.randrange(365))
+        quotes.append((car_id, rates[car_id], start, start + timedelta(days=rng.randint(0, 29))))
+    return quotes
+
+
+def best_rate(function, count, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return count / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dynamic pricing quotes.")
+    parser.add_argument("--quotes", type=int, default=100000)
+    parser.add_argument("--cars", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    quotes = make_quotes(args.quotes, args.cars)
+    engine = PricingEngine.from_config(weekend_multiplier=1.2, seasons=SEASONS, long_rental_days=7,
+                                       long_rental_multiplier=0.9)
+    mismatches = sum(engine.quote(*quote) != per_day_quote(*quote[1:]) for quote in quotes[:1000])
+
+    started = time.perf_counter()
+    engine.invalidate()
+    for car_id, daily_rate, start, end in quotes:
+        engine.quote(car_id, daily_rate, start, start)
+    compile_seconds = time.perf_counter() - started
+
+    results = [
+        ("per-day rule evaluation", best_rate(
+            lambda: [per_day_quote(rate, start, end) for _, rate, start, end in quotes], args.quotes, args.repeat)),
+        ("PricingEngine.quote", best_rate(
+            lambda: [engine.quote(*quote) for quote in quotes], args.quotes, args.repeat)),
+    ]
+    print(f"{args.quotes} quotes over {args.cars} cars, best of {args.repeat} runs")
+    print(f"Compiling {engine.stats()['cars_compiled']} rate tables took {compile_seconds:.2f}s (first quote per car)")
+    for name, per_second in results:
+        print(f"{name:<26} {per_second:>12,.0f} quotes/sec")
+    print(f"Speed-up {results[1][1] / results[0][1]:.2f}x, {mismatches} mismatches in the first 1000 quotes")
+
+
+if __name__ == "__main__":
+    main()
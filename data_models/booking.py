@@ -1,10 +1,22 @@
-from datetime import datetime
+from data_models.dates import to_ordinal, from_ordinal
+from data_models.row_model import RowModel
 
-class Booking:
+class Booking(RowModel):
     """
     Represents a booking in the car rental system.
     """
 
+    # Dates are held as day numbers (see data_models.dates); start_date/end_date convert on access.
+    __slots__ = ("booking_id", "user_id", "car_id", "start_day", "end_day", "rental_fee", "additional_charges",
+                 "total_cost", "status")
+    FIELDS = ("booking_id", "user_id", "car_id", "start_date", "end_date", "rental_fee", "additional_charges",
+              "total_cost", "status")
+    # rental_booking column names
+    COLUMN_ALIASES = {"customer_id": "user_id", "rental_start_date": "start_date", "rental_end_date": "end_date",
+                      "total_rental_price": "total_cost"}
+    # rental_booking has no columns for these
+    OPTIONAL_FIELDS = ("rental_fee", "additional_charges")
+
     def __init__(self, booking_id, user_id, car_id, start_date, end_date, rental_fee, additional_charges, total_cost, status):
         """
         Initializes the Booking object.
@@ -12,8 +24,8 @@ class Booking:
         :param booking_id: The unique identifier for the booking.
         :param user_id: The ID of the user making the booking.
         :param car_id: The ID of the car being booked.
-        :param start_date: The start date of the booking (YYYY-MM-DD).
-        :param end_date: The end date of the booking (YYYY-MM-DD).
+        :param start_date: The start date of the booking (date, datetime or YYYY-MM-DD).
+        :param end_date: The end date of the booking (date, datetime or YYYY-MM-DD).
         :param rental_fee: The base rental fee per day for the car.
         :param additional_charges: Any additional charges (e.g., insurance, late fees).
         :param total_cost: The total cost of the booking.
@@ -22,8 +34,8 @@ class Booking:
         self.booking_id = booking_id
         self.user_id = user_id
         self.car_id = car_id
-        self.start_date = self._parse_date(start_date)
-        self.end_date = self._parse_date(end_date)
+        self.start_day = to_ordinal(start_date)
+        self.end_day = to_ordinal(end_date)
         self.rental_fee = rental_fee
         self.additional_charges = additional_charges
         self.total_cost = total_cost
@@ -37,12 +49,35 @@ class Booking:
         """
         return f"<Booking {self.booking_id}, Status: {self.status}, Total Cost: ${self.total_cost:.2f}>"
 
-    def calculate_total_cost(self):
+    @property
+    def start_date(self):
+        """The start date of the booking (a date)."""
+        return from_ordinal(self.start_day)
+
+    @start_date.setter
+    def start_date(self, value):
+        self.start_day = to_ordinal(value)
+
+    @property
+    def end_date(self):
+        """The end date of the booking (a date)."""
+        return from_ordinal(self.end_day)
+
+    @end_date.setter
+    def end_date(self, value):
+        self.end_day = to_ordinal(value)
+
+    def calculate_total_cost(self, pricing=None):
         """
         Calculates the total cost of the booking based on rental duration, rental fee, and additional charges.
 
+        :param pricing: Optional PricingEngine; when given, the rental fee is priced under its rules.
         :return: The total cost of the booking.
         """
+        if pricing:
+            self.total_cost = pricing.quote(self.car_id, self.rental_fee, self.start_day, self.end_day) \
+                + self.additional_charges
+            return self.total_cost
         duration = self.booking_duration()
         self.total_cost = (self.rental_fee * duration) + self.additional_charges
         return self.total_cost
@@ -53,7 +88,7 @@ class Booking:
 
         :return: The number of days for the booking.
         """
-        return (self.end_date - self.start_date).days + 1
+        return self.end_day - self.start_day + 1
 
     def is_pending(self):
         """
@@ -89,8 +124,8 @@ class Booking:
             "booking_id": self.booking_id,
             "user_id": self.user_id,
             "car_id": self.car_id,
-            "start_date": self.start_date.strftime("%Y-%m-%d"),
-            "end_date": self.end_date.strftime("%Y-%m-%d"),
+            "start_date": self.start_date.isoformat(),
+            "end_date": self.end_date.isoformat(),
             "rental_fee": self.rental_fee,
             "additional_charges": self.additional_charges,
             "total_cost": self.total_cost,
@@ -116,13 +151,3 @@ class Booking:
             total_cost=data.get("total_cost"),
             status=data.get("status")
         )
-
-    @staticmethod
-    def _parse_date(date_str):
-        """
-        Parses a date string into a datetime object.
-
-        :param date_str: The date string in 'YYYY-MM-DD' format.
-        :return: A datetime object.
-        """
-        return datetime.strptime(date_str, "%Y-%m-%d")
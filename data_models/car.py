@@ -1,7 +1,13 @@
 # model/
 #car.py
+from data_models.row_model import RowModel
 
-class Car:
+
+class Car(RowModel):
+
+        __slots__ = ("car_id", "make", "model", "year", "mileage", "available_now", "min_rent_period",
+                     "max_rent_period", "daily_rate")
+        FIELDS = __slots__
 
         def __init__(self, car_id, make, model, year, mileage, available_now, min_rent_period, max_rent_period, daily_rate):
             """
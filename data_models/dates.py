@@ -0,0 +1,78 @@
+from datetime import date, datetime
+from functools import lru_cache
+
+DATE_FORMAT = "%Y-%m-%d"
+
+
+@lru_cache(maxsize=4096)
+def _parse_date(text):
+    """
+    Parses 'YYYY-MM-DD' (optionally followed by a time) into a date.
+
+    Bookings cluster on a few thousand distinct days, so results are memoised and repeated
+    strings cost a dictionary lookup. date.fromisoformat is tried first because it is much
+    faster than strptime; strptime remains the fallback so loosely formatted input that was
+    accepted before (e.g. '2024-1-5') still is.
+    """
+    if len(text) > 10 and text[10] in "T ":
+        text = text[:10]
+    try:
+        return date.fromisoformat(text)
+    except ValueError:
+        return datetime.strptime(text, DATE_FORMAT).date()
+
+
+def to_date(value):
+    """
+    Normalises a date, datetime or ISO 'YYYY-MM-DD' string to a date.
+
+    :param value: The value to convert; None is returned unchanged.
+    :return: A date, or None.
+    :raises ValueError: If a string is not a valid date.
+    """
+    if type(value) is date or value is None:
+        return value
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, (bytes, bytearray)):
+        value = value.decode("ascii")
+    return _parse_date(value)
+
+
+def to_ordinal(value):
+    """
+    Converts a date, datetime or ISO string to a proleptic Gregorian day number.
+
+    Day numbers make date arithmetic plain integer arithmetic: the number of days between
+    two dates is a subtraction.
+
+    :param value: The value to convert; None is returned unchanged.
+    :return: An int, or None.
+    """
+    if type(value) is int or value is None:
+        return value
+    return to_date(value).toordinal()
+
+
+def from_ordinal(day):
+    """Converts a day number back to a date (None stays None)."""
+    return None if day is None else date.fromordinal(day)
+
+
+def rental_days(start, end):
+    """
+    Number of days in the inclusive range [start, end], counting the start day.
+
+    :param start: Start date (date, datetime or ISO string).
+    :param end: End date (date, datetime or ISO string).
+    :return: An int (zero or negative when end is before start).
+    """
+    return to_ordinal(end) - to_ordinal(start) + 1
+
+
+def format_date(value):
+    """Formats a date-like value as 'YYYY-MM-DD' (None stays None)."""
+    value = to_date(value)
+    return None if value is None else value.isoformat()
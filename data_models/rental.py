@@ -1,8 +1,17 @@
-from datetime import datetime
+from data_models.dates import to_ordinal, from_ordinal
+from data_models.row_model import RowModel
 
-class Rental:
+class Rental(RowModel):
     LATE_FEE_RATE = 20  # Late fee per day
 
+    # Dates are held as day numbers (see data_models.dates); start_date/end_date convert on access.
+    __slots__ = ("rental_id", "user_id", "car_id", "start_day", "end_day", "total_cost", "status",
+                 "expected_return_date", "actual_return_date", "base_fee")
+    FIELDS = ("rental_id", "user_id", "car_id", "start_date", "end_date", "total_cost", "status",
+              "expected_return_date", "actual_return_date", "base_fee")
+    # rental_management column names
+    COLUMN_ALIASES = {"customer_id": "user_id", "total_amount": "total_cost"}
+
     def __init__(self, rental_id, user_id, car_id, start_date, end_date, total_cost, status, expected_return_date=None, actual_return_date=None, base_fee=None):
         """
         Initializes the Rental object.
@@ -10,8 +19,8 @@ class Rental:
         :param rental_id: The unique identifier for the rental.
         :param user_id: The ID of the user renting the car.
         :param car_id: The ID of the car being rented.
-        :param start_date: The start date of the rental (YYYY-MM-DD).
-        :param end_date: The end date of the rental (YYYY-MM-DD).
+        :param start_date: The start date of the rental (date, datetime or YYYY-MM-DD).
+        :param end_date: The end date of the rental (date, datetime or YYYY-MM-DD).
         :param total_cost: The total cost of the rental.
         :param status: The status of the rental ('Pending', 'Approved', 'Rejected').
         :param expected_return_date: The expected return date of the car (YYYY-MM-DD).
@@ -21,8 +30,8 @@ class Rental:
         self.rental_id = rental_id
         self.user_id = user_id
         self.car_id = car_id
-        self.start_date = self._parse_date(start_date)
-        self.end_date = self._parse_date(end_date)
+        self.start_day = to_ordinal(start_date)
+        self.end_day = to_ordinal(end_date)
         self.total_cost = total_cost
         self.status = status
         self.expected_return_date = expected_return_date
@@ -32,9 +41,27 @@ class Rental:
     def __repr__(self):
         return f"<Rental {self.rental_id}, Status: {self.status}, Total Cost: ${self.total_cost:.2f}>"
 
+    @property
+    def start_date(self):
+        """The start date of the rental (a date)."""
+        return from_ordinal(self.start_day)
+
+    @start_date.setter
+    def start_date(self, value):
+        self.start_day = to_ordinal(value)
+
+    @property
+    def end_date(self):
+        """The end date of the rental (a date)."""
+        return from_ordinal(self.end_day)
+
+    @end_date.setter
+    def end_date(self, value):
+        self.end_day = to_ordinal(value)
+
     def rental_duration(self):
         """Calculates the rental duration in days."""
-        return (self.end_date - self.start_date).days + 1
+        return self.end_day - self.start_day + 1
 
     def approve(self):
         """Approves the rental request."""
@@ -68,8 +95,8 @@ class Rental:
             "rental_id": self.rental_id,
             "user_id": self.user_id,
             "car_id": self.car_id,
-            "start_date": self.start_date.strftime("%Y-%m-%d"),
-            "end_date": self.end_date.strftime("%Y-%m-%d"),
+            "start_date": self.start_date.isoformat(),
+            "end_date": self.end_date.isoformat(),
             "total_cost": self.total_cost,
             "status": self.status,
             "expected_return_date": self.expected_return_date,
@@ -93,18 +120,11 @@ class Rental:
             base_fee=data.get("base_fee"),
         )
 
-    @staticmethod
-    def _parse_date(date_str):
-        """Parses a date string into a datetime object."""
-        return datetime.strptime(date_str, "%Y-%m-%d")
-
     def calculate_late_fee(self):
         """Calculates the late fee based on actual return date and expected return date."""
         if not self.expected_return_date or not self.actual_return_date:
             return 0  # No late fee if dates are not provided
-        expected_date = datetime.strptime(self.expected_return_date, "%Y-%m-%d")
-        actual_date = datetime.strptime(self.actual_return_date, "%Y-%m-%d")
-        late_days = (actual_date - expected_date).days
+        late_days = to_ordinal(self.actual_return_date) - to_ordinal(self.expected_return_date)
         return max(late_days * self.LATE_FEE_RATE, 0)  # No fee if not late
 
     def calculate_total_fee(self):
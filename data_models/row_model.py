@@ -0,0 +1,107 @@
+import inspect
+from functools import lru_cache
+from operator import itemgetter
+
+
+class RowModel:
+    """
+    Base class for the slotted data models that are built from database rows.
+
+    Subclasses list their constructor arguments in FIELDS (in order) and the same names in
+    __slots__, so instances carry no per-object __dict__. from_row() maps cursor columns to
+    fields by name (with COLUMN_ALIASES for columns named differently from the field, e.g.
+    rental_management.customer_id -> Rental.user_id); the mapping is worked out once per
+    distinct cursor description and cached (for the 256 most recent descriptions), so building
+    each object afterwards is a single itemgetter call plus the constructor.
+    """
+
+    __slots__ = ()
+
+    FIELDS = ()
+    COLUMN_ALIASES = {}
+    # Fields without a constructor default that may still be missing from a row (they are set to None).
+    OPTIONAL_FIELDS = ()
+
+    @classmethod
+    def row_factory(cls, description):
+        """
+        Returns a function building an instance from one row of a cursor with this description.
+
+        Columns that are not fields are ignored. Fields without a column get their constructor
+        default, or None if they are listed in OPTIONAL_FIELDS.
+
+        :param description: cursor.description (a sequence whose items start with the column name),
+                            or a sequence of column names.
+        :return: A callable taking a row tuple and returning an instance.
+        :raises ValueError: If a required field has no column.
+        """
+        columns = tuple(column if isinstance(column, str) else column[0] for column in description)
+        return _row_factory(cls, columns)
+
+    @classmethod
+    def from_row(cls, row, description):
+        """
+        Creates an instance from a database row.
+
+        :param row: A row tuple.
+        :param description: The cursor description (or column names) the row came from.
+        :return: An instance of the model.
+        """
+        return cls.row_factory(description)(row)
+
+    @classmethod
+    def from_rows(cls, rows, description):
+        """
+        Creates instances from many rows of the same cursor.
+
+        :param rows: An iterable of row tuples.
+        :param description: The cursor description (or column names) the rows came from.
+        :return: A list of instances.
+        """
+        return list(map(cls.row_factory(description), rows))
+
+    def copy(self):
+        """Returns a shallow copy of the instance."""
+        return type(self)(*(getattr(self, field) for field in self.FIELDS))
+
+    @classmethod
+    def from_cursor(cls, cursor):
+        """
+        Creates instances from every remaining row of an executed cursor.
+
+        :param cursor: A (non-dictionary) cursor on which a SELECT has been executed.
+        :return: A list of instances.
+        """
+        return cls.from_rows(cursor.fetchall(), cursor.description)
+
+
+@lru_cache(maxsize=256)
+def _row_factory(cls, columns):
+    """Builds (and caches per model and column list) the row factory for RowModel.row_factory."""
+    position = {}
+    for index, column in enumerate(columns):
+        position.setdefault(cls.COLUMN_ALIASES.get(column, column), index)
+    present = [field for field in cls.FIELDS if field in position]
+    missing = [field for field in cls.FIELDS if field not in position]
+    parameters = inspect.signature(cls).parameters
+    unset = [field for field in missing if parameters[field].default is inspect.Parameter.empty]
+    required = [field for field in unset if field not in cls.OPTIONAL_FIELDS]
+    if required:
+        raise ValueError(f"{cls.__name__} cannot be built from rows without column(s) {', '.join(required)}.")
+
+    indexes = [position[field] for field in present]
+    if len(indexes) > 1:
+        getter = itemgetter(*indexes)
+    else:  # itemgetter with one index returns the value itself, not a tuple
+        def getter(row):
+            return tuple(row[index] for index in indexes)
+
+    if not missing:
+        def factory(row):
+            return cls(*getter(row))
+    else:
+        defaults = dict.fromkeys(unset)
+
+        def factory(row):
+            return cls(**dict(zip(present, getter(row))), **defaults)
+    return factory
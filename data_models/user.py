@@ -1,5 +1,11 @@
+from data_models.row_model import RowModel
+
+
+class User(RowModel):
+    __slots__ = ("user_id", "username", "password_hash", "role", "first_name", "last_name", "email", "phone_number",
+                 "address", "license_number", "license_expiry_date", "date_joined")
+    FIELDS = __slots__
 
-class User:
     def __init__(
             self,
             user_id,
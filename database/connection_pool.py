@@ -0,0 +1,244 @@
+import threading
+import time
+from collections import deque
+
+import mysql.connector
+from mysql.connector import Error
+
+
+class PoolTimeoutError(Error):
+    """Raised when no connection could be checked out before the timeout expired."""
+
+
+class PooledConnection:
+    """
+    Thin wrapper around a raw database connection that hands the connection back
+    to its pool instead of closing it.
+
+    Everything except close() and the context manager protocol is delegated to the
+    underlying connection, so existing code such as
+    ``with db_connection.connect() as conn: conn.cursor()`` keeps working unchanged.
+    After close() the wrapper drops its reference, so it can no longer touch a connection that
+    another thread may have checked out.
+    """
+
+    def __init__(self, pool, raw_connection):
+        self._pool = pool
+        self._raw = raw_connection
+        self._released = False
+
+    @property
+    def raw(self):
+        """The underlying driver connection."""
+        return self._raw
+
+    def __getattr__(self, name):
+        if self._raw is None:
+            raise Error(msg="Connection has already been returned to the pool.")
+        return getattr(self._raw, name)
+
+    def prepared_cursor(self, name):
+        """
+        Returns this connection's server-side prepared cursor for a named statement.
+
+        The cursor is created once per pooled connection and reused for every later checkout,
+        so the server parses the statement only once. Do not close the returned cursor.
+        """
+        return self._pool.prepared_cursor(self._raw, name)
+
+    def is_connected(self):
+        """True while the connection is checked out and passes the pool's health check."""
+        return not self._released and self._pool._is_healthy(self._raw)
+
+    def close(self):
+        """Return the connection to the pool (the socket stays open)."""
+        if not self._released:
+            self._released = True
+            raw, self._raw = self._raw, None
+            self._pool.release(raw)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_tb):
+        self.close()
+
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe pool of database connections.
+
+    - keeps at least ``min_size`` connections open and never more than ``max_size``
+    - blocks up to ``checkout_timeout`` seconds when every connection is in use
+    - health-checks a connection before handing it out and replaces dead ones
+    - closes connections that sat idle longer than ``idle_timeout`` (above ``min_size``)
+
+    The lock only guards the bookkeeping: connecting, health checks and closing happen outside
+    it, with a slot reserved in ``_open`` while a new connection is being made, so one slow
+    connect does not stall every other checkout and release.
+    """
+
+    def __init__(self, config, min_size=1, max_size=5, checkout_timeout=10.0, idle_timeout=300.0,
+                 connection_factory=None):
+        """
+        Initializes the pool.
+
+        :param config: Keyword arguments passed to the connection factory.
+        :param min_size: Number of connections kept open at all times.
+        :param max_size: Upper bound on open connections.
+        :param checkout_timeout: Seconds to wait for a free connection before raising PoolTimeoutError.
+        :param idle_timeout: Seconds after which surplus idle connections are closed.
+        :param connection_factory: Callable creating a raw connection (defaults to mysql.connector.connect).
+        """
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Pool sizes must satisfy 0 <= min_size <= max_size and max_size >= 1.")
+        self.config = config
+        self.min_size = min_size
+        self.max_size = max_size
+        self.checkout_timeout = checkout_timeout
+        self.idle_timeout = idle_timeout
+        self._factory = connection_factory or mysql.connector.connect
+        self._idle = deque()  # (raw_connection, last_used) pairs, most recently used on the right
+        self._prepared = {}  # id(raw_connection) -> {statement name: prepared cursor}
+        self._open = 0
+        self._closed = False
+        self._lock = threading.Condition(threading.Lock())
+
+        for _ in range(min_size):
+            self._idle.append((self._factory(**self.config), time.monotonic()))
+            self._open += 1
+
+    @staticmethod
+    def _is_healthy(connection):
+        try:
+            is_connected = getattr(connection, "is_connected", None)
+            return is_connected() if is_connected else True
+        except Exception:
+            return False
+
+    def _forget(self, connection):
+        """Frees a connection's slot; the caller closes it after releasing the lock. Caller holds the lock."""
+        self._open -= 1
+        self._prepared.pop(id(connection), None)
+        self._lock.notify()
+
+    @staticmethod
+    def _close_all(connections):
+        for connection in connections:
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+    def _evict_idle(self):
+        """
+        Takes surplus connections that have been idle too long out of the pool. Caller holds the lock.
+
+        :return: The connections to close once the lock is released.
+        """
+        now = time.monotonic()
+        evicted = []
+        while len(self._idle) > 0 and self._open > self.min_size:
+            connection, last_used = self._idle[0]
+            if now - last_used < self.idle_timeout:
+                break
+            self._idle.popleft()
+            self._forget(connection)
+            evicted.append(connection)
+        return evicted
+
+    def prepared_cursor(self, connection, name):
+        """
+        Returns the prepared cursor for a statement name on a raw connection, creating it on first use.
+
+        Only the thread that has the connection checked out touches its cursors, so no lock is needed.
+
+        :param connection: A raw connection currently checked out of this pool.
+        :param name: The statement name the cursor is dedicated to.
+        """
+        cursors = self._prepared.setdefault(id(connection), {})
+        cursor = cursors.get(name)
+        if cursor is None:
+            cursor = connection.cursor(prepared=True)
+            cursors[name] = cursor
+        return cursor
+
+    def acquire(self, timeout=None):
+        """
+        Checks a connection out of the pool.
+
+        :param timeout: Seconds to wait; defaults to the pool's checkout_timeout.
+        :return: A PooledConnection that returns itself to the pool on close().
+        """
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        while True:
+            connection = None
+            with self._lock:
+                while True:
+                    if self._closed:
+                        raise Error("Connection pool is closed.")
+                    evicted = self._evict_idle()
+                    if self._idle or self._open < self.max_size:
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeoutError(msg=f"No database connection available after {timeout} seconds.")
+                    self._lock.wait(remaining)
+                if self._idle:
+                    connection, _ = self._idle.pop()
+                else:
+                    self._open += 1  # Reserve a free slot; the connection is made outside the lock
+            self._close_all(evicted)
+            if connection is None:
+                try:
+                    return PooledConnection(self, self._factory(**self.config))
+                except Exception:
+                    with self._lock:
+                        self._open -= 1
+                        self._lock.notify()
+                    raise
+            if self._is_healthy(connection):
+                return PooledConnection(self, connection)
+            with self._lock:
+                self._forget(connection)
+            self._close_all([connection])
+
+    def release(self, connection):
+        """
+        Returns a raw connection to the pool, rolling back any open transaction.
+
+        :param connection: The raw connection previously handed out by acquire().
+        """
+        try:
+            if getattr(connection, "in_transaction", False):
+                connection.rollback()
+        except Exception:
+            pass
+        with self._lock:
+            closed = self._closed
+            if closed:
+                self._forget(connection)
+            else:
+                self._idle.append((connection, time.monotonic()))
+                self._lock.notify()
+        if closed:
+            self._close_all([connection])
+
+    def close(self):
+        """Closes every idle connection; connections still checked out are closed on release."""
+        idle = []
+        with self._lock:
+            self._closed = True
+            while self._idle:
+                connection, _ = self._idle.pop()
+                self._forget(connection)
+                idle.append(connection)
+            self._lock.notify_all()
+        self._close_all(idle)
+
+    def stats(self):
+        """Returns a snapshot of the pool's size counters."""
+        with self._lock:
+            return {"open": self._open, "idle": len(self._idle), "in_use": self._open - len(self._idle),
+                    "max_size": self.max_size}
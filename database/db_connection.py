@@ -1,35 +1,171 @@
+import threading
+import weakref
 import mysql.connector
 from mysql.connector import Error
+from contextlib import contextmanager
+from database.connection_pool import ConnectionPool
+
+class _ThreadSession:
+    """One thread's session connection; it goes back to the pool if the thread exits without close()."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        # threading.local drops a thread's values when the thread ends, which runs the finalizer.
+        self.finalizer = weakref.finalize(self, connection.close)
+
 
 class DatabaseConnection:
-    _instance = None
+    """
+    Pooled access to one database.
 
-    def __new__(cls, *args, **kwargs):
-        if cls._instance is None:
-            cls._instance = super(DatabaseConnection, cls).__new__(cls)
-        return cls._instance
+    Instances are cheap handles around a ConnectionPool. Use DatabaseConnection.get() to share
+    one instance per DSN or role (e.g. 'primary', 'replica', 'branch_wellington') across the
+    process; constructing DatabaseConnection directly gives an independent pool.
+    """
 
-    def __init__(self, config):
-        if not hasattr(self, 'initialized'):
-            self.config = config
-            self.connection = None
-            self.initialized = True
+    _registry = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, config, pool_options=None, connection_factory=None):
+        """
+        :param config: Connection keyword arguments (host, user, password, database, port).
+        :param pool_options: Optional ConnectionPool settings (min_size, max_size, checkout_timeout, idle_timeout).
+        :param connection_factory: Optional callable creating raw connections, used instead of mysql.connector.connect.
+        """
+        self.config = config
+        self.pool_options = pool_options or {}
+        self.connection_factory = connection_factory
+        self.pool = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    # -------------------- Registry --------------------
+
+    @staticmethod
+    def dsn(config):
+        """Builds a registry key such as 'mysql://root@localhost:3306/car_rental_system' from a config."""
+        return "mysql://{}@{}:{}/{}".format(
+            config.get('user', ''), config.get('host', ''), config.get('port', ''), config.get('database', '')
+        )
+
+    @classmethod
+    def get(cls, key=None, config=None, pool_options=None, connection_factory=None):
+        """
+        Returns the shared DatabaseConnection registered under a key, creating it on first use.
+
+        :param key: Role name or DSN; defaults to the DSN derived from config.
+        :param config: Connection settings, required the first time a key is used.
+        :param pool_options: Pool settings used when the entry is created.
+        :param connection_factory: Raw connection factory used when the entry is created.
+        :return: The registered DatabaseConnection.
+        """
+        if key is None:
+            if config is None:
+                raise ValueError("Either a key or a config is required.")
+            key = cls.dsn(config)
+        with cls._registry_lock:
+            instance = cls._registry.get(key)
+            if instance is None:
+                if config is None:
+                    raise KeyError(f"No database registered under '{key}'.")
+                instance = cls(config, pool_options=pool_options, connection_factory=connection_factory)
+                cls._registry[key] = instance
+            return instance
+
+    @classmethod
+    def registered(cls):
+        """Returns a copy of the registry as a {key: DatabaseConnection} dictionary."""
+        with cls._registry_lock:
+            return dict(cls._registry)
+
+    @classmethod
+    def unregister(cls, key):
+        """Removes a registry entry and closes its pool."""
+        with cls._registry_lock:
+            instance = cls._registry.pop(key, None)
+        if instance is not None:
+            instance.close_pool()
+
+    @classmethod
+    def close_all(cls):
+        """Closes and forgets every registered connection pool."""
+        with cls._registry_lock:
+            instances = list(cls._registry.values())
+            cls._registry.clear()
+        for instance in instances:
+            instance.close_pool()
+
+    # -------------------- Connections --------------------
+
+    def _get_pool(self):
+        pool = self.pool
+        if pool is None:
+            with self._lock:
+                if self.pool is None:
+                    self.pool = ConnectionPool(self.config, connection_factory=self.connection_factory,
+                                               **self.pool_options)
+                pool = self.pool
+        return pool
+
+    @property
+    def connection(self):
+        """The calling thread's session connection (used by cursor()/commit()), or None."""
+        session = getattr(self._local, 'session', None)
+        return session.connection if session else None
 
-    def connect(self):
-        """Establishes a connection to the database."""
+    @connection.setter
+    def connection(self, value):
+        session = getattr(self._local, 'session', None)
+        if session:
+            session.finalizer.detach()
+        self._local.session = _ThreadSession(value) if value is not None else None
+
+    def connect(self, read_only=False, timeout=None):
+        """
+        Checks a connection out of the pool.
+
+        The returned connection goes back to the pool (instead of being closed) when it is
+        closed or used as a context manager, so ``with db.connect() as conn:`` is cheap.
+
+        :param read_only: Routing hint used by ReplicaRouter; a single database ignores it.
+        :param timeout: Seconds to wait for a free connection (defaults to the pool setting).
+        """
         try:
-            if not self.connection or not self.connection.is_connected():
-                self.connection = mysql.connector.connect(**self.config)
-            return self.connection
+            return self._get_pool().acquire(timeout)
         except Error as e:
             print(f"Error: {e}")
             raise
 
+    @contextmanager
+    def checkout(self, timeout=None, read_only=False):
+        """
+        Context manager yielding a pooled connection and returning it to the pool on exit.
+
+        :param timeout: Seconds to wait for a free connection (defaults to the pool setting).
+        :param read_only: Routing hint used by ReplicaRouter; a single database ignores it.
+        """
+        conn = self._get_pool().acquire(timeout)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _session_connection(self):
+        """
+        Per-thread connection held for the cursor()/commit() style API until close() is called.
+
+        Threads that run many units of work (executor threads) should call close() after each
+        one; a thread that exits without doing so returns the connection through a finalizer.
+        """
+        if not self.connection or not self.connection.is_connected():
+            if self.connection:
+                self.connection.close()
+            self.connection = self.connect()
+        return self.connection
+
     def cursor(self, dictionary=False):
         """Returns a cursor object for executing queries."""
-        if not self.connection or not self.connection.is_connected():
-            self.connect()
-        return self.connection.cursor(dictionary=dictionary)
+        return self._session_connection().cursor(dictionary=dictionary)
 
     def commit(self):
         """Commits any changes to the database."""
@@ -37,15 +173,22 @@ class DatabaseConnection:
             self.connection.commit()
 
     def close(self):
-        """Closes the database connection."""
-        if self.connection and self.connection.is_connected():
+        """Returns the calling thread's session connection to the pool."""
+        if self.connection:
             self.connection.close()
             self.connection = None
 
+    def close_pool(self):
+        """Closes the session connection and every pooled connection."""
+        self.close()
+        with self._lock:
+            pool, self.pool = self.pool, None
+        if pool is not None:
+            pool.close()
+
     def reconnect(self):
         """Re-establish the database connection in case of disconnection."""
-        if not self.connection or not self.connection.is_connected():
-            self.connect()
+        self._session_connection()
 
     def ping(self):
         """Ping the server to check if the connection is alive."""
@@ -59,11 +202,11 @@ class DatabaseConnection:
     # Context Manager Support
     def __enter__(self):
         """Enter the context and return the connection object."""
-        self.connect()  # Ensure the connection is established
+        self._session_connection()  # Ensure the connection is established
         return self
 
     def __exit__(self, exc_type, exc_value, exc_tb):
-        """Exit the context and close the connection."""
+        """Exit the context and hand the connection back to the pool."""
         self.close()
 
     def query(self, sql):
@@ -76,10 +219,10 @@ class DatabaseConnection:
         except mysql.connector.Error as e:
             if e.errno == 2006:  # MySQL server has gone away
                 print("MySQL server has gone away. Reconnecting...")
-                self.connect()  # Reconnect to MySQL
-                cursor = self.connection.cursor()
+                self.close()
+                cursor = self.cursor()
                 cursor.execute(sql)
                 return cursor
             else:
                 print(f"Error executing query: {e}")
-                raise
\ No newline at end of file
+                raise
@@ -0,0 +1,271 @@
+import os
+import sys
+
+if __name__ == "__main__":
+    # Allow "python database/migrations.py" as well as "python -m database.migrations"
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mysql.connector import Error
+
+
+class Index:
+    """
+    A secondary index created by a migration.
+
+    MySQL has no CREATE INDEX IF NOT EXISTS, so the index is only created when
+    information_schema does not already list it; this keeps migrations safe to run against
+    databases that were set up by hand before migrations existed.
+    """
+
+    def __init__(self, table, name, columns, unique=False):
+        self.table = table
+        self.name = name
+        self.columns = columns
+        self.unique = unique
+
+    def apply(self, cursor):
+        cursor.execute(
+            "SELECT 1 FROM information_schema.statistics "
+            "WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s LIMIT 1",
+            (self.table, self.name),
+        )
+        if cursor.fetchone():
+            return
+        kind = "UNIQUE INDEX" if self.unique else "INDEX"
+        cursor.execute(f"CREATE {kind} {self.name} ON {self.table} ({', '.join(self.columns)})")
+
+    def __repr__(self):
+        return f"<Index {self.name} ON {self.table}({', '.join(self.columns)})>"
+
+
+class Migration:
+    """
+    One schema version: an ordered list of SQL statements and/or Index objects.
+    """
+
+    def __init__(self, version, description, steps):
+        self.version = version
+        self.description = description
+        self.steps = steps
+
+    def apply(self, cursor):
+        for step in self.steps:
+            if isinstance(step, Index):
+                step.apply(cursor)
+            else:
+                cursor.execute(step)
+
+    def __repr__(self):
+        return f"<Migration {self.version}: {self.description}>"
+
+
+MIGRATIONS = [
+    Migration(1, "Create base schema", [
+        """
+        CREATE TABLE IF NOT EXISTS user_management (
+            user_id INT AUTO_INCREMENT PRIMARY KEY,
+            username VARCHAR(100) NOT NULL,
+            password_hash VARCHAR(255) NOT NULL,
+            role VARCHAR(20) NOT NULL,
+            first_name VARCHAR(100),
+            last_name VARCHAR(100),
+            email VARCHAR(255) NOT NULL,
+            phone_number VARCHAR(30),
+            address VARCHAR(255),
+            license_number VARCHAR(50),
+            license_expiry_date DATE,
+            date_joined DATETIME,
+            reset_code VARCHAR(16),
+            reset_code_expiry DATETIME
+        ) ENGINE=InnoDB
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS car_management (
+            car_id INT AUTO_INCREMENT PRIMARY KEY,
+            make VARCHAR(100) NOT NULL,
+            model VARCHAR(100) NOT NULL,
+            year INT NOT NULL,
+            mileage INT NOT NULL,
+            available_now TINYINT(1) NOT NULL DEFAULT 1,
+            min_rent_period INT NOT NULL,
+            max_rent_period INT NOT NULL,
+            daily_rate DECIMAL(10, 2) NOT NULL
+        ) ENGINE=InnoDB
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS rental_booking (
+            booking_id INT AUTO_INCREMENT PRIMARY KEY,
+            car_id INT NOT NULL,
+            customer_id INT NOT NULL,
+            rental_start_date DATE NOT NULL,
+            rental_end_date DATE NOT NULL,
+            total_rental_days INT NOT NULL,
+            status VARCHAR(20) NOT NULL DEFAULT 'pending',
+            total_rental_price DECIMAL(10, 2) NOT NULL,
+            payment_status VARCHAR(20) NOT NULL DEFAULT 'unpaid',
+            amount_paid DECIMAL(10, 2) NOT NULL DEFAULT 0
+        ) ENGINE=InnoDB
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS rental_management (
+            rental_id INT AUTO_INCREMENT PRIMARY KEY,
+            customer_id INT,
+            car_id INT,
+            start_date DATE,
+            end_date DATE,
+            total_amount DECIMAL(10, 2),
+            status VARCHAR(20) NOT NULL DEFAULT 'pending_approval',
+            booking_id INT,
+            admin_action VARCHAR(20),
+            return_date DATE,
+            late_returns_fee DECIMAL(10, 2) NOT NULL DEFAULT 0
+        ) ENGINE=InnoDB
+        """,
+    ]),
+    Migration(2, "Add indexes for login, booking, approval and catalogue access paths", [
+        # Login and password reset look users up by exact username or email. Plain indexes: existing
+        # databases were never made to keep these unique, so a UNIQUE index could fail to build.
+        Index("user_management", "idx_user_username", ["username"]),
+        Index("user_management", "idx_user_email", ["email"]),
+        # Rental history and cancellation filter by customer (and booking).
+        Index("rental_booking", "idx_booking_customer", ["customer_id", "booking_id"]),
+        # Deleting a car and date-range availability scan bookings per car.
+        Index("rental_booking", "idx_booking_car_dates", ["car_id", "rental_start_date", "rental_end_date"]),
+        # Admin queues filter rental_management by status; returns look it up by booking.
+        Index("rental_management", "idx_rental_status", ["status", "rental_id"]),
+        Index("rental_management", "idx_rental_booking", ["booking_id"]),
+        # "View Available Cars" and the car search (keyset pagination needs car_id as the last column).
+        Index("car_management", "idx_car_available_rate", ["available_now", "daily_rate", "car_id"]),
+        Index("car_management", "idx_car_make_model", ["make", "model", "car_id"]),
+        Index("car_management", "idx_car_year", ["year", "car_id"]),
+        Index("car_management", "idx_car_mileage", ["mileage", "car_id"]),
+        Index("car_management", "idx_car_daily_rate", ["daily_rate", "car_id"]),
+    ]),
+    Migration(3, "Create user_sessions table for persisted login sessions", [
+        """
+        CREATE TABLE IF NOT EXISTS user_sessions (
+            session_id VARCHAR(64) PRIMARY KEY,
+            user_id INT NOT NULL,
+            username VARCHAR(255) NOT NULL,
+            role VARCHAR(20) NOT NULL,
+            expires_at DATETIME NOT NULL,
+            INDEX idx_session_user (user_id),
+            INDEX idx_session_expiry (expires_at)
+        ) ENGINE=InnoDB
+        """,
+    ]),
+    # Filled by "python application/summaries.py rebuild", then maintained by the services.
+    Migration(4, "Create daily_revenue, car_utilisation and customer_spend summary tables", [
+        """
+        CREATE TABLE IF NOT EXISTS daily_revenue (
+            day DATE PRIMARY KEY,
+            bookings INT NOT NULL DEFAULT 0,
+            rental_days INT NOT NULL DEFAULT 0,
+            booked_revenue DECIMAL(14, 2) NOT NULL DEFAULT 0,
+            paid_revenue DECIMAL(14, 2) NOT NULL DEFAULT 0,
+            late_fees DECIMAL(14, 2) NOT NULL DEFAULT 0
+        ) ENGINE=InnoDB
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS car_utilisation (
+            car_id INT NOT NULL,
+            month DATE NOT NULL,
+            booked_days INT NOT NULL DEFAULT 0,
+            bookings INT NOT NULL DEFAULT 0,
+            PRIMARY KEY (car_id, month),
+            INDEX idx_utilisation_month (month, car_id)
+        ) ENGINE=InnoDB
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS customer_spend (
+            customer_id INT PRIMARY KEY,
+            bookings INT NOT NULL DEFAULT 0,
+            booked_amount DECIMAL(14, 2) NOT NULL DEFAULT 0,
+            paid_amount DECIMAL(14, 2) NOT NULL DEFAULT 0,
+            late_fees DECIMAL(14, 2) NOT NULL DEFAULT 0,
+            INDEX idx_customer_paid (paid_amount)
+        ) ENGINE=InnoDB
+        """,
+    ]),
+]
+
+create_migrations_table = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INT PRIMARY KEY,
+    description VARCHAR(255) NOT NULL,
+    applied_at DATETIME NOT NULL
+) ENGINE=InnoDB
+"""
+
+
+def current_version(db_connection):
+    """
+    Returns the highest applied migration version (0 for an empty database).
+
+    :param db_connection: The database connection object.
+    """
+    with db_connection.connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute(create_migrations_table)
+        cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_migrations")
+        version = cursor.fetchone()[0]
+        cursor.close()
+        return version
+
+
+def migrate(db_connection, target=None):
+    """
+    Applies every pending migration up to target, in version order.
+
+    Each migration is recorded in schema_migrations once it has been applied, so a failed run
+    can be resumed. MySQL commits DDL implicitly, which is why migrations are written to be
+    re-runnable (IF NOT EXISTS / index existence checks).
+
+    :param db_connection: The database connection object.
+    :param target: Highest version to apply; defaults to the latest.
+    :return: A list of the versions applied.
+    """
+    applied = []
+    version = current_version(db_connection)
+    with db_connection.connect() as conn:
+        cursor = conn.cursor()
+        try:
+            for migration in sorted(MIGRATIONS, key=lambda m: m.version):
+                if migration.version <= version or (target is not None and migration.version > target):
+                    continue
+                print(f"Applying migration {migration.version}: {migration.description}")
+                migration.apply(cursor)
+                cursor.execute(
+                    "INSERT INTO schema_migrations (version, description, applied_at) VALUES (%s, %s, NOW())",
+                    (migration.version, migration.description),
+                )
+                conn.commit()
+                applied.append(migration.version)
+        except Error as e:
+            conn.rollback()
+            print(f"Migration failed: {e}")
+            raise
+        finally:
+            cursor.close()
+    return applied
+
+
+if __name__ == "__main__":
+    from application.config import DatabaseConfig
+    from database.db_connection import DatabaseConnection
+    from database.query_plan_check import check_query_plans
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "migrate"
+    db = DatabaseConnection.get('primary', DatabaseConfig)
+    if command == "migrate":
+        print(f"Applied migrations: {migrate(db) or 'none (already up to date)'}")
+    elif command == "status":
+        print(f"Schema version {current_version(db)} of {max(m.version for m in MIGRATIONS)}")
+    elif command == "check-plans":
+        problems = check_query_plans(db)
+        for name, detail in problems:
+            print(f"PLAN CHECK FAILED: {name}: {detail}")
+        sys.exit(1 if problems else 0)
+    else:
+        print("Usage: python -m database.migrations [migrate|status|check-plans]")
+        sys.exit(2)
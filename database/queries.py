@@ -20,7 +20,28 @@ INSERT INTO user_management (
 
 get_user_by_username = "SELECT user_id, password_hash, role FROM user_management  WHERE username = %s"
 update_user_password = "UPDATE user_management  SET password_hash = %s WHERE user_id = %s"
+rehash_user_password = "UPDATE user_management SET password_hash = %s WHERE user_id = %s AND password_hash = %s"
 select_user_by_email = "SELECT user_id, first_name FROM user_management  WHERE email = %s"
+select_user_exists = "SELECT user_id FROM user_management WHERE email = %s"
+set_user_reset_code = "UPDATE user_management SET reset_code = %s, reset_code_expiry = %s WHERE email = %s"
+count_users = "SELECT COUNT(*) FROM user_management"
+select_user_identities = "SELECT user_id, username, email FROM user_management WHERE user_id > %s ORDER BY user_id"
+# The plain equality lets MySQL use the username/email indexes; BINARY keeps the match case-sensitive.
+login_user_lookup = """
+SELECT user_id, password_hash, role FROM user_management
+WHERE (username = %s AND BINARY username = %s) OR (email = %s AND BINARY email = %s)
+"""
+
+# Session Queries (application/session_manager.py)
+insert_session = """
+INSERT INTO user_sessions (session_id, user_id, username, role, expires_at)
+VALUES (%s, %s, %s, %s, %s)
+"""
+select_session = "SELECT user_id, username, role, expires_at FROM user_sessions WHERE session_id = %s"
+delete_session = "DELETE FROM user_sessions WHERE session_id = %s"
+# Extends a live session; no row is changed once it has been revoked (deleted) or has expired.
+touch_session = "UPDATE user_sessions SET expires_at = %s WHERE session_id = %s AND expires_at > %s"
+delete_expired_sessions = "DELETE FROM user_sessions WHERE expires_at <= %s"
 
 # Car Management Queries
 add_car = """
@@ -29,10 +50,50 @@ VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
 """
 select_available_cars = "SELECT * FROM car_management WHERE available_now = 1"
 select_car_by_id = "SELECT * FROM car_management WHERE car_id = %s"
+count_cars = "SELECT COUNT(*) FROM car_management"
+select_cars_page = "SELECT * FROM car_management WHERE car_id > %s ORDER BY car_id LIMIT %s"
 update_car = "UPDATE car_management SET make=%s, model=%s, year=%s, mileage=%s, available_now=%s, min_rent_period=%s, max_rent_period=%s WHERE car_id=%s"
 delete_car = "DELETE FROM car_management WHERE car_id=%s"
+delete_car_bookings = "DELETE FROM rental_booking WHERE car_id = %s"
+
+# Car Search: the columns each sort orders by before car_id, matching a migration 2 index
+# ((make, model, car_id), (year, car_id), ...) so every page is an index range scan.
+car_search_sort_keys = {
+    "car_id": (),
+    "make": ("make", "model"),
+    "year": ("year",),
+    "mileage": ("mileage",),
+    "daily_rate": ("daily_rate",),
+}
+car_search_sort_columns = tuple(car_search_sort_keys)
 
 #Rental Booking Queries
+create_booking = """
+INSERT INTO rental_booking (car_id, customer_id, rental_start_date, rental_end_date, total_rental_days, status, total_rental_price)
+VALUES (%s, %s, %s, %s, %s, 'pending', %s)
+"""
+select_car_daily_rate = "SELECT daily_rate FROM car_management WHERE car_id = %s"
+# Booking and approval transactions: the car row lock serialises every booking/approval of one car.
+lock_car_for_booking = "SELECT car_id FROM car_management WHERE car_id = %s FOR UPDATE"
+select_booking_car = "SELECT car_id FROM rental_booking WHERE booking_id = %s"
+select_rental_history = "SELECT * FROM rental_booking WHERE customer_id = %s"
+cancel_customer_booking = "DELETE FROM rental_booking WHERE customer_id = %s AND booking_id = %s"
+lock_booking_for_approval = "SELECT status, rental_start_date, rental_end_date FROM rental_booking WHERE booking_id = %s FOR UPDATE"
+# Inclusive date ranges [start, end] overlap when each starts on or before the other ends.
+select_booking_conflict = """
+SELECT booking_id FROM rental_booking
+WHERE car_id = %s AND status <> 'cancelled' AND rental_start_date <= %s AND rental_end_date >= %s
+LIMIT 1 FOR UPDATE
+"""
+select_car_bookings = """
+SELECT booking_id, rental_start_date, rental_end_date FROM rental_booking
+WHERE car_id = %s AND status <> 'cancelled'
+"""
+select_approval_conflict = """
+SELECT booking_id FROM rental_booking
+WHERE car_id = %s AND booking_id <> %s AND status = 'confirmed' AND rental_start_date <= %s AND rental_end_date >= %s
+LIMIT 1 FOR UPDATE
+"""
 create_rental = "INSERT INTO rentals (user_id, car_id, start_date, end_date, total_cost, status) VALUES (%s, %s, %s, %s, %s, 'Pending')"
 select_rentals_by_user = "SELECT * FROM rentals WHERE user_id=%s"
 select_rental_by_status = "SELECT * FROM Rentals WHERE status = %s"
@@ -45,4 +106,135 @@ update_rental_status = "UPDATE Rentals SET status = %s WHERE id = %s"
 get_pending_rentals = "SELECT * FROM rental_management WHERE status = 'pending_approval'"
 approve_rental = "UPDATE rental_management SET admin_action = 'approved', status = 'active' WHERE rental_id = %s"
 reject_rental = "UPDATE rental_management SET admin_action = 'rejected', status = 'cancelled' WHERE rental_id = %s"
-update_rental_cost = "UPDATE rental_management SET total_amount = %s WHERE rental_id = %s"
\ No newline at end of file
+update_rental_cost = "UPDATE rental_management SET total_amount = %s WHERE rental_id = %s"
+record_rental_return = "UPDATE rental_management SET return_date = %s, late_returns_fee = %s, status = 'returned' WHERE booking_id = %s"
+record_return_payment = "UPDATE rental_booking SET payment_status = 'paid', amount_paid = total_rental_price + %s WHERE booking_id = %s"
+
+# Bulk review (RentalManagement.approve_rentals/reject_rentals). {ids} is replaced with one %s per
+# ID of a batch and {filters} with "AND column = %s" conditions.
+find_bookings_for_review = "SELECT booking_id FROM rental_booking WHERE status = %s{filters} ORDER BY booking_id"
+select_booking_cars_in = "SELECT booking_id, car_id FROM rental_booking WHERE booking_id IN ({ids})"
+lock_cars_in = "SELECT car_id FROM car_management WHERE car_id IN ({ids}) ORDER BY car_id FOR UPDATE"
+lock_bookings_for_approval_in = """
+SELECT booking_id, car_id, status, rental_start_date, rental_end_date FROM rental_booking
+WHERE booking_id IN ({ids}) FOR UPDATE
+"""
+lock_confirmed_bookings_of_cars_in = """
+SELECT booking_id, car_id, rental_start_date, rental_end_date FROM rental_booking
+WHERE car_id IN ({ids}) AND status = 'confirmed' FOR UPDATE
+"""
+lock_booking_states_in = """
+SELECT booking_id, car_id, customer_id, rental_start_date, rental_end_date, total_rental_days, status,
+       total_rental_price, amount_paid
+FROM rental_booking WHERE booking_id IN ({ids}) FOR UPDATE
+"""
+confirm_bookings_in = "UPDATE rental_booking SET status = 'confirmed' WHERE booking_id IN ({ids})"
+cancel_bookings_in = "UPDATE rental_booking SET status = 'cancelled' WHERE booking_id IN ({ids})"
+mark_cars_rented_in = "UPDATE car_management SET available_now = 0 WHERE car_id IN ({ids})"
+
+# Report Queries (aggregated by the server; the first parameter of the period reports is a DATE_FORMAT pattern)
+report_revenue_by_period = """
+SELECT DATE_FORMAT(rental_start_date, %s) AS period, COUNT(*) AS bookings, SUM(total_rental_days) AS rental_days,
+       SUM(total_rental_price) AS booked_revenue, SUM(amount_paid) AS paid_revenue
+FROM rental_booking
+WHERE status <> 'cancelled' AND rental_start_date BETWEEN %s AND %s
+GROUP BY period
+ORDER BY period
+"""
+report_revenue_by_car = """
+SELECT b.car_id, c.make, c.model, COUNT(*) AS bookings, SUM(b.total_rental_days) AS rental_days,
+       SUM(b.total_rental_price) AS booked_revenue, SUM(b.amount_paid) AS paid_revenue
+FROM rental_booking b
+JOIN car_management c ON c.car_id = b.car_id
+WHERE b.status <> 'cancelled' AND b.rental_start_date BETWEEN %s AND %s
+GROUP BY b.car_id, c.make, c.model
+ORDER BY booked_revenue DESC
+"""
+report_revenue_by_customer = """
+SELECT b.customer_id, u.username, COUNT(*) AS bookings, SUM(b.total_rental_days) AS rental_days,
+       SUM(b.total_rental_price) AS booked_revenue, SUM(b.amount_paid) AS paid_revenue
+FROM rental_booking b
+JOIN user_management u ON u.user_id = b.customer_id
+WHERE b.status <> 'cancelled' AND b.rental_start_date BETWEEN %s AND %s
+GROUP BY b.customer_id, u.username
+ORDER BY booked_revenue DESC
+"""
+# Days each car is booked within [start, end]; bookings are clipped to the window.
+report_car_utilisation = """
+SELECT c.car_id, c.make, c.model,
+       COALESCE(SUM(DATEDIFF(LEAST(b.rental_end_date, %s), GREATEST(b.rental_start_date, %s)) + 1), 0) AS booked_days
+FROM car_management c
+LEFT JOIN rental_booking b ON b.car_id = c.car_id AND b.status <> 'cancelled'
+    AND b.rental_start_date <= %s AND b.rental_end_date >= %s
+GROUP BY c.car_id, c.make, c.model
+ORDER BY c.car_id
+"""
+report_late_returns = """
+SELECT DATE_FORMAT(return_date, %s) AS period, COUNT(*) AS returns, SUM(late_returns_fee > 0) AS late_returns,
+       SUM(late_returns_fee) AS late_fees
+FROM rental_management
+WHERE status = 'returned' AND return_date BETWEEN %s AND %s
+GROUP BY period
+ORDER BY period
+"""
+# Raw table export; {table} is one of reports.EXPORT_TABLES.
+export_table = "SELECT * FROM {table}"
+
+# Summary tables (application/summaries.py); the upserts add deltas to the stored totals.
+select_booking_state = """
+SELECT booking_id, car_id, customer_id, rental_start_date, rental_end_date, total_rental_days, status,
+       total_rental_price, amount_paid
+FROM rental_booking WHERE booking_id = %s FOR UPDATE
+"""
+select_return_state = "SELECT return_date, late_returns_fee, status FROM rental_management WHERE booking_id = %s FOR UPDATE"
+upsert_daily_revenue = """
+INSERT INTO daily_revenue (day, bookings, rental_days, booked_revenue, paid_revenue, late_fees)
+VALUES (%s, %s, %s, %s, %s, %s)
+ON DUPLICATE KEY UPDATE bookings = bookings + VALUES(bookings), rental_days = rental_days + VALUES(rental_days),
+    booked_revenue = booked_revenue + VALUES(booked_revenue), paid_revenue = paid_revenue + VALUES(paid_revenue),
+    late_fees = late_fees + VALUES(late_fees)
+"""
+upsert_car_utilisation = """
+INSERT INTO car_utilisation (car_id, month, booked_days, bookings)
+VALUES (%s, %s, %s, %s)
+ON DUPLICATE KEY UPDATE booked_days = booked_days + VALUES(booked_days), bookings = bookings + VALUES(bookings)
+"""
+upsert_customer_spend = """
+INSERT INTO customer_spend (customer_id, bookings, booked_amount, paid_amount, late_fees)
+VALUES (%s, %s, %s, %s, %s)
+ON DUPLICATE KEY UPDATE bookings = bookings + VALUES(bookings), booked_amount = booked_amount + VALUES(booked_amount),
+    paid_amount = paid_amount + VALUES(paid_amount), late_fees = late_fees + VALUES(late_fees)
+"""
+# Shared locks keep bookings and returns from changing until a rebuild has replaced the tables.
+summary_rebuild_bookings = """
+SELECT booking_id, car_id, customer_id, rental_start_date, rental_end_date, total_rental_days, status,
+       total_rental_price, amount_paid
+FROM rental_booking LOCK IN SHARE MODE
+"""
+summary_rebuild_late_fees = """
+SELECT b.customer_id, m.return_date, m.late_returns_fee
+FROM rental_management m
+JOIN rental_booking b ON b.booking_id = m.booking_id
+WHERE m.status = 'returned' AND m.late_returns_fee > 0
+LOCK IN SHARE MODE
+"""
+# {table} is one of the three summary tables.
+summary_clear_table = "DELETE FROM {table}"
+summary_daily_revenue = "SELECT * FROM daily_revenue WHERE day BETWEEN %s AND %s ORDER BY day"
+summary_revenue_by_period = """
+SELECT DATE_FORMAT(day, %s) AS period, SUM(bookings) AS bookings, SUM(rental_days) AS rental_days,
+       SUM(booked_revenue) AS booked_revenue, SUM(paid_revenue) AS paid_revenue, SUM(late_fees) AS late_fees
+FROM daily_revenue
+WHERE day BETWEEN %s AND %s
+GROUP BY period
+ORDER BY period
+"""
+summary_car_utilisation = """
+SELECT u.car_id, c.make, c.model, SUM(u.booked_days) AS booked_days, SUM(u.bookings) AS bookings
+FROM car_utilisation u
+JOIN car_management c ON c.car_id = u.car_id
+WHERE u.month BETWEEN %s AND %s
+GROUP BY u.car_id, c.make, c.model
+ORDER BY u.car_id
+"""
+summary_customer_spend = "SELECT * FROM customer_spend ORDER BY paid_amount DESC LIMIT %s"
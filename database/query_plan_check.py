@@ -0,0 +1,109 @@
+from database.statements import statements
+
+# Plan steps estimated to read at most this many rows are not reported: on tables this small
+# MySQL prefers a full scan even when a usable index exists.
+SMALL_TABLE_ROWS = 100
+
+SAMPLE_DATE = "2024-01-01"
+
+# Sample parameters for statements whose placeholders are not compared with integer columns.
+# The values only need the right types; EXPLAIN does not run the statement. Every other
+# statement is explained with 1 for each placeholder.
+SAMPLE_PARAMETERS = {
+    "login_user_lookup": ("user", "user", "user@example.com", "user@example.com"),
+    "get_user_by_username": ("user",),
+    "select_user_by_email": ("user@example.com",),
+    "select_user_exists": ("user@example.com",),
+    "find_bookings_for_review": ("pending",),
+    "select_session": ("session",),
+    "delete_session": ("session",),
+    "touch_session": (SAMPLE_DATE, "session", SAMPLE_DATE),
+    "delete_expired_sessions": (SAMPLE_DATE,),
+    "set_user_reset_code": ("code", SAMPLE_DATE, "user@example.com"),
+    "select_booking_conflict": (1, SAMPLE_DATE, SAMPLE_DATE),
+    "select_approval_conflict": (1, 1, SAMPLE_DATE, SAMPLE_DATE),
+    "record_rental_return": (SAMPLE_DATE, 0, 1),
+    "report_revenue_by_period": ("%Y-%m", SAMPLE_DATE, SAMPLE_DATE),
+    "report_revenue_by_car": (SAMPLE_DATE, SAMPLE_DATE),
+    "report_revenue_by_customer": (SAMPLE_DATE, SAMPLE_DATE),
+    "report_car_utilisation": (SAMPLE_DATE, SAMPLE_DATE, SAMPLE_DATE, SAMPLE_DATE),
+    "report_late_returns": ("%Y-%m", SAMPLE_DATE, SAMPLE_DATE),
+    "summary_daily_revenue": (SAMPLE_DATE, SAMPLE_DATE),
+    "summary_revenue_by_period": ("%Y-%m", SAMPLE_DATE, SAMPLE_DATE),
+    "summary_car_utilisation": (SAMPLE_DATE, SAMPLE_DATE),
+}
+
+# Values for the {name} fields of bulk statements: a one-item IN list and no optional filters.
+SAMPLE_FIELDS = {"ids": "%s", "filters": ""}
+
+# Statements that read whole tables by design, or that cannot be explained against this schema.
+NOT_CHECKED = {
+    "summary_rebuild_bookings": "the off-peak rebuild reads every booking",
+    "summary_rebuild_late_fees": "the off-peak rebuild reads every return",
+    "report_revenue_by_period": "ad-hoc report over rental_booking; served from daily_revenue when summary tables are on",
+    "report_revenue_by_car": "ad-hoc report over rental_booking; served from car_utilisation when summary tables are on",
+    "report_revenue_by_customer": "ad-hoc report over rental_booking; served from customer_spend when summary tables are on",
+    "report_car_utilisation": "lists every car",
+    "export_table": "exports a whole table",
+    "summary_clear_table": "the off-peak rebuild empties each summary table",
+    "create_rental": "legacy statement for the rentals table, which the schema does not define",
+    "select_rentals_by_user": "legacy statement for the rentals table, which the schema does not define",
+    "select_rental_by_status": "legacy statement for the rentals table, which the schema does not define",
+    "select_rental_by_id": "legacy statement for the rentals table, which the schema does not define",
+    "update_rental_status": "legacy statement for the rentals table, which the schema does not define",
+}
+
+
+def explain(db_connection, sql, params=()):
+    """
+    Runs EXPLAIN for a statement.
+
+    :param db_connection: The database connection object.
+    :param sql: The statement to explain.
+    :param params: Sample parameters for its placeholders.
+    :return: A list of plan rows as dictionaries.
+    """
+    with db_connection.connect() as conn:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("EXPLAIN " + sql.strip(), params)
+        plan = cursor.fetchall()
+        cursor.close()
+        return plan
+
+
+def sample_parameters(name, sql):
+    """Returns the sample parameters used to explain a registered statement."""
+    return SAMPLE_PARAMETERS.get(name, (1,) * sql.count("%s"))
+
+
+def check_query_plans(db_connection, names=None, small_table_rows=SMALL_TABLE_ROWS):
+    """
+    Explains registered statements and reports those that would scan a whole table.
+
+    Every plan step with access type ALL is reported, whether or not the optimizer found a
+    candidate index, unless MySQL estimates it reads no more than small_table_rows rows. Bulk
+    statements are explained with the {name} fields in SAMPLE_FIELDS filled in.
+    INSERT statements are skipped because they read no rows, and so are the statements in
+    NOT_CHECKED.
+
+    :param db_connection: The database connection object.
+    :param names: Optional list of statement names; defaults to every statement in the registry.
+    :param small_table_rows: Largest row estimate at which a full scan is not reported.
+    :return: A list of (statement name, description) tuples, empty when every plan uses an index.
+    """
+    problems = []
+    for name in names or statements.names():
+        sql = statements.sql(name)
+        if name in NOT_CHECKED or sql.lstrip().upper().startswith(("INSERT", "REPLACE")):
+            continue
+        if "{" in sql:
+            sql = sql.format(**SAMPLE_FIELDS)
+        try:
+            plan = explain(db_connection, sql, sample_parameters(name, sql))
+        except Exception as e:
+            problems.append((name, f"could not be explained: {e}"))
+            continue
+        for step in plan:
+            if step.get("type") == "ALL" and (step.get("rows") or 0) > small_table_rows:
+                problems.append((name, f"table {step.get('table')} scanned ({step.get('rows')} rows estimated)"))
+    return problems
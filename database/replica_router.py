@@ -0,0 +1,189 @@
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from mysql.connector import Error
+
+READ_ONLY_KEYWORDS = ("SELECT", "SHOW", "DESCRIBE", "DESC", "EXPLAIN")
+LOCKING_CLAUSES = ("FOR UPDATE", "LOCK IN SHARE MODE", "FOR SHARE")
+# Returned by a lag probe for a server that has no replication configured at all.
+NOT_REPLICATING = "not replicating"
+
+
+class ReplicaRouter:
+    """
+    Routes read-only work to a set of read replicas and everything else to the primary.
+
+    The router exposes the same methods the services use on DatabaseConnection
+    (connect, checkout, cursor, commit, ping, close, query), so it can be passed to
+    CarManagement, RentalBooking, RentalManagement and Payment unchanged. Callers opt
+    into a replica with ``connect(read_only=True)``; a replica is only used when its
+    replication lag is within ``max_replication_lag`` seconds, otherwise the primary
+    serves the read. Reads that must see the caller's own writes (e.g. a customer's
+    booking history) should not ask for a replica.
+
+    Each replica's lag is probed by one thread at a time; while a probe is running, other
+    threads use the last measurement.
+    """
+
+    def __init__(self, primary, replicas=(), max_replication_lag=5.0, lag_check_interval=5.0, lag_probe=None,
+                 use_standalone=False):
+        """
+        :param primary: DatabaseConnection for the writable primary.
+        :param replicas: DatabaseConnection objects for the read replicas.
+        :param max_replication_lag: Largest acceptable replica lag in seconds.
+        :param lag_check_interval: Seconds a measured lag is trusted before it is probed again.
+        :param lag_probe: Optional callable(connection) -> lag in seconds, None when replication is
+                          stopped, or NOT_REPLICATING for a server that is not a replica.
+        :param use_standalone: Use "replicas" that are not replicating at all as if they had no lag,
+                               e.g. a second local server when testing.
+        """
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.max_replication_lag = max_replication_lag
+        self.lag_check_interval = lag_check_interval
+        self.lag_probe = lag_probe or self.probe_replication_lag
+        self.use_standalone = use_standalone
+        self._lag = {}  # replica index -> (lag_seconds or None, measured_at)
+        self._probing = [threading.Lock() for _ in self.replicas]
+        self._lock = threading.Lock()
+        self._round_robin = itertools.cycle(range(len(self.replicas))) if self.replicas else None
+
+    @staticmethod
+    def is_read_only(sql):
+        """
+        Checks whether a statement can safely run on a replica.
+
+        :param sql: The SQL statement.
+        :return: True for plain SELECT/SHOW/DESCRIBE/EXPLAIN statements without locking clauses.
+        """
+        statement = sql.lstrip().upper()
+        if not statement.startswith(READ_ONLY_KEYWORDS):
+            return False
+        return not any(clause in statement for clause in LOCKING_CLAUSES)
+
+    @staticmethod
+    def probe_replication_lag(conn):
+        """
+        Reads the replica's lag from SHOW REPLICA STATUS (falling back to SHOW SLAVE STATUS).
+
+        :param conn: A connection to the replica.
+        :return: Lag in seconds, None when replication is stopped, or NOT_REPLICATING when the
+                 server reports no replication status.
+        """
+        cursor = conn.cursor(dictionary=True)
+        try:
+            try:
+                cursor.execute("SHOW REPLICA STATUS")
+            except Error:
+                cursor.execute("SHOW SLAVE STATUS")
+            status = cursor.fetchone()
+            if not status:
+                return NOT_REPLICATING
+            lag = status.get('Seconds_Behind_Source', status.get('Seconds_Behind_Master'))
+            return None if lag is None else float(lag)
+        finally:
+            cursor.close()
+
+    def _replica_lag(self, index):
+        """
+        Returns the replica's lag, probing it when the cached value is stale.
+
+        Only one thread probes a replica at a time; the others get the previous measurement
+        (None, i.e. unusable, before the first probe has finished).
+        """
+        now = time.monotonic()
+        with self._lock:
+            cached = self._lag.get(index)
+        if cached and now - cached[1] < self.lag_check_interval:
+            return cached[0]
+        if not self._probing[index].acquire(blocking=False):
+            return cached[0] if cached else None
+        try:
+            try:
+                with self.replicas[index].checkout() as conn:
+                    lag = self.lag_probe(conn)
+            except Exception as e:
+                print(f"Replica {index} unavailable: {e}")
+                lag = None
+            if lag is NOT_REPLICATING:
+                lag = 0.0 if self.use_standalone else None
+            with self._lock:
+                self._lag[index] = (lag, time.monotonic())
+            return lag
+        finally:
+            self._probing[index].release()
+
+    def _pick_replica(self):
+        """Returns a replica within the lag tolerance, or None when every replica is behind or down."""
+        for _ in range(len(self.replicas)):
+            with self._lock:
+                index = next(self._round_robin)
+            lag = self._replica_lag(index)
+            if lag is not None and lag <= self.max_replication_lag:
+                return self.replicas[index]
+        return None
+
+    def route(self, read_only=False):
+        """
+        Chooses the DatabaseConnection that should serve a request.
+
+        :param read_only: True when the work only reads.
+        :return: A replica for reads when one is healthy, otherwise the primary.
+        """
+        if read_only and self.replicas:
+            replica = self._pick_replica()
+            if replica is not None:
+                return replica
+        return self.primary
+
+    def connect(self, read_only=False, timeout=None):
+        """
+        Checks a pooled connection out of the primary or, for reads, a replica.
+
+        :param read_only: True to allow the connection to come from a replica.
+        :param timeout: Seconds to wait for a free connection (defaults to the pool setting).
+        """
+        target = self.route(read_only)
+        if target is self.primary:
+            return self.primary.connect(timeout=timeout)
+        try:
+            return target.connect(timeout=timeout)
+        except Error as e:
+            print(f"Replica connection failed, falling back to primary: {e}")
+            return self.primary.connect(timeout=timeout)
+
+    @contextmanager
+    def checkout(self, timeout=None, read_only=False):
+        """Context manager version of connect() that returns the connection to its pool on exit."""
+        conn = self.connect(read_only=read_only, timeout=timeout)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def query(self, sql):
+        """Executes a statement, sending read-only statements to a replica."""
+        if self.is_read_only(sql):
+            return self.route(read_only=True).query(sql)
+        return self.primary.query(sql)
+
+    # The session-style API always targets the primary so it is safe for writes.
+
+    def cursor(self, dictionary=False):
+        """Returns a cursor on the primary's session connection."""
+        return self.primary.cursor(dictionary=dictionary)
+
+    def commit(self):
+        """Commits the primary's session connection."""
+        self.primary.commit()
+
+    def ping(self):
+        """Pings the primary's session connection."""
+        self.primary.ping()
+
+    def close(self):
+        """Returns the calling thread's session connections to their pools."""
+        self.primary.close()
+        for replica in self.replicas:
+            replica.close()
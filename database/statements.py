@@ -0,0 +1,80 @@
+import database.queries as queries
+
+SQL_VERBS = ("SELECT", "INSERT", "UPDATE", "DELETE", "REPLACE")
+
+
+class StatementRegistry:
+    """
+    Named catalogue of the SQL statements the services run.
+
+    Statements are executed by name through server-side prepared cursors that are created
+    once per pooled connection, so hot statements (login, booking) are parsed by MySQL only
+    once per connection instead of on every call. Having every statement in one place also
+    makes them easy to audit.
+    """
+
+    def __init__(self):
+        self._statements = {}
+
+    @classmethod
+    def from_module(cls, module):
+        """
+        Builds a registry from every SQL string constant defined in a module.
+
+        :param module: A module such as database.queries.
+        :return: A StatementRegistry.
+        """
+        registry = cls()
+        for name, value in vars(module).items():
+            if name.startswith("_") or not isinstance(value, str):
+                continue
+            if value.lstrip().upper().startswith(SQL_VERBS):
+                registry.register(name, value)
+        return registry
+
+    def register(self, name, sql):
+        """
+        Adds a named statement.
+
+        :param name: Unique statement name.
+        :param sql: The SQL text with %s placeholders. Bulk statements also contain {name} fields
+                    (such as {ids} for an IN list) that the caller fills in with str.format().
+        """
+        if name in self._statements and self._statements[name] != sql:
+            raise ValueError(f"Statement '{name}' is already registered with different SQL.")
+        self._statements[name] = sql
+
+    def sql(self, name):
+        """Returns the SQL text registered under a name."""
+        try:
+            return self._statements[name]
+        except KeyError:
+            raise KeyError(f"Unknown statement '{name}'.")
+
+    def names(self):
+        """Returns the registered statement names, sorted."""
+        return sorted(self._statements)
+
+    def execute(self, conn, name, params=()):
+        """
+        Executes a named statement on a connection.
+
+        Pooled connections reuse their prepared cursor for the statement; other connections get a
+        new prepared cursor. Callers must fetch every row before running another statement on the
+        same connection and must not close the returned cursor.
+
+        :param conn: A connection from DatabaseConnection.connect().
+        :param name: The statement name.
+        :param params: Parameters for the placeholders.
+        :return: The cursor the statement ran on.
+        """
+        sql = self.sql(name)
+        if hasattr(conn, "prepared_cursor"):
+            cursor = conn.prepared_cursor(name)
+        else:
+            cursor = conn.cursor(prepared=True)
+        cursor.execute(sql, params)
+        return cursor
+
+
+statements = StatementRegistry.from_module(queries)
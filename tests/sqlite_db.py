@@ -0,0 +1,175 @@
+"""
+SQLite stand-in for MySQL, plugged into DatabaseConnection through its connection_factory.
+
+Only the MySQL dialect the services use is translated: %s placeholders, BINARY comparisons,
+ON DUPLICATE KEY UPDATE and a few date functions. SELECT ... FOR UPDATE / LOCK IN SHARE MODE
+start an immediate transaction, which locks the whole database file, so locking statements
+are serialised more strictly than by InnoDB's row locks, never less.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import re
+import sqlite3
+from datetime import date, datetime
+from decimal import Decimal
+from database.db_connection import DatabaseConnection
+
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+
+LOCKING_CLAUSES = ("FOR UPDATE", "LOCK IN SHARE MODE")
+
+# The tables of migration 1 in SQLite syntax.
+RENTAL_SCHEMA = [
+    """
+    CREATE TABLE user_management (
+        user_id INTEGER PRIMARY KEY, username TEXT NOT NULL, password_hash TEXT NOT NULL, role TEXT NOT NULL,
+        first_name TEXT, last_name TEXT, email TEXT NOT NULL, phone_number TEXT, address TEXT,
+        license_number TEXT, license_expiry_date DATE, date_joined TIMESTAMP, reset_code TEXT,
+        reset_code_expiry TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE car_management (
+        car_id INTEGER PRIMARY KEY, make TEXT NOT NULL, model TEXT NOT NULL, year INTEGER NOT NULL,
+        mileage INTEGER NOT NULL, available_now INTEGER NOT NULL DEFAULT 1, min_rent_period INTEGER NOT NULL,
+        max_rent_period INTEGER NOT NULL, daily_rate DECIMAL(10, 2) NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE rental_booking (
+        booking_id INTEGER PRIMARY KEY, car_id INTEGER NOT NULL, customer_id INTEGER NOT NULL,
+        rental_start_date DATE NOT NULL, rental_end_date DATE NOT NULL, total_rental_days INTEGER NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending', total_rental_price DECIMAL(10, 2) NOT NULL,
+        payment_status TEXT NOT NULL DEFAULT 'unpaid', amount_paid DECIMAL(10, 2) NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE rental_management (
+        rental_id INTEGER PRIMARY KEY, customer_id INTEGER, car_id INTEGER, start_date DATE, end_date DATE,
+        total_amount DECIMAL(10, 2), status TEXT NOT NULL DEFAULT 'pending_approval', booking_id INTEGER,
+        admin_action TEXT, return_date DATE, late_returns_fee DECIMAL(10, 2) NOT NULL DEFAULT 0
+    )
+    """,
+]
+
+
+def _translate(sql):
+    sql = sql.replace("%s", "?").replace("BINARY ", "").replace("NOW()", "datetime('now')")
+    sql = sql.replace("ON DUPLICATE KEY UPDATE", "ON CONFLICT DO UPDATE SET")
+    return re.sub(r"VALUES\((\w+)\)", r"excluded.\1", sql)
+
+
+def _day(value):
+    return date.fromisoformat(str(value)[:10])
+
+
+class SQLiteCursor:
+    def __init__(self, connection, dictionary=False):
+        self._connection = connection
+        self._cursor = connection.cursor()
+        self._dictionary = dictionary
+
+    def execute(self, sql, params=()):
+        sql = _translate(sql)
+        if any(clause in sql for clause in LOCKING_CLAUSES):
+            for clause in LOCKING_CLAUSES:
+                sql = sql.replace(clause, "")
+            if not self._connection.in_transaction:
+                self._connection.execute("BEGIN IMMEDIATE")
+        self._cursor.execute(sql, tuple(params))
+        return self
+
+    def executemany(self, sql, rows):
+        self._cursor.executemany(_translate(sql), rows)
+
+    def _row(self, row):
+        if row is None or not self._dictionary:
+            return row
+        return {column[0]: value for column, value in zip(self._cursor.description, row)}
+
+    def fetchone(self):
+        return self._row(self._cursor.fetchone())
+
+    def fetchall(self):
+        return [self._row(row) for row in self._cursor.fetchall()]
+
+    def fetchmany(self, size=1):
+        return [self._row(row) for row in self._cursor.fetchmany(size)]
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """A raw connection with the parts of the mysql.connector API the services use."""
+
+    def __init__(self, database, **_):
+        self._connection = sqlite3.connect(database, check_same_thread=False, isolation_level="")
+        self._connection.execute("PRAGMA busy_timeout = 5000")
+        self._connection.create_function("DATE_FORMAT", 2,
+                                         lambda value, pattern: None if value is None else _day(value).strftime(pattern))
+        self._connection.create_function("DATEDIFF", 2, lambda first, second: (_day(first) - _day(second)).days)
+        self._connection.create_function("LEAST", 2, min)
+        self._connection.create_function("GREATEST", 2, max)
+        self.closed = False
+
+    def cursor(self, dictionary=False, **_):
+        return SQLiteCursor(self._connection, dictionary)
+
+    def is_connected(self):
+        return not self.closed
+
+    def ping(self, **_):
+        pass
+
+    @property
+    def in_transaction(self):
+        return self._connection.in_transaction
+
+    def start_transaction(self, **_):
+        self._connection.execute("BEGIN")
+
+    def commit(self):
+        self._connection.commit()
+
+    def rollback(self):
+        self._connection.rollback()
+
+    def close(self):
+        self.closed = True
+        self._connection.close()
+
+
+def sqlite_database(path, schema=(), **pool_options):
+    """
+    Returns a DatabaseConnection backed by an SQLite file.
+
+    :param path: Database file (a file rather than ':memory:', so every pooled connection sees the same data).
+    :param schema: SQLite statements run once, e.g. CREATE TABLE.
+    :param pool_options: ConnectionPool settings.
+    """
+    db_connection = DatabaseConnection({"database": path}, pool_options, connection_factory=SQLiteConnection)
+    with db_connection.connect() as conn:
+        cursor = conn.cursor()
+        for statement in schema:
+            cursor.execute(statement)
+        conn.commit()
+        cursor.close()
+    return db_connection
@@ -0,0 +1,106 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from application.account_filter import AccountFilter, BloomFilter
+from application.password_hasher import PasswordHasher
+from application.user_management import UserManagement
+from sqlite_db import sqlite_database, RENTAL_SCHEMA
+
+
+class BloomFilterTest(unittest.TestCase):
+
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(1000, 0.01)
+        keys = [f"user{i}@example.com" for i in range(1000)]
+        for key in keys:
+            bloom.add(key)
+        self.assertTrue(all(key in bloom for key in keys))
+        self.assertEqual(bloom.count, 1000)
+
+    def test_false_positive_rate_at_capacity(self):
+        bloom = BloomFilter(1000, 0.01)
+        for i in range(1000):
+            bloom.add(f"user{i}")
+        false_positives = sum(f"other{i}" in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)  # Target is about 100
+
+
+class AccountFilterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch("application.account_filter.time.monotonic", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.db = sqlite_database(os.path.join(directory, "users.db"), RENTAL_SCHEMA)
+        self.addCleanup(self.db.close_pool)
+        self.insert_user("alice", "Alice@Example.com")
+        self.accounts = AccountFilter(capacity=100, negative_ttl=30, sync_interval=5)
+        self.assertEqual(self.accounts.load(self.db), 1)
+
+    def insert_user(self, username, email):
+        with self.db.connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute("INSERT INTO user_management (username, password_hash, role, email) "
+                           "VALUES (%s, 'x', 'customer', %s)", (username, email))
+            conn.commit()
+            cursor.close()
+
+    def test_loaded_accounts_might_exist(self):
+        for value in ("alice", "ALICE", " alice@example.com "):
+            self.assertTrue(self.accounts.might_exist(value))
+        self.assertFalse(self.accounts.might_exist("mallory"))
+        self.assertEqual(self.accounts.stats()["filtered"], 1)
+
+    def test_unloaded_filter_lets_everything_through(self):
+        self.assertTrue(AccountFilter().might_exist("anyone"))
+
+    def test_added_account_is_never_filtered(self):
+        self.accounts.remember_missing("bob")
+        self.assertFalse(self.accounts.might_exist("bob"))
+        self.accounts.add("bob", "bob@example.com")
+        self.assertTrue(self.accounts.might_exist("bob"))
+        self.assertTrue(self.accounts.might_exist("bob@example.com"))
+
+    def test_negative_entries_expire(self):
+        self.accounts.remember_missing("alice")  # e.g. the account was deleted after the load
+        self.assertFalse(self.accounts.might_exist("alice"))
+        self.now += 30
+        self.assertTrue(self.accounts.might_exist("alice"))
+        self.assertEqual(self.accounts.stats()["negative_entries"], 0)
+
+    def test_negative_cache_is_bounded(self):
+        self.accounts.negative_max_size = 2
+        for value in ("a", "b", "c"):
+            self.accounts.remember_missing(value)
+        self.assertEqual(self.accounts.stats()["negative_entries"], 2)
+
+    def test_account_registered_by_another_process_is_found_after_sync(self):
+        self.insert_user("carol", "carol@example.com")
+        self.assertFalse(self.accounts.might_exist("carol"))  # Synced less than sync_interval ago
+        self.now += 5
+        self.assertTrue(self.accounts.might_exist("carol"))
+        self.assertTrue(self.accounts.might_exist("carol@example.com"))
+
+    def test_registration_clears_the_negative_entry(self):
+        hasher = PasswordHasher(rounds=4, workers=1, use_processes=False)
+        self.addCleanup(hasher.shutdown)
+        users = UserManagement(self.db, password_hasher=hasher, account_filter=self.accounts)
+        self.accounts.remember_missing("dave@example.com")
+        self.assertFalse(users.check_user_exists("dave@example.com"))
+        users.register_user("dave", "secret", "customer", "Dave", "D", "dave@example.com",
+                            None, None, "L1", None)
+        self.assertEqual(self.accounts.stats()["negative_entries"], 0)
+        self.assertTrue(users.check_user_exists("dave@example.com"))
+
+
+if __name__ == "__main__":
+    unittest.main()
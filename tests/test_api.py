@@ -0,0 +1,41 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DB_PASSWORD", "test")  # application.config requires it
+
+import unittest
+from unittest import mock
+import application.api as api
+
+
+class WorkerCountTest(unittest.TestCase):
+
+    def shared(self, persist, secret):
+        patchers = [mock.patch.object(api, "PersistSessions", persist),
+                    mock.patch.dict(api.SessionConfig, {"secret": secret}),
+                    mock.patch.dict(api.ApiConfig, {"workers": 0})]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_single_worker_without_shared_sessions(self):
+        self.shared(False, "secret")
+        self.assertEqual(api.worker_count(), 1)
+        self.assertEqual(api.worker_count(1), 1)
+        with self.assertRaises(ValueError):
+            api.worker_count(4)
+
+    def test_persisted_sessions_need_the_secret(self):
+        self.shared(True, "")
+        with self.assertRaises(ValueError):
+            api.worker_count(2)
+
+    def test_shared_sessions_allow_several_workers(self):
+        self.shared(True, "secret")
+        self.assertEqual(api.worker_count(3), 3)
+        self.assertGreaterEqual(api.worker_count(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from application.async_services import AsyncCarManagement, AsyncRentalBooking, AsyncUserManagement
+from data_models.car import Car
+from sqlite_db import sqlite_database, RENTAL_SCHEMA
+
+
+class AsyncServicesTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.db = sqlite_database(os.path.join(directory, "rental.db"), RENTAL_SCHEMA,
+                                  min_size=0, max_size=2, checkout_timeout=1)
+        self.addCleanup(self.db.close_pool)
+        self.executor = ThreadPoolExecutor(max_workers=2)
+        self.addCleanup(self.executor.shutdown)
+        self.cars = AsyncCarManagement(self.db, executor=self.executor)
+        self.bookings = AsyncRentalBooking(self.db, executor=self.executor)
+        self.users = AsyncUserManagement(self.db, executor=self.executor)
+        with self.db.connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute("INSERT INTO user_management (username, password_hash, role, email) "
+                           "VALUES ('alice', 'x', 'customer', 'alice@example.com')")
+            conn.commit()
+            cursor.close()
+
+    def in_use(self):
+        return self.db.pool.stats()["in_use"]
+
+    def test_calls_run_on_the_executor(self):
+        async def scenario():
+            await self.cars.add_car(Car(None, "Toyota", "Corolla", 2020, 1000, 1, 1, 30, 50))
+            await self.cars.add_car(Car(None, "Mazda", "3", 2021, 2000, 1, 1, 30, 60))
+            cars = await self.cars.list_all_cars()
+            booked = await self.bookings.book_car(1, cars[0].car_id, "2024-01-01", "2024-01-03", 150)
+            history = await self.bookings.view_rental_history(1)
+            return cars, booked, history
+
+        cars, booked, history = asyncio.run(scenario())
+        self.assertEqual([car.make for car in cars], ["Toyota", "Mazda"])
+        self.assertTrue(booked)
+        self.assertEqual(len(history), 1)
+        self.assertEqual(self.in_use(), 0)
+
+    def test_session_connection_is_returned_after_each_call(self):
+        # check_user_exists uses the per-thread session connection (db_connection.cursor()). If it
+        # were kept after the call, both executor threads would hold one and exhaust the pool.
+        async def scenario():
+            found = await asyncio.gather(*(self.users.check_user_exists(email)
+                                           for email in ["alice@example.com", "bob@example.com"] * 5))
+            self.assertEqual(self.in_use(), 0)
+            return found, await self.cars.list_all_cars()
+
+        found, cars = asyncio.run(scenario())
+        self.assertEqual(found, [True, False] * 5)
+        self.assertEqual(cars, [])
+        self.assertEqual(self.in_use(), 0)
+
+    def test_session_is_returned_when_the_call_raises(self):
+        async def scenario():
+            return await self.users._run(self._failing_query)
+
+        with self.assertRaises(ValueError):
+            asyncio.run(scenario())
+        self.assertEqual(self.in_use(), 0)
+
+    def _failing_query(self):
+        self.db.cursor().execute("SELECT 1")
+        raise ValueError("failed after using the session connection")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+import unittest
+from datetime import date, timedelta
+from application.availability import AvailabilityEngine
+
+
+class AvailabilityEngineTest(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = AvailabilityEngine()
+        self.engine.bulk_load([
+            (1, "2024-03-01", "2024-03-05", 10),
+            (1, "2024-03-10", "2024-03-10", 11),
+            (2, "2024-02-01", "2024-03-31", 12),
+        ])
+
+    def test_overlapping_ranges_are_unavailable(self):
+        self.assertFalse(self.engine.is_available(1, "2024-03-05", "2024-03-07"))
+        self.assertFalse(self.engine.is_available(1, "2024-02-20", "2024-03-01"))
+        self.assertFalse(self.engine.is_available(1, "2024-03-02", "2024-03-03"))
+
+    def test_adjacent_and_gap_ranges_are_available(self):
+        self.assertTrue(self.engine.is_available(1, "2024-03-06", "2024-03-09"))
+        self.assertTrue(self.engine.is_available(1, "2024-03-11", "2024-04-01"))
+        self.assertTrue(self.engine.is_available(3, "2024-03-01", "2024-03-31"))
+
+    def test_long_booking_is_found_from_a_later_window(self):
+        # Car 2's booking starts a month before the window; the scan must reach back that far.
+        self.assertEqual(self.engine.busy_car_ids("2024-03-20", "2024-03-21"), {2})
+        self.assertEqual(self.engine.free_car_ids([1, 2, 3], "2024-03-20", "2024-03-21"), [1, 3])
+
+    def test_reserve_refuses_conflicts(self):
+        self.assertFalse(self.engine.reserve(1, "2024-03-04", "2024-03-06", 20))
+        self.assertTrue(self.engine.reserve(1, "2024-03-06", "2024-03-09", 20))
+        self.assertFalse(self.engine.is_available(1, "2024-03-08", "2024-03-08"))
+        with self.assertRaises(ValueError):
+            self.engine.reserve(1, "2024-05-02", "2024-05-01")
+
+    def test_release_frees_the_range(self):
+        self.assertTrue(self.engine.release(12))
+        self.assertFalse(self.engine.release(12))
+        self.assertTrue(self.engine.is_available(2, "2024-03-01", "2024-03-31"))
+        self.assertEqual(self.engine.busy_car_ids("2024-03-20", "2024-03-21"), set())
+
+    def test_replace_car(self):
+        self.engine.replace_car(1, [(30, date(2024, 6, 1), date(2024, 6, 3))])
+        self.assertTrue(self.engine.is_available(1, "2024-03-01", "2024-03-10"))
+        self.assertFalse(self.engine.is_available(1, "2024-06-03", "2024-06-04"))
+        self.assertFalse(self.engine.release(10))
+        self.assertTrue(self.engine.release(30))
+
+    def test_booked_cars_per_day(self):
+        self.assertEqual(self.engine.booked_cars_per_day("2024-03-04", "2024-03-07"), [2, 2, 1, 1])
+        self.assertEqual(self.engine.booked_cars_per_day("2024-03-07", "2024-03-06"), [])
+
+    def test_matches_brute_force(self):
+        rng = random.Random(5)
+        first = date(2024, 1, 1)
+        engine = AvailabilityEngine()
+        bookings = []
+        for booking_id in range(300):
+            car_id = rng.randint(1, 10)
+            start = first + timedelta(days=rng.randrange(200))
+            end = start + timedelta(days=rng.randrange(20))
+            if engine.reserve(car_id, start, end, booking_id):
+                bookings.append((car_id, start, end, booking_id))
+        for booking in bookings[::3]:
+            engine.release(booking[3])
+        bookings = bookings[1::3] + bookings[2::3]
+
+        for _ in range(200):
+            start = first + timedelta(days=rng.randrange(220))
+            end = start + timedelta(days=rng.randrange(15))
+            busy = {car_id for car_id, other_start, other_end, _ in bookings
+                    if other_start <= end and start <= other_end}
+            self.assertEqual(engine.busy_car_ids(start, end), busy)
+            for car_id in range(1, 11):
+                self.assertEqual(engine.is_available(car_id, start, end), car_id not in busy)
+
+
+if __name__ == "__main__":
+    unittest.main()
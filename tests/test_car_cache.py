@@ -0,0 +1,101 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+from unittest import mock
+from application.car_cache import CarCache
+from data_models.car import Car
+
+
+def car(car_id, make="Toyota"):
+    return Car(car_id, make, "Corolla", 2020, 1000, 1, 1, 30, 50)
+
+
+class CarCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 100.0
+        patcher = mock.patch("application.car_cache.time.monotonic", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = CarCache(max_size=3, ttl=10)
+
+    def test_hit_and_miss(self):
+        self.assertIsNone(self.cache.get(1))
+        self.cache.put(car(1))
+        self.assertEqual(self.cache.get(1).make, "Toyota")
+        self.assertEqual(self.cache.stats(), {"hits": 1, "misses": 1, "hit_rate": 0.5, "size": 1})
+
+    def test_cars_are_copied_in_and_out(self):
+        original = car(1)
+        self.cache.put(original)
+        original.make = "changed by the caller"
+        cached = self.cache.get(1)
+        cached.make = "changed by a reader"
+        self.assertEqual(self.cache.get(1).make, "Toyota")
+
+    def test_ttl_expiry(self):
+        self.cache.put(car(1))
+        self.now += 9.9
+        self.assertIsNotNone(self.cache.get(1))
+        self.now += 0.1
+        self.assertIsNone(self.cache.get(1))
+        self.assertEqual(self.cache.stats()["size"], 0)
+
+    def test_least_recently_used_car_is_evicted(self):
+        for car_id in (1, 2, 3):
+            self.cache.put(car(car_id))
+        self.cache.get(1)  # 2 is now the least recently used
+        self.cache.put(car(4))
+        self.assertIsNone(self.cache.get(2))
+        self.assertEqual([car_id for car_id in (1, 3, 4) if self.cache.get(car_id)], [1, 3, 4])
+
+    def test_available_cars(self):
+        self.cache.set_available_cars([car(1), car(2)])
+        self.assertEqual([c.car_id for c in self.cache.get_available_cars()], [1, 2])
+        self.now += 10
+        self.assertIsNone(self.cache.get_available_cars())
+
+    def test_available_list_is_dropped_when_a_member_is_evicted(self):
+        self.cache.set_available_cars([car(1), car(2)])
+        for car_id in (3, 4):
+            self.cache.put(car(car_id))
+        self.assertIsNone(self.cache.get_available_cars())
+
+    def test_list_larger_than_the_cache_is_not_kept(self):
+        self.cache.set_available_cars([car(car_id) for car_id in range(1, 6)])
+        self.assertIsNone(self.cache.get_available_cars())
+        self.assertIsNotNone(self.cache.get(5))
+
+    def test_invalidation_during_a_fill_drops_the_fill(self):
+        version, read_only = self.cache.fill_ticket()
+        self.assertTrue(read_only)
+        stale = [car(1, "before the update")]
+        self.cache.invalidate(1)  # An update commits while the reader's query is running
+        self.cache.set_available_cars(stale, version)
+        self.cache.put(stale[0], version)
+        self.assertIsNone(self.cache.get_available_cars())
+        self.assertIsNone(self.cache.get(1))
+
+    def test_refill_after_invalidation_reads_the_primary(self):
+        self.cache.invalidate_availability()
+        version, read_only = self.cache.fill_ticket()
+        self.assertFalse(read_only)  # A lagging replica could still return the old rows
+        self.cache.set_available_cars([car(1)], version)
+        self.assertEqual(len(self.cache.get_available_cars()), 1)
+        self.assertEqual(self.cache.fill_ticket(), (version, True))
+
+    def test_invalidate_and_clear(self):
+        self.cache.set_available_cars([car(1), car(2)])
+        self.cache.invalidate(1)
+        self.assertIsNone(self.cache.get(1))
+        self.assertIsNotNone(self.cache.get(2))
+        self.assertIsNone(self.cache.get_available_cars())
+        self.cache.clear()
+        self.assertEqual(self.cache.stats()["size"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
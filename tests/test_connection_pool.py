@@ -0,0 +1,160 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import threading
+import time
+import unittest
+from mysql.connector import Error
+from database.connection_pool import ConnectionPool, PoolTimeoutError
+
+
+class FakeConnection:
+    def __init__(self, number):
+        self.number = number
+        self.healthy = True
+        self.closed = False
+        self.in_transaction = False
+        self.rollbacks = 0
+
+    def is_connected(self):
+        return self.healthy and not self.closed
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.in_transaction = False
+
+    def cursor(self, **_):
+        return ("cursor", self.number)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeFactory:
+    def __init__(self):
+        self.created = []
+
+    def __call__(self, **config):
+        connection = FakeConnection(len(self.created))
+        self.created.append(connection)
+        return connection
+
+
+class ConnectionPoolTest(unittest.TestCase):
+
+    def pool(self, **options):
+        self.factory = FakeFactory()
+        pool = ConnectionPool({}, connection_factory=self.factory, **options)
+        self.addCleanup(pool.close)
+        return pool
+
+    def test_checkout_and_return_reuse_the_connection(self):
+        pool = self.pool(min_size=1, max_size=2)
+        with pool.acquire() as conn:
+            raw = conn.raw
+            self.assertEqual(conn.cursor(), ("cursor", 0))
+            self.assertEqual(pool.stats()["in_use"], 1)
+        self.assertFalse(raw.closed)
+        self.assertEqual(pool.stats(), {"open": 1, "idle": 1, "in_use": 0, "max_size": 2})
+        with pool.acquire() as conn:
+            self.assertIs(conn.raw, raw)
+        self.assertEqual(len(self.factory.created), 1)
+
+    def test_close_returns_instead_of_closing(self):
+        pool = self.pool(min_size=0, max_size=1)
+        conn = pool.acquire()
+        raw = conn.raw
+        raw.in_transaction = True
+        conn.close()
+        conn.close()  # A second close must not return it twice
+        self.assertFalse(raw.closed)
+        self.assertEqual(raw.rollbacks, 1)  # Open transactions are rolled back on return
+        self.assertEqual(pool.stats()["idle"], 1)
+        with self.assertRaises(Error):
+            conn.cursor()  # The wrapper no longer reaches a connection another thread may hold
+
+    def test_max_size_times_out(self):
+        pool = self.pool(min_size=0, max_size=2, checkout_timeout=0.05)
+        first, second = pool.acquire(), pool.acquire()
+        started = time.monotonic()
+        with self.assertRaises(PoolTimeoutError):
+            pool.acquire()
+        self.assertGreaterEqual(time.monotonic() - started, 0.04)
+        self.assertEqual(len(self.factory.created), 2)
+        first.close()
+        second.close()
+
+    def test_waiting_checkout_gets_a_returned_connection(self):
+        pool = self.pool(min_size=0, max_size=1, checkout_timeout=5)
+        held = pool.acquire()
+        raw = held.raw
+        result = {}
+
+        def wait():
+            with pool.acquire() as conn:
+                result["raw"] = conn.raw
+
+        waiter = threading.Thread(target=wait)
+        waiter.start()
+        time.sleep(0.05)
+        self.assertNotIn("raw", result)  # Still blocked: the pool is at max_size
+        held.close()
+        waiter.join(2)
+        self.assertIs(result["raw"], raw)
+
+    def test_unhealthy_connection_is_replaced(self):
+        pool = self.pool(min_size=1, max_size=1)
+        dead = self.factory.created[0]
+        dead.healthy = False
+        with pool.acquire() as conn:
+            self.assertIsNot(conn.raw, dead)
+        self.assertTrue(dead.closed)
+        self.assertEqual(pool.stats()["open"], 1)
+
+    def test_failed_connect_frees_the_slot(self):
+        pool = self.pool(min_size=0, max_size=1, checkout_timeout=0.05)
+        failing = [True]
+
+        def factory(**config):
+            if failing[0]:
+                raise Error(msg="refused")
+            return FakeConnection(0)
+
+        pool._factory = factory
+        with self.assertRaises(Error):
+            pool.acquire()
+        failing[0] = False
+        with pool.acquire() as conn:
+            self.assertIsNotNone(conn.raw)
+
+    def test_idle_connections_above_min_size_are_closed(self):
+        pool = self.pool(min_size=1, max_size=3, idle_timeout=0)
+        connections = [pool.acquire() for _ in range(3)]
+        raws = [conn.raw for conn in connections]
+        for conn in connections:
+            conn.close()
+        with pool.acquire():
+            pass
+        self.assertEqual(pool.stats()["open"], 1)
+        self.assertEqual(sum(raw.closed for raw in raws), 2)
+
+    def test_closed_pool(self):
+        pool = self.pool(min_size=1, max_size=2)
+        held = pool.acquire()
+        pool.close()
+        with self.assertRaises(Error):
+            pool.acquire()
+        raw = held.raw
+        held.close()
+        self.assertTrue(raw.closed)  # Connections checked out at close() are closed on return
+        self.assertEqual(pool.stats()["open"], 0)
+
+    def test_invalid_sizes(self):
+        with self.assertRaises(ValueError):
+            ConnectionPool({}, min_size=3, max_size=2, connection_factory=FakeFactory())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+from datetime import date, datetime
+from data_models.dates import to_date, to_ordinal, from_ordinal, rental_days, format_date
+
+
+class DatesTest(unittest.TestCase):
+
+    def test_to_date_accepts_every_input_form(self):
+        expected = date(2024, 1, 5)
+        for value in (expected, datetime(2024, 1, 5, 13, 30), "2024-01-05", "2024-01-05 13:30:00",
+                      "2024-01-05T13:30:00", b"2024-01-05", "2024-1-5"):
+            self.assertEqual(to_date(value), expected, value)
+        self.assertIsNone(to_date(None))
+
+    def test_invalid_strings_raise(self):
+        for value in ("2024-02-30", "05/01/2024", ""):
+            with self.assertRaises(ValueError):
+                to_date(value)
+
+    def test_ordinals(self):
+        self.assertEqual(to_ordinal("2024-01-05"), date(2024, 1, 5).toordinal())
+        self.assertEqual(to_ordinal(738000), 738000)
+        self.assertIsNone(to_ordinal(None))
+        self.assertEqual(from_ordinal(to_ordinal("2024-03-01")), date(2024, 3, 1))
+        self.assertIsNone(from_ordinal(None))
+
+    def test_rental_days_is_inclusive(self):
+        self.assertEqual(rental_days("2024-02-28", "2024-03-01"), 3)  # Leap year
+        self.assertEqual(rental_days(date(2024, 1, 1), "2024-01-01"), 1)
+        self.assertEqual(rental_days("2024-01-02", "2024-01-01"), 0)
+
+    def test_format_date(self):
+        self.assertEqual(format_date(datetime(2024, 1, 5, 9)), "2024-01-05")
+        self.assertEqual(format_date("2024-1-5"), "2024-01-05")
+        self.assertIsNone(format_date(None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import shutil
+import tempfile
+import unittest
+from decimal import Decimal
+import numpy as np
+from application.fleet_frame import FleetFrame
+from data_models.car import Car
+
+CARS = [
+    Car(1, "Toyota", "Corolla", 2020, 1000, True, 1, 30, Decimal("50.00")),
+    Car(2, "Mazda", "3", 2021, 2000, False, 1, 30, Decimal("60.10")),
+    Car(3, "Toyota", "Yaris", 2018, 5000, True, 2, 14, Decimal("35.55")),
+    Car(4, "Toyota", "Corolla", 2022, 300, True, 1, 30, Decimal("0.1")),
+]
+
+
+def as_tuples(cars):
+    return [tuple(getattr(car, field) for field in Car.FIELDS) for car in cars]
+
+
+class FleetFrameTest(unittest.TestCase):
+
+    def setUp(self):
+        self.frame = FleetFrame.from_cars(CARS)
+
+    def test_from_cars(self):
+        self.assertEqual(len(self.frame), 4)
+        self.assertEqual(self.frame.dictionaries["make"].tolist(), ["Toyota", "Mazda"])
+        self.assertEqual(self.frame.column("model").tolist(), ["Corolla", "3", "Yaris", "Corolla"])
+        self.assertEqual(self.frame.columns["daily_rate_cents"].tolist(), [5000, 6010, 3555, 10])
+        self.assertEqual(as_tuples(self.frame.to_cars()), as_tuples(CARS))
+
+    def test_from_rows_in_cursor_column_order(self):
+        names = list(reversed(Car.FIELDS))
+        rows = [tuple(reversed(row)) for row in as_tuples(CARS)]
+        frame = FleetFrame.from_rows(rows, [(name, None) for name in names])
+        self.assertEqual(as_tuples(frame.to_cars()), as_tuples(CARS))
+
+    def test_mask(self):
+        self.assertEqual(self.frame.mask(make="Toyota", year_min=2020).tolist(), [True, False, False, True])
+        self.assertEqual(self.frame.mask(rate_min="35.55", rate_max=50).tolist(), [True, False, True, False])
+        self.assertEqual(self.frame.mask(available=False).tolist(), [False, True, False, False])
+        self.assertFalse(self.frame.mask(make="Ford").any())
+        self.assertEqual([car.car_id for car in self.frame.where(model="Corolla").to_cars()], [1, 4])
+
+    def test_group_by(self):
+        groups = self.frame.group_by("make")
+        self.assertEqual([group["make"] for group in groups], ["Toyota", "Mazda"])
+        toyota = groups[0]
+        self.assertEqual((toyota["cars"], toyota["available"]), (3, 3))
+        self.assertEqual((toyota["min_daily_rate"], toyota["max_daily_rate"]), (0.1, 50.0))
+        self.assertEqual(toyota["avg_daily_rate"], 28.55)
+        self.assertEqual(toyota["avg_year"], 2020.0)
+
+    def test_group_by_several_keys_with_a_mask(self):
+        groups = self.frame.group_by(("make", "model"), mask=self.frame.mask(available=True))
+        self.assertEqual([(group["make"], group["model"], group["cars"]) for group in groups],
+                         [("Toyota", "Corolla", 2), ("Toyota", "Yaris", 1)])
+        self.assertEqual(self.frame.group_by("year", mask=self.frame.mask(make="Ford")), [])
+        with self.assertRaises(ValueError):
+            self.frame.group_by("daily_rate_cents")
+
+
+class FleetSnapshotTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, "fleet.snapshot")
+        self.frame = FleetFrame.from_cars(CARS)
+
+    def test_round_trip(self):
+        self.assertEqual(self.frame.save_snapshot(self.path), 4)
+        for mmap in (True, False):
+            loaded = FleetFrame.load_snapshot(self.path, mmap=mmap)
+            for name, values in self.frame.columns.items():
+                self.assertEqual(loaded.columns[name].dtype, values.dtype)
+                np.testing.assert_array_equal(loaded.columns[name], values)
+            self.assertEqual(as_tuples(loaded.to_cars()), as_tuples(CARS))
+            self.assertEqual(loaded.group_by("make"), self.frame.group_by("make"))
+            self.assertEqual(loaded.mask(make="Mazda").tolist(), [False, True, False, False])
+
+    def test_memory_mapped_columns_are_read_only(self):
+        self.frame.save_snapshot(self.path)
+        loaded = FleetFrame.load_snapshot(self.path)
+        self.assertIsInstance(loaded.columns["mileage"], np.memmap)
+        with self.assertRaises(ValueError):
+            loaded.columns["mileage"][0] = 1
+
+    def test_empty_frame(self):
+        FleetFrame.from_cars([]).save_snapshot(self.path)
+        loaded = FleetFrame.load_snapshot(self.path)
+        self.assertEqual(len(loaded), 0)
+        self.assertEqual(loaded.group_by("make"), [])
+
+    def test_not_a_snapshot(self):
+        with open(self.path, "wb") as handle:
+            handle.write(b"something else")
+        with self.assertRaises(ValueError):
+            FleetFrame.load_snapshot(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+from application.password_hasher import PasswordHasher, hash_rounds
+
+
+class PasswordHasherTest(unittest.TestCase):
+
+    def setUp(self):
+        # Two processes that calibrated to different work factors, sharing one user table.
+        self.low = PasswordHasher(rounds=4, workers=1, use_processes=False)
+        self.high = PasswordHasher(rounds=5, workers=1, use_processes=False)
+        self.addCleanup(self.low.shutdown)
+        self.addCleanup(self.high.shutdown)
+
+    def test_hash_and_verify(self):
+        password_hash = self.low.hash("secret")
+        self.assertEqual(hash_rounds(password_hash), 4)
+        self.assertTrue(self.high.verify("secret", password_hash))
+        self.assertFalse(self.high.verify("wrong", password_hash))
+
+    def test_hashes_are_only_upgraded(self):
+        password_hash = self.low.hash("secret")
+        self.assertFalse(self.low.needs_rehash(password_hash))
+        self.assertTrue(self.high.needs_rehash(password_hash))
+        password_hash = self.high.hash("secret")
+        # Once upgraded, neither process re-hashes it again, whichever one the user logs in through.
+        self.assertFalse(self.low.needs_rehash(password_hash))
+        self.assertFalse(self.high.needs_rehash(password_hash))
+
+    def test_unrecognised_hashes_are_replaced(self):
+        self.assertIsNone(hash_rounds("plain-text"))
+        self.assertTrue(self.low.needs_rehash("plain-text"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+import unittest
+from datetime import date, timedelta
+from decimal import Decimal
+from application.availability import AvailabilityEngine
+from application.pricing import PricingEngine, WeekendRule, SeasonalRule, LongRentalRule, DemandRule
+
+TODAY = date(2024, 1, 1)
+
+
+def engine_with(*rules):
+    engine = PricingEngine(rules, horizon_days=60)
+    engine.rebase(TODAY)
+    return engine
+
+
+class PricingEngineTest(unittest.TestCase):
+
+    def test_without_rules_the_daily_rate_applies(self):
+        self.assertEqual(engine_with().quote(1, "49.99", "2024-01-10", "2024-01-12"), Decimal("149.97"))
+
+    def test_weekend_rule(self):
+        # 2024-01-05 is a Friday.
+        engine = engine_with(WeekendRule(1.5))
+        self.assertEqual(engine.quote(1, 100, "2024-01-05", "2024-01-08"), Decimal("500.00"))
+        self.assertEqual(engine.daily_prices(1, 100, "2024-01-05", "2024-01-06"), [Decimal("100"), Decimal("150")])
+
+    def test_season_wrapping_new_year(self):
+        engine = engine_with(SeasonalRule("12-20", "01-05", 2.0))
+        self.assertEqual(engine.quote(1, 10, "2023-12-19", "2023-12-21"), Decimal("50.00"))
+        self.assertEqual(engine.quote(1, 10, "2024-01-05", "2024-01-06"), Decimal("30.00"))
+
+    def test_long_rental_discount(self):
+        engine = engine_with(LongRentalRule([(7, 0.9), (28, 0.75)]))
+        self.assertEqual(engine.quote(1, 10, "2024-01-01", "2024-01-06"), Decimal("60.00"))
+        self.assertEqual(engine.quote(1, 10, "2024-01-01", "2024-01-07"), Decimal("63.00"))
+        self.assertEqual(engine.quote(1, 10, "2024-01-01", "2024-01-28"), Decimal("210.00"))
+
+    def test_rules_for_specific_cars(self):
+        engine = engine_with(WeekendRule(2.0, car_ids=[1]))
+        self.assertEqual(engine.quote(1, 10, "2024-01-06", "2024-01-06"), Decimal("20.00"))
+        self.assertEqual(engine.quote(2, 10, "2024-01-06", "2024-01-06"), Decimal("10.00"))
+
+    def test_adding_a_rule_recompiles_only_its_cars(self):
+        engine = engine_with()
+        engine.quote(1, 10, "2024-01-06", "2024-01-06")
+        engine.quote(2, 10, "2024-01-06", "2024-01-06")
+        engine.add_rule(WeekendRule(2.0, car_ids=[1]))
+        self.assertEqual(engine.stats()["cars_compiled"], 1)
+        self.assertEqual(engine.quote(1, 10, "2024-01-06", "2024-01-06"), Decimal("20.00"))
+
+    def test_rate_change_recompiles(self):
+        engine = engine_with()
+        self.assertEqual(engine.quote(1, 10, "2024-01-02", "2024-01-03"), Decimal("20.00"))
+        self.assertEqual(engine.quote(1, 12, "2024-01-02", "2024-01-03"), Decimal("24.00"))
+        self.assertEqual(engine.compilations, 2)
+
+    def test_end_before_start_raises(self):
+        with self.assertRaises(ValueError):
+            engine_with().quote(1, 10, "2024-01-03", "2024-01-02")
+
+    def test_prefix_sums_match_per_day_prices(self):
+        engine = engine_with(WeekendRule(1.2), SeasonalRule("01-15", "02-10", 1.3))
+        rng = random.Random(3)
+        for _ in range(200):
+            start = TODAY + timedelta(days=rng.randrange(-60, 120))  # Inside and outside the window
+            end = start + timedelta(days=rng.randrange(20))
+            rate = Decimal(rng.choice(["29.99", "49.99", "89.00"]))
+            self.assertEqual(engine.quote(1, rate, start, end), sum(engine.daily_prices(1, rate, start, end)))
+
+    def test_demand_rule(self):
+        availability = AvailabilityEngine()
+        today = date.today()
+        availability.reserve(1, today + timedelta(days=3), today + timedelta(days=4), 1)
+        engine = PricingEngine([DemandRule([(0.5, 1.2)])], horizon_days=30)
+        engine.refresh_demand(availability, fleet_size=2)
+        self.assertEqual(engine.daily_prices(2, 10, today + timedelta(days=2), today + timedelta(days=5)),
+                         [Decimal("10"), Decimal("12"), Decimal("12"), Decimal("10")])
+
+    def test_from_config(self):
+        engine = PricingEngine.from_config(weekend_multiplier=1.2, seasons=["07-01:08-31:1.3"], long_rental_days=7,
+                                           long_rental_multiplier=0.9)
+        self.assertEqual([type(rule) for rule in engine.rules], [WeekendRule, SeasonalRule, LongRentalRule])
+        self.assertEqual(PricingEngine.from_config().rules, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
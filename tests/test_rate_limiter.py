@@ -0,0 +1,113 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+from unittest import mock
+from application.rate_limiter import TokenBuckets, LoginRateLimiter
+
+
+class TokenBucketsTest(unittest.TestCase):
+
+    def test_burst_then_refill(self):
+        buckets = TokenBuckets(capacity=3, refill_rate=1.0)
+        for _ in range(3):
+            self.assertTrue(buckets.available("a", 0.0))
+            buckets.take("a", 0.0)
+        self.assertFalse(buckets.available("a", 0.0))
+        self.assertAlmostEqual(buckets.retry_after("a", 0.0), 1.0)
+        self.assertAlmostEqual(buckets.retry_after("a", 0.5), 0.5)
+        self.assertTrue(buckets.available("a", 1.0))
+        self.assertTrue(buckets.available("b", 0.0))
+
+    def test_refill_is_capped(self):
+        buckets = TokenBuckets(capacity=2, refill_rate=1.0)
+        buckets.take("a", 0.0)
+        buckets.take("a", 100.0)
+        buckets.take("a", 100.0)
+        self.assertFalse(buckets.available("a", 100.0))
+
+    def test_give_back(self):
+        buckets = TokenBuckets(capacity=1, refill_rate=0.01)
+        buckets.take("a", 0.0)
+        self.assertFalse(buckets.available("a", 0.0))
+        buckets.give_back("a", 0.0)
+        self.assertTrue(buckets.available("a", 0.0))
+        buckets.give_back("unknown", 0.0)
+        self.assertEqual(len(buckets), 1)
+
+    def test_sweep_drops_refilled_buckets_oldest_first(self):
+        buckets = TokenBuckets(capacity=2, refill_rate=1.0)
+        buckets.take("old", 0.0)
+        buckets.take("new", 5.0)
+        self.assertEqual(buckets.sweep(5.0), 1)
+        self.assertEqual(len(buckets), 1)
+        self.assertEqual(buckets.sweep(5.5), 0)
+        self.assertEqual(buckets.sweep(6.0), 1)
+        self.assertEqual(len(buckets), 0)
+
+    def test_sweep_stops_at_limit_and_at_first_refilling_bucket(self):
+        buckets = TokenBuckets(capacity=1, refill_rate=1.0)
+        for index in range(5):
+            buckets.take(f"k{index}", float(index))
+        # At t=3 the buckets taken at 0, 1 and 2 have refilled; k3 has not, so k4 is not looked at.
+        self.assertEqual(buckets.sweep(3.0, limit=2), 2)
+        self.assertEqual(buckets.sweep(3.0), 1)
+        self.assertEqual(len(buckets), 2)
+
+    def test_updated_key_moves_to_the_back(self):
+        buckets = TokenBuckets(capacity=1, refill_rate=1.0)
+        buckets.take("a", 0.0)
+        buckets.take("b", 0.5)
+        buckets.take("a", 1.0)
+        self.assertEqual(buckets.sweep(1.6), 1)  # b refilled; a (updated at 1.0) is still refilling
+        self.assertFalse(buckets.available("a", 1.6))
+
+
+class LoginRateLimiterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch("application.rate_limiter.time.monotonic", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.limiter = LoginRateLimiter(account_capacity=2, account_refill_rate=1 / 60,
+                                        client_capacity=3, client_refill_rate=1 / 6)
+
+    def test_account_limit_is_case_insensitive(self):
+        self.assertTrue(self.limiter.allow("Alice"))
+        self.assertTrue(self.limiter.allow(" alice "))
+        self.assertFalse(self.limiter.allow("ALICE"))
+        self.assertAlmostEqual(self.limiter.retry_after("alice"), 60.0)
+        self.assertEqual(self.limiter.stats()["rejected"], 1)
+
+    def test_client_limit_spans_accounts(self):
+        for account in ("a", "b", "c"):
+            self.assertTrue(self.limiter.allow(account, client="10.0.0.1"))
+        self.assertFalse(self.limiter.allow("d", client="10.0.0.1"))
+        self.assertTrue(self.limiter.allow("d", client="10.0.0.2"))
+
+    def test_successful_login_refunds_the_account_token(self):
+        for _ in range(5):
+            self.assertTrue(self.limiter.allow("alice"))
+            self.limiter.succeeded("alice")
+
+    def test_refused_attempt_takes_no_token(self):
+        self.limiter.allow("alice")
+        self.limiter.allow("alice")
+        self.assertFalse(self.limiter.allow("alice", client="10.0.0.1"))
+        self.assertTrue(self.limiter.allow("bob", client="10.0.0.1"))
+        self.assertTrue(self.limiter.allow("carol", client="10.0.0.1"))
+        self.assertTrue(self.limiter.allow("dave", client="10.0.0.1"))
+
+    def test_idle_buckets_are_swept(self):
+        self.limiter.allow("alice", client="10.0.0.1")
+        self.assertEqual(self.limiter.stats()["accounts"], 1)
+        self.now += 3600
+        self.limiter.allow("bob")
+        self.assertEqual(self.limiter.stats(), {"accounts": 1, "clients": 0, "rejected": 0})
+
+
+if __name__ == "__main__":
+    unittest.main()
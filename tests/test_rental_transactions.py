@@ -0,0 +1,147 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import shutil
+import tempfile
+import threading
+import unittest
+from application.rental_booking import RentalBooking
+from application.rental_management import RentalManagement
+from sqlite_db import sqlite_database, RENTAL_SCHEMA
+
+
+class RentalTransactionTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.db = sqlite_database(os.path.join(directory, "rental.db"), RENTAL_SCHEMA)
+        self.addCleanup(self.db.close_pool)
+        self.booking = RentalBooking(self.db)
+        self.management = RentalManagement(self.db)
+        self.execute("INSERT INTO car_management (car_id, make, model, year, mileage, min_rent_period, "
+                     "max_rent_period, daily_rate) VALUES (1, 'Toyota', 'Corolla', 2020, 1000, 1, 30, 50)")
+
+    def execute(self, sql, params=()):
+        with self.db.connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            conn.commit()
+            cursor.close()
+            return cursor.lastrowid
+
+    def fetch(self, sql, params=()):
+        with self.db.connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+            cursor.close()
+            return rows
+
+    def pending_booking(self, start_date, end_date, car_id=1):
+        """Inserts a booking directly, as an import would, without book_car's overlap check."""
+        return self.execute("INSERT INTO rental_booking (car_id, customer_id, rental_start_date, rental_end_date, "
+                            "total_rental_days, total_rental_price) VALUES (%s, 1, %s, %s, 1, 50)",
+                            (car_id, start_date, end_date))
+
+    def statuses(self):
+        return dict(self.fetch("SELECT booking_id, status FROM rental_booking"))
+
+    def test_book_car(self):
+        self.assertTrue(self.booking.book_car(1, 1, "2024-03-01", "2024-03-03", 150))
+        self.assertEqual(self.fetch("SELECT car_id, total_rental_days, status FROM rental_booking"),
+                         [(1, 3, "pending")])
+
+    def test_overlapping_booking_is_refused(self):
+        self.assertTrue(self.booking.book_car(1, 1, "2024-03-01", "2024-03-03", 150))
+        self.assertFalse(self.booking.book_car(2, 1, "2024-03-03", "2024-03-05", 150))
+        self.assertTrue(self.booking.book_car(2, 1, "2024-03-04", "2024-03-05", 100))
+        self.assertEqual(len(self.statuses()), 2)
+
+    def test_reversed_dates_are_refused(self):
+        self.assertFalse(self.booking.book_car(1, 1, "2024-03-05", "2024-03-01", 150))
+        self.assertFalse(self.booking.book_car(1, 1, "2024-03-05", "not a date", 150))
+        self.assertEqual(self.statuses(), {})
+        # A one-day rental is still allowed.
+        self.assertTrue(self.booking.book_car(1, 1, "2024-03-05", "2024-03-05", 50))
+
+    def test_unknown_car(self):
+        self.assertFalse(self.booking.book_car(1, 99, "2024-03-01", "2024-03-03", 150))
+        self.assertEqual(self.statuses(), {})
+
+    def test_approve_and_reject(self):
+        approved = self.pending_booking("2024-03-01", "2024-03-03")
+        rejected = self.pending_booking("2024-04-01", "2024-04-03")
+        self.assertTrue(self.management.approve_rental(approved))
+        self.assertTrue(self.management.reject_rental(rejected))
+        self.assertEqual(self.statuses(), {approved: "confirmed", rejected: "cancelled"})
+        self.assertEqual(self.fetch("SELECT available_now FROM car_management"), [(0,)])
+        self.assertFalse(self.management.approve_rental(rejected))  # Cancelled bookings stay cancelled
+        self.assertFalse(self.management.approve_rental(99))
+
+    def test_overlapping_approvals(self):
+        first = self.pending_booking("2024-03-01", "2024-03-05")
+        second = self.pending_booking("2024-03-05", "2024-03-08")
+        self.assertTrue(self.management.approve_rental(first))
+        self.assertFalse(self.management.approve_rental(second))
+        self.assertEqual(self.statuses(), {first: "confirmed", second: "pending"})
+
+    def run_concurrently(self, function, arguments):
+        barrier = threading.Barrier(len(arguments))
+        results = {}
+
+        def run(argument):
+            barrier.wait()
+            results[argument] = function(argument)
+
+        threads = [threading.Thread(target=run, args=(argument,)) for argument in arguments]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+        return results
+
+    def test_concurrent_overlapping_approvals(self):
+        bookings = [self.pending_booking("2024-03-01", "2024-03-05") for _ in range(4)]
+        results = self.run_concurrently(self.management.approve_rental, bookings)
+        self.assertEqual(sorted(results.values()), [False, False, False, True])
+        self.assertEqual(list(self.statuses().values()).count("confirmed"), 1)
+
+    def test_concurrent_overlapping_bookings(self):
+        results = self.run_concurrently(
+            lambda user_id: self.booking.book_car(user_id, 1, "2024-03-01", "2024-03-05", 250), [1, 2, 3, 4])
+        self.assertEqual(sorted(results.values()), [False, False, False, True])
+        self.assertEqual(len(self.statuses()), 1)
+
+    def test_bulk_approval(self):
+        first = self.pending_booking("2024-03-05", "2024-03-08")
+        overlapping = self.pending_booking("2024-03-01", "2024-03-05")
+        later = self.pending_booking("2024-03-09", "2024-03-10")
+        cancelled = self.pending_booking("2024-04-01", "2024-04-02")
+        self.management.reject_rental(cancelled)
+        results = self.management.approve_rentals([first, overlapping, later, cancelled, 99])
+        # Bookings are considered in start-date order, so the earlier-starting one wins.
+        self.assertEqual(results, {first: "conflict", overlapping: "approved", later: "approved",
+                                   cancelled: "cancelled", 99: "not_found"})
+        self.assertEqual(self.statuses(), {first: "pending", overlapping: "confirmed", later: "confirmed",
+                                           cancelled: "cancelled"})
+
+    def test_bulk_approval_respects_confirmed_bookings(self):
+        confirmed = self.pending_booking("2024-03-01", "2024-03-05")
+        self.assertTrue(self.management.approve_rental(confirmed))
+        overlapping = self.pending_booking("2024-03-04", "2024-03-06")
+        self.assertEqual(self.management.approve_rentals([overlapping]), {overlapping: "conflict"})
+
+    def test_bulk_rejection(self):
+        pending = self.pending_booking("2024-03-01", "2024-03-05")
+        cancelled = self.pending_booking("2024-04-01", "2024-04-02")
+        self.management.reject_rental(cancelled)
+        self.assertEqual(self.management.reject_rentals([pending, cancelled, 99]),
+                         {pending: "rejected", cancelled: "cancelled", 99: "not_found"})
+        self.assertEqual(self.statuses(), {pending: "cancelled", cancelled: "cancelled"})
+
+
+if __name__ == "__main__":
+    unittest.main()
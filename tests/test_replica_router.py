@@ -0,0 +1,151 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+from contextlib import contextmanager
+from unittest import mock
+from mysql.connector import Error
+from database.replica_router import NOT_REPLICATING, ReplicaRouter
+
+
+class FakeCursor:
+    def __init__(self, status, fails=()):
+        self.status = status
+        self.fails = fails
+        self.executed = []
+
+    def execute(self, sql):
+        self.executed.append(sql)
+        if sql in self.fails:
+            raise Error(msg="syntax error")
+
+    def fetchone(self):
+        return self.status
+
+    def close(self):
+        pass
+
+
+class FakeServerConnection:
+    def __init__(self, status, fails=()):
+        self.cursor_ = FakeCursor(status, fails)
+
+    def cursor(self, **_):
+        return self.cursor_
+
+
+class FakeDatabase:
+    """Stands in for a DatabaseConnection; its connections only report which server they belong to."""
+
+    def __init__(self, name, lag=0.0, down=False):
+        self.name = name
+        self.lag = lag
+        self.down = down
+        self.probes = 0
+
+    def connect(self, timeout=None):
+        if self.down:
+            raise Error(msg=f"{self.name} is down")
+        return mock.Mock(server=self.name)
+
+    @contextmanager
+    def checkout(self, timeout=None):
+        yield self.connect(timeout)
+
+
+class ReplicaRouterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 500.0
+        patcher = mock.patch("database.replica_router.time.monotonic", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.primary = FakeDatabase("primary")
+        self.fresh = FakeDatabase("fresh", lag=1.0)
+        self.behind = FakeDatabase("behind", lag=30.0)
+
+    def router(self, replicas, **options):
+        servers = {database.name: database for database in replicas}
+
+        def lag_probe(conn):
+            servers[conn.server].probes += 1
+            return servers[conn.server].lag
+
+        options.setdefault("lag_probe", lag_probe)
+        return ReplicaRouter(self.primary, replicas, max_replication_lag=5, lag_check_interval=10, **options)
+
+    def served_by(self, router, read_only=True):
+        return router.connect(read_only=read_only).server
+
+    def test_reads_skip_a_lagging_replica(self):
+        router = self.router([self.behind, self.fresh])
+        self.assertEqual({self.served_by(router) for _ in range(4)}, {"fresh"})
+
+    def test_writes_always_use_the_primary(self):
+        router = self.router([self.fresh])
+        self.assertEqual(self.served_by(router, read_only=False), "primary")
+
+    def test_falls_back_to_the_primary_when_every_replica_lags(self):
+        router = self.router([self.behind])
+        self.assertEqual(self.served_by(router), "primary")
+
+    def test_lag_is_measured_once_per_interval(self):
+        router = self.router([self.fresh])
+        for _ in range(3):
+            self.served_by(router)
+        self.assertEqual(self.fresh.probes, 1)
+        self.fresh.lag = 30.0
+        self.assertEqual(self.served_by(router), "fresh")  # Still trusting the last measurement
+        self.now += 10
+        self.assertEqual(self.served_by(router), "primary")
+        self.assertEqual(self.fresh.probes, 2)
+
+    def test_replica_that_catches_up_is_used_again(self):
+        router = self.router([self.behind])
+        self.assertEqual(self.served_by(router), "primary")
+        self.behind.lag = 0.5
+        self.now += 10
+        self.assertEqual(self.served_by(router), "behind")
+
+    def test_stopped_or_unreachable_replicas_are_not_used(self):
+        self.fresh.lag = None  # Replication stopped
+        router = self.router([self.fresh])
+        self.assertEqual(self.served_by(router), "primary")
+        down = FakeDatabase("down", down=True)
+        router = self.router([down])
+        self.assertEqual(self.served_by(router), "primary")
+        self.assertEqual(down.probes, 0)
+
+    def test_replica_failing_after_the_probe_falls_back_to_the_primary(self):
+        router = self.router([self.fresh])
+        router.route(read_only=True)  # Measured while healthy
+        self.fresh.down = True
+        self.assertEqual(self.served_by(router), "primary")
+
+    def test_standalone_servers(self):
+        self.fresh.lag = NOT_REPLICATING
+        self.assertEqual(self.served_by(self.router([self.fresh])), "primary")
+        self.assertEqual(self.served_by(self.router([self.fresh], use_standalone=True)), "fresh")
+
+    def test_probe_replication_lag(self):
+        probe = ReplicaRouter.probe_replication_lag
+        self.assertEqual(probe(FakeServerConnection({"Seconds_Behind_Source": 3})), 3.0)
+        self.assertIsNone(probe(FakeServerConnection({"Seconds_Behind_Source": None})))
+        self.assertIs(probe(FakeServerConnection(None)), NOT_REPLICATING)
+        # Servers older than MySQL 8.0.22 only know SHOW SLAVE STATUS.
+        legacy = FakeServerConnection({"Seconds_Behind_Master": 7}, fails=("SHOW REPLICA STATUS",))
+        self.assertEqual(probe(legacy), 7.0)
+        self.assertEqual(legacy.cursor_.executed, ["SHOW REPLICA STATUS", "SHOW SLAVE STATUS"])
+
+    def test_is_read_only(self):
+        self.assertTrue(ReplicaRouter.is_read_only("  select * from car_management"))
+        self.assertTrue(ReplicaRouter.is_read_only("SHOW TABLES"))
+        self.assertFalse(ReplicaRouter.is_read_only("SELECT * FROM car_management FOR UPDATE"))
+        self.assertFalse(ReplicaRouter.is_read_only("select 1 lock in share mode"))
+        self.assertFalse(ReplicaRouter.is_read_only("UPDATE car_management SET mileage = 1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import shutil
+import tempfile
+import unittest
+from datetime import date, datetime
+from decimal import Decimal
+import numpy as np
+from application.reports import _column_array, ColumnarWriter, read_columnar
+
+
+class ColumnArrayTest(unittest.TestCase):
+
+    def test_integers(self):
+        array = _column_array([1, 2, 3])
+        self.assertEqual(array.dtype, np.int64)
+        self.assertEqual(array.tolist(), [1, 2, 3])
+
+    def test_integers_with_null_become_float(self):
+        array = _column_array([1, None, 3])
+        self.assertEqual(array.dtype, np.float64)
+        self.assertTrue(np.isnan(array[1]))
+
+    def test_decimals(self):
+        array = _column_array([Decimal("1.25"), None])
+        self.assertEqual(array.dtype, np.float64)
+        self.assertEqual(array[0], 1.25)
+
+    def test_dates_and_datetimes(self):
+        days = _column_array([None, date(2024, 1, 2)])
+        self.assertEqual(days.dtype, np.dtype("datetime64[D]"))
+        self.assertTrue(np.isnat(days[0]))
+        self.assertEqual(days[1], np.datetime64("2024-01-02"))
+        times = _column_array([datetime(2024, 1, 2, 3, 4, 5)])
+        self.assertEqual(times.dtype, np.dtype("datetime64[s]"))
+
+    def test_strings(self):
+        array = _column_array(["ab", None, b"c"])
+        self.assertEqual(array.dtype.kind, "U")
+        self.assertEqual(array.tolist(), ["ab", "", "c"])
+
+
+class ColumnarFileTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, "rows.cols")
+
+    def test_round_trip_across_row_groups(self):
+        rows = [(index, f"car{index}", Decimal(index) / 4, date(2024, 1, 1 + index % 28)) for index in range(25)]
+        with ColumnarWriter(self.path, ["id", "name", "rate", "day"], row_group_size=10) as writer:
+            for row in rows:
+                writer.write(row)
+        columns = read_columnar(self.path)
+        self.assertEqual(columns["id"].tolist(), list(range(25)))
+        self.assertEqual(columns["name"].tolist(), [row[1] for row in rows])
+        self.assertEqual(columns["rate"].tolist(), [float(row[2]) for row in rows])
+        self.assertEqual(columns["day"].dtype, np.dtype("datetime64[D]"))
+        self.assertEqual(list(read_columnar(self.path, ["id"])), ["id"])
+
+    def test_all_null_groups_take_the_column_type(self):
+        values = [None, None, date(2024, 1, 1), date(2024, 1, 2), None, None]
+        with ColumnarWriter(self.path, ["day", "note"], row_group_size=2) as writer:
+            for value in values:
+                writer.write((value, None if value is None else "x"))
+        columns = read_columnar(self.path)
+        self.assertEqual(columns["day"].dtype, np.dtype("datetime64[D]"))
+        self.assertEqual(np.isnat(columns["day"]).tolist(), [True, True, False, False, True, True])
+        self.assertEqual(columns["note"].tolist(), ["", "", "x", "x", "", ""])
+
+    def test_later_groups_take_the_column_type(self):
+        rows = [(1, "ab", date(2024, 1, 1)), (2, "cd", date(2024, 1, 2)),
+                (None, "longer text", datetime(2024, 1, 3, 12, 0)), (Decimal("4.5"), "e", None),
+                (None, None, None)]
+        with ColumnarWriter(self.path, ["amount", "note", "day"], row_group_size=2) as writer:
+            for row in rows:
+                writer.write(row)
+        columns = read_columnar(self.path)
+        self.assertEqual(columns["amount"].dtype, np.float64)
+        self.assertEqual(columns["amount"][[0, 1, 3]].tolist(), [1.0, 2.0, 4.5])
+        self.assertTrue(np.isnan(columns["amount"][[2, 4]]).all())
+        self.assertEqual(columns["note"].tolist(), ["ab", "cd", "longer text", "e", ""])
+        self.assertEqual(columns["day"].dtype, np.dtype("datetime64[s]"))
+        self.assertEqual(columns["day"][2], np.datetime64("2024-01-03T12:00:00"))
+
+    def test_conflicting_types_are_rejected(self):
+        with self.assertRaisesRegex(ValueError, "Column 'value' has <U3 values in row group 1"):
+            with ColumnarWriter(self.path, ["value"], row_group_size=1) as writer:
+                writer.write((1,))
+                writer.write(("abc",))
+        self.assertEqual(read_columnar(self.path)["value"].tolist(), [1])  # Groups before the conflict are kept
+
+
+if __name__ == "__main__":
+    unittest.main()
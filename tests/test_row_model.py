@@ -0,0 +1,68 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+from datetime import date
+from data_models.booking import Booking
+from data_models.car import Car
+from data_models.rental import Rental
+from data_models.user import User
+
+CAR_COLUMNS = ("car_id", "make", "model", "year", "mileage", "available_now", "min_rent_period",
+               "max_rent_period", "daily_rate")
+
+
+class RowModelTest(unittest.TestCase):
+
+    def test_columns_are_matched_by_name_not_position(self):
+        columns = ("daily_rate", "car_id", "extra") + CAR_COLUMNS[1:8]
+        car = Car.from_row((49.5, 7, "ignored", "Toyota", "Corolla", 2020, 1000, 1, 1, 30), columns)
+        self.assertEqual((car.car_id, car.make, car.daily_rate, car.max_rent_period), (7, "Toyota", 49.5, 30))
+
+    def test_cursor_description_tuples(self):
+        description = [(column, 3, None, None, None, None, 1) for column in CAR_COLUMNS]
+        cars = Car.from_rows([(1, "A", "B", 2020, 5, 1, 1, 9, 10), (2, "C", "D", 2021, 6, 0, 2, 8, 20)], description)
+        self.assertEqual([car.car_id for car in cars], [1, 2])
+
+    def test_aliases(self):
+        columns = ("booking_id", "car_id", "customer_id", "rental_start_date", "rental_end_date",
+                   "total_rental_price", "status")
+        booking = Booking.from_row((5, 2, 9, "2024-01-01", "2024-01-03", 30, "pending"), columns)
+        self.assertEqual(booking.user_id, 9)
+        self.assertEqual(booking.start_date, date(2024, 1, 1))
+        self.assertEqual(booking.total_cost, 30)
+        self.assertIsNone(booking.rental_fee)  # OPTIONAL_FIELDS: rental_booking has no such column
+
+        rental = Rental.from_row((1, 3, 2, "2024-01-01", "2024-01-02", 50, "pending_approval"),
+                                 ("rental_id", "customer_id", "car_id", "start_date", "end_date", "total_amount",
+                                  "status"))
+        self.assertEqual((rental.user_id, rental.total_cost), (3, 50))
+
+    def test_missing_optional_fields_get_their_default(self):
+        user = User.from_row((1, "u", "hash", "admin"), ("user_id", "username", "password_hash", "role"))
+        self.assertEqual(user.username, "u")
+        self.assertIsNone(user.email)
+
+    def test_missing_required_field_raises(self):
+        with self.assertRaises(ValueError):
+            Car.from_row((1, "A"), ("car_id", "make"))
+        with self.assertRaises(ValueError):
+            User.from_row((1, "hash", "admin"), ("user_id", "password_hash", "role"))
+
+    def test_factory_is_cached_per_column_list(self):
+        user = User.row_factory(("user_id", "username", "password_hash", "role"))
+        self.assertIs(User.row_factory(["user_id", "username", "password_hash", "role"]), user)
+
+    def test_slots_and_copy(self):
+        car = Car(1, "A", "B", 2020, 5, 1, 1, 9, 10)
+        with self.assertRaises(AttributeError):
+            car.colour = "red"
+        clone = car.copy()
+        self.assertIsNot(clone, car)
+        self.assertEqual(clone.to_dict(), car.to_dict())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from application.session_manager import SessionManager
+from data_models.user import User
+from sqlite_db import sqlite_database
+
+SCHEMA = ["""
+    CREATE TABLE user_sessions (
+        session_id TEXT PRIMARY KEY, user_id INTEGER NOT NULL, username TEXT NOT NULL, role TEXT NOT NULL,
+        expires_at TIMESTAMP NOT NULL
+    )
+"""]
+
+
+class SessionManagerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 1_700_000_000.0
+        patcher = mock.patch("application.session_manager.time.time", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = User(7, "alice", None, "customer")
+
+    def test_forged_and_unknown_tokens(self):
+        sessions = SessionManager(secret="s", ttl=60)
+        token = sessions.create_session(self.user)
+        self.assertIs(sessions.authenticate(token), self.user)
+        session_id = token.rsplit(".", 1)[0]
+        self.assertIsNone(sessions.authenticate(session_id + ".forged"))
+        self.assertIsNone(SessionManager(secret="other").authenticate(token))
+        self.assertIsNone(sessions.authenticate(None))
+
+    def test_sliding_expiry_and_sweep(self):
+        sessions = SessionManager(secret="s", ttl=60)
+        token = sessions.create_session(self.user)
+        self.now += 50
+        self.assertIsNotNone(sessions.authenticate(token))
+        self.now += 50
+        self.assertIsNotNone(sessions.authenticate(token))
+        self.now += 61
+        self.assertEqual(sessions.sweep(), 1)
+        self.assertIsNone(sessions.authenticate(token))
+
+    def test_persisted_sessions_need_a_secret(self):
+        with self.assertRaises(ValueError):
+            SessionManager(db_connection=object())
+
+
+class SharedSessionStoreTest(unittest.TestCase):
+    """Two processes (API workers) sharing one user_sessions table."""
+
+    def setUp(self):
+        self.now = 1_700_000_000.0
+        patcher = mock.patch("application.session_manager.time.time", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.db = sqlite_database(os.path.join(directory, "sessions.db"), SCHEMA)
+        self.addCleanup(self.db.close_pool)
+        self.first = SessionManager(secret="shared", ttl=60, db_connection=self.db)
+        self.second = SessionManager(secret="shared", ttl=60, db_connection=self.db)
+        self.token = self.first.create_session(User(7, "alice", None, "customer"))
+
+    def test_token_works_in_the_other_process(self):
+        user = self.second.authenticate(self.token)
+        self.assertEqual((user.user_id, user.username, user.role), (7, "alice", "customer"))
+
+    def test_logout_in_one_process_ends_the_session_everywhere(self):
+        self.assertIsNotNone(self.second.authenticate(self.token))  # Now cached in the second process
+        self.first.revoke(self.token)
+        self.assertIsNone(self.second.authenticate(self.token))
+        self.assertIsNone(self.first.authenticate(self.token))
+
+    def test_sliding_expiry_is_shared(self):
+        for _ in range(3):
+            self.now += 50
+            self.assertIsNotNone(self.first.authenticate(self.token))
+        # The second process only ever saw the login-time expiry, which has long passed.
+        self.assertIsNotNone(self.second.authenticate(self.token))
+        self.now += 61
+        self.assertIsNone(self.second.authenticate(self.token))
+
+    def test_repeated_use_within_one_second(self):
+        self.assertIsNotNone(self.first.authenticate(self.token))
+        self.assertIsNotNone(self.first.authenticate(self.token))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+from datetime import date
+from decimal import Decimal
+from application.summaries import SummaryDelta, to_money
+
+
+def booking(**changes):
+    state = {"booking_id": 1, "car_id": 3, "customer_id": 7, "rental_start_date": "2024-01-30",
+             "rental_end_date": "2024-02-02", "total_rental_days": 4, "status": "pending",
+             "total_rental_price": Decimal("100.00"), "amount_paid": Decimal("50.00")}
+    state.update(changes)
+    return state
+
+
+class SummaryDeltaTest(unittest.TestCase):
+
+    def test_new_booking(self):
+        delta = SummaryDelta()
+        delta.change_booking(None, booking())
+        daily, cars, customers = delta.rows()
+        self.assertEqual(daily, [(date(2024, 1, 30), 1, 4, Decimal("100.00"), Decimal("50.00"), 0)])
+        # The rental spans two months: two days in each.
+        self.assertEqual(cars, [(3, date(2024, 1, 1), 2, 1), (3, date(2024, 2, 1), 2, 1)])
+        self.assertEqual(customers, [(7, 1, Decimal("100.00"), Decimal("50.00"), 0)])
+
+    def test_approval_changes_nothing(self):
+        delta = SummaryDelta()
+        delta.change_booking(booking(), booking(status="confirmed"))
+        self.assertEqual(delta.rows(), ([], [], []))
+
+    def test_rejection_subtracts_the_booking(self):
+        delta = SummaryDelta()
+        delta.change_booking(booking(), booking(status="cancelled"))
+        daily, cars, customers = delta.rows()
+        self.assertEqual(daily, [(date(2024, 1, 30), -1, -4, Decimal("-100.00"), Decimal("-50.00"), 0)])
+        self.assertEqual([row[2:] for row in cars], [(-2, -1), (-2, -1)])
+        self.assertEqual(customers, [(7, -1, Decimal("-100.00"), Decimal("-50.00"), 0)])
+
+    def test_payment_only_changes_paid_amounts(self):
+        delta = SummaryDelta()
+        delta.change_booking(booking(), booking(amount_paid="100"))
+        daily, cars, customers = delta.rows()
+        self.assertEqual(daily, [(date(2024, 1, 30), 0, 0, Decimal("0.00"), Decimal("50.00"), 0)])
+        self.assertEqual(cars, [])
+        self.assertEqual(customers, [(7, 0, Decimal("0.00"), Decimal("50.00"), 0)])
+
+    def test_late_fees_count_on_the_return_date(self):
+        delta = SummaryDelta()
+        delta.change_returns(7, [(None, 0, "active")], [(date(2024, 2, 5), Decimal("12.50"), "returned")])
+        delta.add_late_fee(7, date(2024, 2, 6), 0)
+        daily, cars, customers = delta.rows()
+        self.assertEqual(daily, [(date(2024, 2, 5), 0, 0, 0, 0, Decimal("12.50"))])
+        self.assertEqual(customers, [(7, 0, 0, 0, Decimal("12.50"))])
+
+    def test_changes_accumulate_and_cancel_out(self):
+        delta = SummaryDelta()
+        delta.change_booking(None, booking())
+        delta.change_booking(booking(), booking(status="cancelled"))
+        self.assertEqual(delta.rows(), ([], [], []))
+
+    def test_to_money_rounds_half_up(self):
+        self.assertEqual(to_money(1.005), Decimal("1.01"))
+        self.assertEqual(to_money("2.344"), Decimal("2.34"))
+        self.assertEqual(to_money(None), Decimal("0.00"))
+
+
+if __name__ == "__main__":
+    unittest.main()